@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+Offline benchmark suite for simplepath.
+
+All benchmark data is generated so the suite does not need
+any external data or network access. See ``python -m benchmarks --help``.
+"""
+from __future__ import unicode_literals
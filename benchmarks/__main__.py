@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite command line interface.
+
+Store a baseline::
+
+    $ python -m benchmarks run --output baseline.json
+
+Compare current performance to the baseline::
+
+    $ python -m benchmarks run --output current.json
+    $ python -m benchmarks compare baseline.json current.json
+
+Memory harness has the same interface::
+
+    $ python -m benchmarks memory --output memory-baseline.json
+    $ python -m benchmarks memory --compare memory-baseline.json
+"""
+from __future__ import print_function, unicode_literals
+import argparse
+import io
+import json
+import sys
+from functools import partial
+
+from . import memory
+from .suite import BENCHMARKS, compare, run
+
+
+err_print = partial(print, file=sys.stderr)
+
+
+def load(path):
+    with io.open(path, 'r', encoding='utf-8') as fid:
+        return json.load(fid)
+
+
+def dump(results, path):
+    with io.open(path, 'w', encoding='utf-8') as fid:
+        fid.write(json.dumps(results, indent=2))
+
+
+def print_results(results):
+    for name, result in results['results'].items():
+        print('{:<30} {}'.format(name, ' '.join(
+            '{}={:.6g}'.format(k, v) for k, v in result['metrics'].items()
+        )))
+
+
+def print_modules(results):
+    for name, result in results['results'].items():
+        modules = result['info'].get('retained_modules', {})
+        print('{:<30} {}'.format(name, ' '.join(
+            '{}={}'.format(k, v) for k, v in modules.items() if v
+        )))
+
+
+def print_comparison(rows):
+    for name, metric, base, value, ratio, status in rows:
+        if status == 'missing':
+            print('{:<30} {:<15} missing'.format(name, metric))
+            continue
+        print('{:<30} {:<15} {:>12.6g} {:>12.6g} {:>7.2f}x {}'
+              ''.format(name, metric, base, value, ratio, status))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help='run benchmarks')
+    run_parser.add_argument('--output', help='path to store JSON results')
+    run_parser.add_argument('--scale', type=float, default=1.0,
+                            help='multiplier of generated data sizes')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS),
+                            help='names of benchmarks to run')
+    run_parser.add_argument('--compare', metavar='BASELINE',
+                            help='path of baseline results to compare to')
+    run_parser.add_argument('--tolerance', type=float, default=0.1)
+
+    compare_parser = subparsers.add_parser(
+        'compare', help='compare results to a baseline',
+    )
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--tolerance', type=float, default=0.1,
+                                help='relative change tolerated '
+                                     'before flagging regression')
+
+    memory_parser = subparsers.add_parser(
+        'memory', help='run memory regression harness',
+    )
+    memory_parser.add_argument('--output',
+                               help='path to store JSON results')
+    memory_parser.add_argument('--scale', type=float, default=1.0,
+                               help='multiplier of generated data sizes')
+    memory_parser.add_argument('--batch', type=int, default=100,
+                               help='number of documents in batch step')
+    memory_parser.add_argument('--only', nargs='+',
+                               choices=list(memory.SCENARIOS),
+                               help='names of scenarios to run')
+    memory_parser.add_argument('--compare', metavar='BASELINE',
+                               help='path of baseline results to compare to')
+    memory_parser.add_argument('--tolerance', type=float, default=0.1)
+
+    subparsers.add_parser('list', help='list all benchmarks')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name in BENCHMARKS:
+            print(name)
+        return 0
+
+    if args.command in ('run', 'memory'):
+        if args.command == 'run':
+            results = run(names=args.only, scale=args.scale,
+                          repeat=args.repeat, log=err_print)
+            print_results(results)
+        else:
+            results = memory.run(names=args.only, scale=args.scale,
+                                 batch=args.batch, log=err_print)
+            print_results(results)
+            print_modules(results)
+        if args.output:
+            dump(results, args.output)
+        if not args.compare:
+            return 0
+        baseline = load(args.compare)
+
+    elif args.command == 'compare':
+        baseline = load(args.baseline)
+        results = load(args.current)
+
+    else:
+        parser.print_help()
+        return 2
+
+    rows = compare(baseline, results, tolerance=args.tolerance)
+    print_comparison(rows)
+    regressions = [i for i in rows if i[-1] == 'regression']
+    if regressions:
+        err_print('{} regression(s) beyond {:.0%} tolerance'
+                  ''.format(len(regressions), args.tolerance))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Deterministic generators of benchmark documents and mapper configs.
+"""
+from __future__ import unicode_literals
+import random
+
+from simplepath.mapper import ListConfig
+
+
+SEED = 42
+
+
+def scaled(value, scale):
+    return max(1, int(value * scale))
+
+
+def wide_document(sections=20, fields=50, seed=SEED):
+    rnd = random.Random(seed)
+    return {
+        'section{}'.format(i): {
+            'field{}'.format(j): rnd.randint(0, 1000)
+            for j in range(fields)
+        }
+        for i in range(sections)
+    }
+
+
+def wide_config(sections=20, fields=50):
+    return {
+        'out{}_{}'.format(i, j): 'section{}.field{}'.format(i, j)
+        for i in range(sections)
+        for j in range(fields)
+    }
+
+
+def deep_document(depth=20, breadth=2):
+    # breadth only at the top level keeps document size linear in depth
+    return {
+        'node{}'.format(i): _generate_chain(depth)
+        for i in range(breadth)
+    }
+
+
+def _generate_chain(depth):
+    node = {'value': depth}
+    for level in reversed(range(depth)):
+        node = {'node0': node, 'value': level}
+    return node
+
+
+def deep_config(depth=20, breadth=2):
+    config = {}
+    for i in range(breadth):
+        for level in range(1, depth + 1):
+            path = ['node{}'.format(i)] + ['node0'] * level + ['value']
+            config['out{}_{}'.format(i, level)] = '.'.join(path)
+    return config
+
+
+def records(count=500, seed=SEED):
+    rnd = random.Random(seed)
+    types = ['fee', 'tax', 'rebate', 'product']
+    return [
+        {
+            'code': 'C{}'.format(i),
+            'type': types[i % len(types)],
+            'amount': rnd.randint(1, 10000),
+            'description': 'record {}'.format(i),
+            'address': {
+                'city': 'City {}'.format(i % 10),
+                'zip': '{:05}'.format(i),
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def records_document(count=500, seed=SEED):
+    return {'records': records(count, seed)}
+
+
+def find_config(lookups=100, count=500):
+    step = max(1, count // lookups)
+    return {
+        'out{}'.format(i): 'records.<find:code=C{}>.amount'.format(i * step)
+        for i in range(lookups)
+    }
+
+
+def list_config():
+    return {
+        'records': ListConfig('records', {
+            'code': 'code',
+            'type': 'type',
+            'amount': 'amount',
+            'city': 'address.city',
+            'zip': 'address.zip',
+        }),
+    }
+
+
+def fan_out_config():
+    return {
+        'amounts': 'records.<*>.amount',
+        'cities': 'records.<*>.address.city',
+        'zips': 'records.<*>.address.zip',
+    }
+
+
+def fan_out_list_config():
+    # equivalent of fan_out_config via a dict per element
+    return {
+        'records': ListConfig('records', {
+            'amount': 'amount',
+            'city': 'address.city',
+            'zip': 'address.zip',
+        }),
+    }
+
+
+def missing_config(sections=20, fields=50, missing_rate=0.8):
+    """
+    Config where ``missing_rate`` of expressions reference keys
+    which are not present in ``wide_document``.
+    """
+    config = {}
+    for i in range(sections):
+        for j in range(fields):
+            missing = (i * fields + j) % 10 < missing_rate * 10
+            config['out{}_{}'.format(i, j)] = 'section{}.{}{}'.format(
+                i, 'missing' if missing else 'field', j,
+            )
+    return config
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Memory regression harness.
+
+Uses ``tracemalloc`` to measure peak memory and retained memory
+of compiling a mapper, of a single mapping call and of a batch
+of mapping calls. Retained memory is additionally broken down
+by the simplepath module which allocated it. Memory allocated
+and freed during the call is not broken down by module and is
+only visible as far as it raised the peak.
+
+Results have the same format as ``benchmarks.suite.run`` so they
+can be stored as baselines and compared the same way.
+"""
+from __future__ import unicode_literals
+import gc
+import os
+from collections import OrderedDict
+
+import simplepath
+from simplepath import __version__
+from simplepath.mapper import SimpleMapper
+
+from . import data
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    # not available on Python 2
+    tracemalloc = None
+
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(simplepath.__file__))
+
+SCENARIOS = OrderedDict()
+
+
+def scenario(name):
+    """
+    Decorator for registering memory scenarios.
+
+    Scenario function accepts ``scale`` and returns
+    a tuple of config, document and mapper kwargs.
+    """
+    def wrapper(func):
+        SCENARIOS[name] = func
+        return func
+    return wrapper
+
+
+def module_name(filename):
+    filename = os.path.abspath(filename)
+    if filename.startswith(PACKAGE_DIR + os.sep):
+        return 'simplepath/' + os.path.relpath(filename, PACKAGE_DIR)
+    return 'other'
+
+
+def retained_by_module(statistics):
+    """
+    Sum memory retained after the call per allocating module.
+    """
+    modules = OrderedDict()
+    for stat in statistics:
+        name = module_name(stat.traceback[0].filename)
+        modules[name] = modules.get(name, 0) + stat.size_diff
+    return OrderedDict(
+        sorted(modules.items(), key=lambda i: i[1], reverse=True)
+    )
+
+
+def measure(func):
+    """
+    Measure memory of a single call of ``func``.
+
+    Returns:
+        Tuple of metrics and retained bytes per module.
+        Metrics are ``peak_bytes``, ``retained_bytes`` and
+        ``peak_excess_bytes`` which is peak minus retained memory.
+        It is not total allocation churn since memory freed
+        and reallocated below the peak is not counted.
+    """
+    if tracemalloc is None:
+        raise RuntimeError('Memory harness requires tracemalloc')
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # keep result alive until after the snapshot so that
+    # allocated output is reported as retained
+    del result
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    statistics = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), 'filename',
+    )
+    metrics = OrderedDict([
+        ('peak_bytes', peak - start),
+        ('retained_bytes', current - start),
+        ('peak_excess_bytes', peak - current),
+    ])
+    return metrics, retained_by_module(statistics)
+
+
+def run(names=None, scale=1.0, batch=100, log=None):
+    """
+    Run memory scenarios.
+
+    Each scenario is measured in three steps:
+
+    * ``compile`` - compiling the mapper config
+    * ``map_one`` - mapping a single document
+    * ``map_batch`` - mapping ``batch`` documents
+    """
+    results = OrderedDict()
+
+    for name, func in SCENARIOS.items():
+        if names and name not in names:
+            continue
+        if log:
+            log('Measuring {}'.format(name))
+
+        config, document, kwargs = func(scale)
+        mapper = SimpleMapper(config, **kwargs)
+        steps = OrderedDict([
+            ('compile', lambda: SimpleMapper(config, **kwargs)),
+            ('map_one', lambda: mapper.map_data(document)),
+            ('map_batch', lambda: [mapper.map_data(document)
+                                   for _ in range(batch)]),
+        ])
+
+        for step, step_func in steps.items():
+            metrics, modules = measure(step_func)
+            results['{}.{}'.format(name, step)] = {
+                'metrics': metrics,
+                'info': {'retained_modules': modules},
+            }
+
+    return {
+        'meta': {
+            'simplepath': __version__,
+            'scale': scale,
+            'batch': batch,
+        },
+        'results': results,
+    }
+
+
+@scenario('wide')
+def wide(scale):
+    fields = data.scaled(50, scale)
+    return (
+        data.wide_config(fields=fields),
+        data.wide_document(fields=fields),
+        {},
+    )
+
+
+@scenario('find_heavy')
+def find_heavy(scale):
+    count = data.scaled(500, scale)
+    return (
+        data.find_config(lookups=data.scaled(100, scale), count=count),
+        data.records_document(count=count),
+        {},
+    )
+
+
+@scenario('list_config_heavy')
+def list_config_heavy(scale):
+    return (
+        data.list_config(),
+        data.records_document(count=data.scaled(500, scale)),
+        {},
+    )
+
+
+@scenario('missing_keys')
+def missing_keys(scale):
+    fields = data.scaled(50, scale)
+    return (
+        data.missing_config(fields=fields),
+        data.wide_document(fields=fields),
+        {'fail_mode': 'default', 'default': None},
+    )
@@ -0,0 +1,500 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark definitions and runner.
+
+Each benchmark is a function which accepts ``scale`` and returns
+a ``Case`` with the callable to be timed. All metrics are
+"lower is better" so that results can be compared generically.
+"""
+from __future__ import division, unicode_literals
+import gc
+import json
+import platform
+import sys
+import timeit
+from collections import OrderedDict
+
+from simplepath import __version__, lazyjson
+from simplepath.mapper import SimpleMapper
+
+from . import data
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    # not available on Python 2
+    tracemalloc = None
+
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name):
+    """
+    Decorator for registering benchmark functions.
+    """
+    def wrapper(func):
+        BENCHMARKS[name] = func
+        return func
+    return wrapper
+
+
+class Case(object):
+    """
+    Single benchmark case.
+
+    Args:
+        func: callable to be benchmarked
+        number (int): how many times to call ``func`` per measurement.
+            Reported time is per single call.
+        memory (bool): whether to also measure peak memory of a single
+            call with ``tracemalloc``. Skipped when it is not available.
+        info (dict): additional informational values to report
+            which are not compared against baselines
+    """
+
+    def __init__(self, func, number=1, memory=False, info=None):
+        self.func = func
+        self.number = number
+        self.memory = memory
+        self.info = info or {}
+
+
+def measure_peak_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_case(case, repeat=5):
+    times = timeit.Timer(case.func).repeat(repeat=repeat, number=case.number)
+    times = sorted(i / case.number for i in times)
+
+    metrics = OrderedDict([
+        ('seconds', times[0]),
+        ('median_seconds', times[len(times) // 2]),
+    ])
+    if case.memory and tracemalloc is not None:
+        metrics['peak_bytes'] = measure_peak_memory(case.func)
+
+    return {
+        'metrics': metrics,
+        'info': case.info,
+    }
+
+
+def run(names=None, scale=1.0, repeat=5, log=None):
+    """
+    Run benchmarks.
+
+    Args:
+        names (list): names of benchmarks to run. All by default.
+        scale (float): multiplier of generated data and config sizes
+        repeat (int): number of measurements per benchmark.
+            The best measurement is used for comparison.
+        log: callable used to report progress
+
+    Returns:
+        JSON-serializable dictionary with results.
+    """
+    results = OrderedDict()
+
+    for name, func in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        if log:
+            log('Running {}'.format(name))
+        results[name] = run_case(func(scale), repeat=repeat)
+
+    return {
+        'meta': {
+            'simplepath': __version__,
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'scale': scale,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, tolerance=0.1):
+    """
+    Compare two benchmark results.
+
+    Args:
+        baseline (dict): baseline results as returned by ``run``
+        current (dict): current results as returned by ``run``
+        tolerance (float): relative change which is not
+            considered to be a regression or improvement
+
+    Returns:
+        List of ``(benchmark, metric, baseline, current, ratio, status)``
+        tuples where status is one of ``ok``, ``regression``,
+        ``improvement`` or ``missing``.
+    """
+    rows = []
+
+    for name, result in baseline['results'].items():
+        for metric, base in result['metrics'].items():
+            try:
+                value = current['results'][name]['metrics'][metric]
+            except KeyError:
+                rows.append((name, metric, base, None, None, 'missing'))
+                continue
+
+            ratio = value / base if base else float('inf')
+            if ratio > 1 + tolerance:
+                status = 'regression'
+            elif ratio < 1 - tolerance:
+                status = 'improvement'
+            else:
+                status = 'ok'
+            rows.append((name, metric, base, value, ratio, status))
+
+    return rows
+
+
+def _mapper_case(config, document, number=10, memory=False, **kwargs):
+    mapper = SimpleMapper(config, **kwargs)
+    return Case(
+        lambda: mapper.map_data(document),
+        number=number,
+        memory=memory,
+        info={'expressions': len(config)},
+    )
+
+
+@benchmark('compile_wide')
+def compile_wide(scale):
+    config = data.wide_config(fields=data.scaled(50, scale))
+    return Case(
+        lambda: SimpleMapper(config),
+        number=3,
+        info={'expressions': len(config)},
+    )
+
+
+@benchmark('compile_find')
+def compile_find(scale):
+    config = data.find_config(lookups=data.scaled(100, scale))
+    return Case(
+        lambda: SimpleMapper(config),
+        number=3,
+        info={'expressions': len(config)},
+    )
+
+
+@benchmark('map_wide')
+def map_wide(scale):
+    fields = data.scaled(50, scale)
+    return _mapper_case(
+        data.wide_config(fields=fields),
+        data.wide_document(fields=fields),
+    )
+
+
+@benchmark('map_wide_unoptimized')
+def map_wide_unoptimized(scale):
+    fields = data.scaled(50, scale)
+    return _mapper_case(
+        data.wide_config(fields=fields),
+        data.wide_document(fields=fields),
+        optimize=False,
+    )
+
+
+@benchmark('map_deep')
+def map_deep(scale):
+    depth = data.scaled(30, scale)
+    return _mapper_case(
+        data.deep_config(depth=depth),
+        data.deep_document(depth=depth),
+    )
+
+
+@benchmark('map_wide_select')
+def map_wide_select(scale):
+    fields = data.scaled(50, scale)
+    mapper = SimpleMapper(data.wide_config(fields=fields))
+    document = data.wide_document(fields=fields)
+    # endpoint which needs only a handful of keys
+    keys = sorted(mapper.config)[:5]
+    return Case(
+        lambda: mapper.map_data(document, only=keys),
+        number=100,
+        info={'keys': len(keys)},
+    )
+
+
+@benchmark('map_wide_lazy_sparse')
+def map_wide_lazy_sparse(scale):
+    fields = data.scaled(50, scale)
+    mapper = SimpleMapper(data.wide_config(fields=fields))
+    document = data.wide_document(fields=fields)
+    # consumer which reads only a handful of keys
+    keys = sorted(mapper.config)[:5]
+
+    def _map():
+        output = mapper.map_lazy(document)
+        return [output[i] for i in keys]
+
+    return Case(_map, number=10, info={'keys': len(keys)})
+
+
+@benchmark('map_small_latency')
+def map_small_latency(scale):
+    return _mapper_case(
+        data.wide_config(sections=2, fields=5),
+        data.wide_document(sections=2, fields=5),
+        number=1000,
+    )
+
+
+@benchmark('map_find_heavy')
+def map_find_heavy(scale):
+    count = data.scaled(500, scale)
+    return _mapper_case(
+        data.find_config(lookups=data.scaled(100, scale), count=count),
+        data.records_document(count=count),
+    )
+
+
+@benchmark('map_list_config_heavy')
+def map_list_config_heavy(scale):
+    return _mapper_case(
+        data.list_config(),
+        data.records_document(count=data.scaled(2000, scale)),
+        memory=True,
+    )
+
+
+def _repeated_records(scale):
+    # many structurally identical elements such as repeated line items
+    unique = data.records(20)
+    count = data.scaled(2000, scale)
+    return {'records': [dict(unique[i % len(unique)]) for i in range(count)]}
+
+
+@benchmark('map_list_repeated')
+def map_list_repeated(scale):
+    return _mapper_case(data.list_config(), _repeated_records(scale))
+
+
+@benchmark('map_list_repeated_memoized')
+def map_list_repeated_memoized(scale):
+    return _mapper_case(
+        data.list_config(),
+        _repeated_records(scale),
+        memoize_list_elements=True,
+    )
+
+
+@benchmark('remap_list_element')
+def remap_list_element(scale):
+    mapper = SimpleMapper(data.list_config())
+    document = data.records_document(count=data.scaled(2000, scale))
+    previous = mapper.map_data(document)
+    changed = [('records', len(document['records']) // 2, 'amount')]
+    return Case(
+        lambda: mapper.remap(previous, document, changed),
+        number=10,
+    )
+
+
+@benchmark('map_fan_out')
+def map_fan_out(scale):
+    return _mapper_case(
+        data.fan_out_config(),
+        data.records_document(count=data.scaled(2000, scale)),
+    )
+
+
+@benchmark('map_fan_out_list_config')
+def map_fan_out_list_config(scale):
+    return _mapper_case(
+        data.fan_out_list_config(),
+        data.records_document(count=data.scaled(2000, scale)),
+    )
+
+
+@benchmark('map_missing_keys')
+def map_missing_keys(scale):
+    fields = data.scaled(50, scale)
+    return _mapper_case(
+        data.missing_config(fields=fields),
+        data.wide_document(fields=fields),
+        fail_mode='default',
+        default=None,
+    )
+
+
+@benchmark('batch_throughput')
+def batch_throughput(scale):
+    fields = data.scaled(10, scale)
+    config = data.wide_config(sections=5, fields=fields)
+    documents = [
+        data.wide_document(sections=5, fields=fields, seed=i)
+        for i in range(data.scaled(500, scale))
+    ]
+    mapper = SimpleMapper(config)
+
+    def _map():
+        return [mapper.map_data(i) for i in documents]
+
+    return Case(
+        _map,
+        memory=True,
+        info={'documents': len(documents), 'expressions': len(config)},
+    )
+
+
+@benchmark('records_throughput')
+def records_throughput(scale):
+    fields = data.scaled(10, scale)
+    config = data.wide_config(sections=5, fields=fields)
+    documents = [
+        data.wide_document(sections=5, fields=fields, seed=i)
+        for i in range(data.scaled(500, scale))
+    ]
+    mapper = SimpleMapper(config)
+    return Case(
+        lambda: list(mapper.map_records(documents, kind='namedtuple')),
+        memory=True,
+        info={'documents': len(documents), 'expressions': len(config)},
+    )
+
+
+@benchmark('columnar_throughput')
+def columnar_throughput(scale):
+    fields = data.scaled(10, scale)
+    config = data.wide_config(sections=5, fields=fields)
+    documents = [
+        data.wide_document(sections=5, fields=fields, seed=i)
+        for i in range(data.scaled(500, scale))
+    ]
+    mapper = SimpleMapper(config)
+    return Case(
+        lambda: mapper.map_columnar(documents),
+        memory=True,
+        info={'documents': len(documents), 'expressions': len(config)},
+    )
+
+
+@benchmark('serialize_dumps')
+def serialize_dumps(scale):
+    mapper = SimpleMapper(data.list_config())
+    document = data.records_document(count=data.scaled(2000, scale))
+    return Case(
+        lambda: json.dumps(mapper.map_data(document)),
+        number=3,
+        memory=True,
+    )
+
+
+@benchmark('serialize_direct')
+def serialize_direct(scale):
+    mapper = SimpleMapper(data.list_config())
+    document = data.records_document(count=data.scaled(2000, scale))
+    return Case(
+        lambda: mapper.map_to_json(document),
+        number=3,
+        memory=True,
+    )
+
+
+def _sparse_decode_setup(scale):
+    # mapper which references about 10% of the document
+    mapper = SimpleMapper(data.find_config(
+        lookups=data.scaled(10, scale),
+        count=data.scaled(500, scale),
+    ))
+    document = data.records_document(count=data.scaled(500, scale))
+    document.update(data.wide_document(fields=data.scaled(50, scale)))
+    return mapper, json.dumps(document)
+
+
+@benchmark('decode_full')
+def decode_full(scale):
+    mapper, text = _sparse_decode_setup(scale)
+    return Case(
+        lambda: mapper.map_data(json.loads(text)),
+        number=10,
+        memory=True,
+        info={'bytes': len(text)},
+    )
+
+
+@benchmark('decode_projected')
+def decode_projected(scale):
+    mapper, text = _sparse_decode_setup(scale)
+    decoder = mapper.projected_decoder()
+    return Case(
+        lambda: mapper.map_data(decoder(text)),
+        number=10,
+        memory=True,
+        info={'bytes': len(text)},
+    )
+
+
+def _lazy_sparse_setup(scale):
+    # mapper which references a few fields next to a large unreferenced list
+    fields = data.scaled(50, scale)
+    mapper = SimpleMapper(data.wide_config(sections=2,
+                                           fields=min(5, fields)))
+    document = data.records_document(count=data.scaled(2000, scale))
+    document.update(data.wide_document(fields=fields))
+    return mapper, json.dumps(document)
+
+
+def _lazy_dense_setup(scale):
+    # mapper which references every record
+    mapper = SimpleMapper(data.list_config())
+    document = data.records_document(count=data.scaled(500, scale))
+    return mapper, json.dumps(document)
+
+
+def _full_case(setup, scale):
+    mapper, text = setup(scale)
+    return Case(
+        lambda: mapper.map_data(json.loads(text)),
+        number=10,
+        memory=True,
+        info={'bytes': len(text)},
+    )
+
+
+def _lazy_case(setup, scale):
+    mapper, text = setup(scale)
+    text = text.encode('utf-8')
+    return Case(
+        lambda: lazyjson.materialize(mapper.map_data(lazyjson.loads(text))),
+        number=10,
+        memory=True,
+        info={'bytes': len(text)},
+    )
+
+
+@benchmark('decode_sparse_full')
+def decode_sparse_full(scale):
+    return _full_case(_lazy_sparse_setup, scale)
+
+
+@benchmark('decode_sparse_lazy')
+def decode_sparse_lazy(scale):
+    return _lazy_case(_lazy_sparse_setup, scale)
+
+
+@benchmark('decode_dense_full')
+def decode_dense_full(scale):
+    return _full_case(_lazy_dense_setup, scale)
+
+
+@benchmark('decode_dense_lazy')
+def decode_dense_lazy(scale):
+    return _lazy_case(_lazy_dense_setup, scale)
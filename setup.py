@@ -36,8 +36,16 @@ setup(
     long_description='\n\n'.join([readme, history, authors, licence]),
     url='https://github.com/dealertrack/simplepath',
     license='MIT',
-    packages=find_packages(exclude=['tests', 'tests.*']),
+    packages=find_packages(exclude=['tests', 'tests.*', 'benchmarks']),
     install_requires=requirements,
+    extras_require={
+        'numpy': ['numpy'],
+    },
+    entry_points={
+        'console_scripts': [
+            'simplepath = simplepath.cli:main',
+        ],
+    },
     test_suite='tests',
     tests_require=test_requirements,
     keywords=' '.join([
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import sys
+
+from .cli import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Aggregation lookups over lists.
+
+Aggregations are applied either to a list of values or, when a field
+is given, to values of the field of all list elements::
+
+    SimpleMapper({
+        'total': 'fees.<sum:amount>',
+        'count': 'fees.<count>',
+        'largest': 'fees.<max:amount>',
+        'average': 'fees.<mean:amount>',
+        'order_totals': 'orders.<*>.items.<sum:amount>',
+    })
+
+Values are aggregated in a single pass with Python built-ins which
+preserve value types hence for example sums of ``Decimal`` values
+(see ``<as_type:decimal>``) remain exact. Values of the same field of
+the same list are extracted once within a mapper call and are shared
+by all aggregations of the field.
+
+When NumPy is installed and the aggregated node is already a numeric
+NumPy array, such as one provided by a custom lookup or side input,
+it is aggregated with vectorized NumPy reductions. Python lists are
+not converted to arrays since the conversion costs more than
+aggregating them with built-ins.
+"""
+from __future__ import division, unicode_literals
+
+from .lazyjson import LazyArray
+from .lookups import BaseLookup
+from .projection import ANY, PathNode
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+def is_numeric_array(node):
+    return (numpy is not None and
+            isinstance(node, numpy.ndarray) and
+            node.dtype.kind in 'biuf')
+
+
+class AggregateLookup(BaseLookup):
+    opaque = False
+
+    def config(self, field=None):
+        self.field = field
+
+    def values(self, nodes, extra=None):
+        """
+        Get values of the field of all nodes
+        or the nodes themselves when no field is given.
+        """
+        if is_numeric_array(nodes) and self.field is None:
+            return nodes
+        if not isinstance(nodes, (list, tuple, LazyArray)):
+            raise TypeError('Cannot aggregate {}'.format(type(nodes)))
+        if self.field is None:
+            return nodes
+
+        def extract():
+            # reference to the nodes keeps their id() from being reused
+            return nodes, [node[self.field] for node in nodes]
+
+        return self.cached(extra, (id(nodes), self.field), extract,
+                           namespace=AggregateLookup)[1]
+
+    def aggregate(self, values):
+        raise NotImplementedError
+
+    def aggregate_array(self, array):
+        raise NotImplementedError
+
+    def __call__(self, nodes, extra=None):
+        values = self.values(nodes, extra)
+        if is_numeric_array(values):
+            return self.aggregate_array(values).item()
+        return self.aggregate(values)
+
+    def project(self, node):
+        node = node.child(ANY)
+        if self.field is not None:
+            node.child(self.field).full = True
+        # aggregated value is not part of the data
+        return PathNode()
+
+    def repr(self):
+        if self.field is None:
+            return ''
+        return 'field="{}"'.format(self.field)
+
+
+class SumLookup(AggregateLookup):
+    """
+    Sum values in the list.
+    Example: To get total amount of all fees, do
+    fees.<sum:amount>
+    """
+
+    def aggregate(self, values):
+        return sum(values)
+
+    def aggregate_array(self, array):
+        return array.sum()
+
+
+class CountLookup(AggregateLookup):
+    """
+    Count elements in the list or, when a field is given,
+    elements where the field is present and is not ``None``.
+    Example: To count fees with an amount, do
+    fees.<count:amount>
+    """
+
+    def __call__(self, nodes, extra=None):
+        if is_numeric_array(nodes):
+            return len(nodes)
+        if not isinstance(nodes, (list, tuple, LazyArray)):
+            raise TypeError('Cannot aggregate {}'.format(type(nodes)))
+        if self.field is None:
+            return len(nodes)
+        return sum(1 for node in nodes if node.get(self.field) is not None)
+
+
+class MinLookup(AggregateLookup):
+    """
+    Get minimum value in the list.
+    Example: To get the smallest fee amount, do
+    fees.<min:amount>
+    """
+
+    def aggregate(self, values):
+        return min(values)
+
+    def aggregate_array(self, array):
+        return array.min()
+
+
+class MaxLookup(AggregateLookup):
+    """
+    Get maximum value in the list.
+    Example: To get the largest fee amount, do
+    fees.<max:amount>
+    """
+
+    def aggregate(self, values):
+        return max(values)
+
+    def aggregate_array(self, array):
+        return array.max()
+
+
+class MeanLookup(AggregateLookup):
+    """
+    Get arithmetic mean of values in the list.
+    Example: To get the average fee amount, do
+    fees.<mean:amount>
+
+    Mean of ``Decimal`` values is ``Decimal``.
+    """
+
+    def aggregate(self, values):
+        if not values:
+            raise ValueError('Cannot get mean of an empty list')
+        return sum(values) / len(values)
+
+    def aggregate_array(self, array):
+        if not len(array):
+            raise ValueError('Cannot get mean of an empty list')
+        return array.mean()
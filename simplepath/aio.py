@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Asynchronous mapping with awaitable lookups.
+
+Lookups which enrich data from databases or remote caches can return
+awaitables (coroutines or futures) instead of values. Such lookups
+are either coroutine functions or set ``asynchronous = True``::
+
+    class CustomerLookup(BaseLookup):
+        asynchronous = True
+
+        def __call__(self, node, extra=None):
+            return database.fetch_customer(node)  # awaitable
+
+    class MyMapper(AsyncMapper):
+        lookup_registry = my_registry
+        config = {
+            'name': 'customer_id.<customer>.name',
+        }
+
+    output = await MyMapper.map_data(data)
+
+Mapping uses the running event loop. When mapping is started outside
+of a running loop, the loop has to be passed explicitly::
+
+    future = MyMapper.map_data(data, loop=loop)
+    output = loop.run_until_complete(future)
+
+All config nodes start evaluating right away and synchronous lookups
+are called inline exactly as in ``Mapper``. Evaluation of an expression
+is only suspended at asynchronous lookups so independent config nodes
+wait on their awaitables concurrently (see ``simplepath.deferred``).
+At most ``concurrency`` awaitables are awaited at the same time.
+Batched lookups are dispatched on the next event loop iteration.
+
+Since awaitables resolve while other nodes are mapped, ``AsyncMapper``
+does not optimize configs into shared lookup table lookups.
+Metrics, slow document capture and memoization are not supported.
+Synchronous entry points such as ``map_records`` or ``map_to_json``
+raise ``TypeError`` since they cannot await lookup values.
+
+This module requires ``asyncio`` and therefore Python 3.
+"""
+from __future__ import unicode_literals
+from collections import deque
+
+import six
+
+from .batching import Batcher
+from .deferred import Deferred
+from .mapper import MapperBase, MapperMeta
+
+try:
+    import asyncio
+except ImportError:  # pragma: no cover
+    asyncio = None
+
+
+def get_loop(loop=None):
+    """
+    Get explicitly provided or currently running event loop.
+    """
+    if loop is not None:
+        return loop
+    try:
+        return asyncio.get_running_loop()
+    except AttributeError:  # pragma: no cover
+        # Python 3.6
+        loop = asyncio._get_running_loop()
+        if loop is None:
+            raise RuntimeError('no running event loop')
+        return loop
+
+
+def not_supported(name):
+    def method(*args, **kwargs):
+        raise TypeError(
+            '{} is not supported by AsyncMapper since it cannot await '
+            'lookup values. Use map_data or map_concurrently instead.'
+            ''.format(name)
+        )
+    method.__name__ = str(name)
+    return method
+
+
+class Limiter(object):
+    """
+    Limits number of concurrently awaited awaitables.
+
+    Coroutines which are over the limit are queued
+    and are not started until others finish.
+    """
+
+    def __init__(self, limit=None, loop=None):
+        self.limit = limit
+        self.loop = loop
+        self.running = 0
+        self.queue = deque()
+
+    def submit(self, awaitable, callback):
+        if self.limit and self.running >= self.limit:
+            self.queue.append((awaitable, callback))
+        else:
+            self.start(awaitable, callback)
+
+    def start(self, awaitable, callback):
+        try:
+            future = asyncio.ensure_future(awaitable, loop=self.loop)
+        except Exception as e:
+            return callback(None, e)
+        self.running += 1
+        future.add_done_callback(lambda f: self.done(f, callback))
+
+    def done(self, future, callback):
+        self.running -= 1
+        if self.queue:
+            self.start(*self.queue.popleft())
+
+        # callbacks are expected to never raise since exceptions
+        # would only be logged by the event loop
+        if future.cancelled():
+            return callback(None, asyncio.CancelledError())
+        error = future.exception()
+        if error is not None:
+            return callback(None, error)
+        callback(future.result(), None)
+
+
+class AsyncMapperBase(MapperBase):
+    """
+    Base asynchronous mapper class.
+    """
+    optimize = False
+    # max number of concurrently awaited lookups. None is unlimited
+    concurrency = 10
+
+    def __init__(self, limiter=None, batcher=None, loop=None):
+        super(AsyncMapperBase, self).__init__()
+        self.limiter = limiter
+        self.batcher = batcher
+        self.loop = loop
+
+    # synchronous entry points would return awaitables
+    # of asynchronous lookups in place of their values
+    dump = not_supported('dump')
+    lazy = not_supported('lazy')
+    to_record = not_supported('to_record')
+    map_records = classmethod(not_supported('map_records'))
+    map_columnar = classmethod(not_supported('map_columnar'))
+    remap = classmethod(not_supported('remap'))
+    map_many = classmethod(not_supported('map_many'))
+    map_stream = classmethod(not_supported('map_stream'))
+    map_json_file = classmethod(not_supported('map_json_file'))
+
+    @classmethod
+    def map_data(cls, data, only=None, loop=None):
+        """
+        Map data asynchronously.
+
+        Args:
+            data: data to be mapped
+            only: output paths to map. See :meth:`select`.
+            loop: event loop to map data in.
+                Running event loop is used by default.
+
+        Returns:
+            Future of the mapped data.
+        """
+        if only is not None:
+            cls = cls.select(only)
+        return cls(loop=loop)(data)
+
+    @classmethod
+    def map_concurrently(cls, documents, loop=None):
+        """
+        Map multiple documents concurrently sharing the concurrency limit
+        and batches of batched lookups.
+
+        Returns:
+            Future of list of mapped documents in the same order.
+        """
+        loop = get_loop(loop)
+        limiter = Limiter(cls.concurrency, loop=loop)
+        batcher = Batcher(schedule=loop.call_soon)
+        futures = [cls(limiter, batcher, loop)(i) for i in documents]
+        if not futures:
+            future = loop.create_future()
+            future.set_result([])
+            return future
+        return asyncio.gather(*futures)
+
+    def __call__(self, data):
+        """
+        Map data asynchronously.
+
+        Returns:
+            Future of the mapped data.
+        """
+        if asyncio is None:  # pragma: no cover
+            raise RuntimeError('AsyncMapper requires asyncio')
+        if self.memoize_documents or self.memoize_list_elements:
+            raise TypeError('Memoization is not supported by AsyncMapper')
+
+        self.data = data
+        loop = get_loop(self.loop)
+        if self.limiter is None:
+            self.limiter = Limiter(self.concurrency, loop=loop)
+        if self.batcher is None:
+            self.batcher = Batcher(schedule=loop.call_soon)
+        future = loop.create_future()
+
+        def done(value, error):
+            if future.done():
+                return
+            if isinstance(error, asyncio.CancelledError):
+                future.cancel()
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+        Deferred(self, batcher=self.batcher, limiter=self.limiter).map_root(
+            done,
+        )
+        return future
+
+
+class AsyncMapper(six.with_metaclass(MapperMeta, AsyncMapperBase)):
+    """
+    Interface asynchronous mapper class.
+    """
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+DataLoader-style batching of expensive custom lookups.
+
+Lookups which are expensive per call, such as lookups into
+a reference store, can define ``batch_call`` which looks up
+many nodes at once::
+
+    class CustomerLookup(BaseLookup):
+        def __call__(self, node, extra=None):
+            return store.get_many([node])[0]
+
+        def batch_call(self, nodes):
+            return store.get_many(nodes)
+
+``batch_call`` receives unique nodes and must return results in the
+same order. A result which is an exception instance fails only that
+node so that fail modes apply per expression.
+
+When the mapper config uses batched lookups, all invocations of the
+same lookup (same lookup class and arguments) within a mapper call
+are collected while everything else is mapped and are then dispatched
+together. For example a batched lookup within a ``ListConfig``
+of 500 elements is called once instead of 500 times.
+``Mapper.map_many(documents, batch_size=100)`` additionally shares
+batches between documents. Since nodes are deduplicated by value,
+batched lookups only receive the node and not the ``extra`` context.
+"""
+from __future__ import unicode_literals
+import timeit
+from collections import OrderedDict
+
+from .deferred import Deferred
+
+
+def batch_key(node):
+    """
+    Get key by which identical nodes are deduplicated.
+
+    Type is included since for example ``1`` and ``True``
+    are equal but can be looked up differently.
+    Unhashable nodes are not deduplicated.
+    """
+    try:
+        hash(node)
+    except TypeError:
+        return id(node)
+    return type(node), node
+
+
+class Batch(object):
+    """
+    Pending invocations of a single batched lookup.
+    """
+
+    def __init__(self, lookup):
+        self.lookup = lookup
+        self.pending = OrderedDict()
+
+    def load(self, node, callback):
+        key = batch_key(node)
+        if key in self.pending:
+            self.pending[key][1].append(callback)
+        else:
+            self.pending[key] = (node, [callback])
+
+    def dispatch(self):
+        pending, self.pending = list(self.pending.values()), OrderedDict()
+        nodes = [node for node, _ in pending]
+
+        try:
+            results = list(self.lookup.batch_call(nodes))
+            if len(results) != len(nodes):
+                raise ValueError(
+                    '{}.batch_call returned {} results for {} nodes'
+                    ''.format(type(self.lookup).__name__,
+                              len(results), len(nodes))
+                )
+        except Exception as e:
+            results = [e] * len(nodes)
+
+        for (node, callbacks), result in zip(pending, results):
+            error = result if isinstance(result, Exception) else None
+            value = None if error is not None else result
+            for callback in callbacks:
+                callback(value, error)
+
+
+class Batcher(object):
+    """
+    Collects pending invocations of batched lookups.
+
+    Args:
+        schedule: function which schedules dispatching of batches
+            such as ``loop.call_soon``. When not provided, batches
+            have to be dispatched manually.
+    """
+
+    def __init__(self, schedule=None):
+        self.schedule = schedule
+        self.scheduled = False
+        self.batches = OrderedDict()
+
+    def load(self, lookup, node, callback):
+        group = type(lookup), lookup.expression
+        batch = self.batches.get(group)
+        if batch is None:
+            batch = self.batches[group] = Batch(lookup)
+        batch.load(node, callback)
+
+        if self.schedule is not None and not self.scheduled:
+            self.scheduled = True
+            self.schedule(self.dispatch)
+
+    def dispatch(self):
+        """
+        Dispatch all pending batches.
+
+        Callbacks of dispatched batches can load more nodes
+        which are dispatched in the next round.
+        """
+        self.scheduled = False
+        for batch in list(self.batches.values()):
+            if batch.pending:
+                batch.dispatch()
+
+    def __bool__(self):
+        return any(i.pending for i in self.batches.values())
+
+    __nonzero__ = __bool__
+
+
+def map_batched(mappers, elapsed=None):
+    """
+    Map data of mapper instances together dispatching
+    all invocations of batched lookups at once.
+
+    Args:
+        mappers: mapper instances with data to map
+        elapsed (list): when given, filled with seconds it took
+            to map each document since the start of the batch
+
+    Returns:
+        List of ``(output, error)`` tuples in the same order.
+    """
+    batcher = Batcher()
+    results = [None] * len(mappers)
+    start = timeit.default_timer()
+
+    def store(index):
+        def done(value, error):
+            results[index] = value, error
+            if elapsed is not None:
+                elapsed[index] = timeit.default_timer() - start
+        return done
+
+    for index, mapper in enumerate(mappers):
+        Deferred(mapper, batcher=batcher).map_root(store(index))
+
+    while batcher:
+        batcher.dispatch()
+
+    return results
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Capture of slow mapped documents for offline reproduction.
+
+When mapping of a document takes longer than a threshold, the document
+(or its size-capped sample) is written into a spool directory together
+with the mapper identity and timing breakdown per top-level config key::
+
+    class MyMapper(Mapper):
+        config = {...}
+        slow_capture = SlowDocumentCapture('/tmp/spool', threshold=0.5)
+
+Captured cases can be replayed under the profiler::
+
+    $ python -m simplepath.capture /tmp/spool/*.json
+
+Mappers which cannot be imported by their reference, such as ones
+created by ``SimpleMapper``, have to be given via ``--mapper``.
+Documents with values which are not JSON serializable, such as
+``Decimal``, are not captured since they could not be reproduced.
+"""
+from __future__ import print_function, unicode_literals
+import argparse
+import cProfile
+import datetime
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import uuid
+
+import six
+
+from .lazyjson import materialize
+from .utils import import_string
+
+
+log = logging.getLogger(__name__)
+
+
+def mapper_reference(mapper_class):
+    """
+    Get importable ``module:Class`` reference of the mapper class.
+
+    Returns:
+        Reference or ``None`` when it does not import the same class
+        such as for mappers created by ``SimpleMapper``.
+    """
+    reference = '{}:{}'.format(
+        mapper_class.__module__,
+        getattr(mapper_class, '__qualname__', mapper_class.__name__),
+    )
+    try:
+        if import_string(reference) is mapper_class:
+            return reference
+    except Exception:
+        pass
+    return None
+
+
+def dumps(data):
+    """
+    Serialize the document.
+
+    Raises:
+        TypeError: when the document has values which are not
+            JSON serializable since they could not be reproduced
+    """
+    return json.dumps(data, sort_keys=True)
+
+
+def truncate_lists(data, limit):
+    """
+    Recursively truncate all lists within the data to at most
+    ``limit`` elements.
+    """
+    if isinstance(data, dict):
+        return {k: truncate_lists(v, limit) for k, v in data.items()}
+    elif isinstance(data, (list, tuple)):
+        return [truncate_lists(i, limit) for i in data[:limit]]
+    return data
+
+
+def sample_document(data, max_bytes):
+    """
+    Get serialized document which fits within ``max_bytes``.
+
+    If the document is too large, lists within the document
+    are progressively truncated until it fits.
+
+    Returns:
+        Tuple of serialized document (or ``None`` if even
+        the most truncated sample does not fit) and whether
+        the document was truncated.
+    """
+    # lazily decoded documents are captured with their values
+    data = materialize(data)
+    serialized = dumps(data)
+    if max_bytes is None or len(serialized) <= max_bytes:
+        return serialized, False
+
+    limit = 64
+    while limit:
+        serialized = dumps(truncate_lists(data, limit))
+        if len(serialized) <= max_bytes:
+            return serialized, True
+        limit //= 2
+
+    return None, True
+
+
+class SlowDocumentCapture(object):
+    """
+    Spool for documents which took longer than ``threshold`` seconds
+    to map.
+
+    Args:
+        spool_dir (str): directory where captured cases are written
+        threshold (float): latency threshold in seconds
+        max_bytes (int): max size of serialized document. Larger
+            documents are sampled by truncating lists within them.
+        max_files (int): max number of cases in the spool directory
+            after which new cases are not captured
+    """
+
+    def __init__(self, spool_dir, threshold, max_bytes=None, max_files=None):
+        self.spool_dir = spool_dir
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+
+    def is_slow(self, elapsed):
+        return elapsed >= self.threshold
+
+    def is_full(self):
+        if self.max_files is None:
+            return False
+        return len(os.listdir(self.spool_dir)) >= self.max_files
+
+    def capture(self, mapper, data, elapsed, timings):
+        """
+        Write the case into the spool directory.
+
+        Errors, such as documents with values which are not JSON
+        serializable, are logged and never propagated since
+        capturing must not affect the mapping itself.
+
+        Returns:
+            Path of the written case or ``None`` when not captured.
+        """
+        try:
+            if not os.path.isdir(self.spool_dir):
+                os.makedirs(self.spool_dir)
+            if self.is_full():
+                return None
+
+            document, truncated = sample_document(data, self.max_bytes)
+            case = {
+                'mapper': mapper_reference(mapper.__class__),
+                'captured_at': datetime.datetime.utcnow().isoformat(),
+                'elapsed': elapsed,
+                'timings': timings,
+                'truncated': truncated,
+                'document': document,
+            }
+
+            name = '{}-{}.json'.format(
+                datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%S'),
+                uuid.uuid4().hex,
+            )
+            path = os.path.join(self.spool_dir, name)
+            tmp = path + '.tmp'
+            with io.open(tmp, 'w', encoding='utf-8') as fid:
+                fid.write(six.text_type(json.dumps(case, indent=2)))
+            os.rename(tmp, path)
+            return path
+
+        except Exception:
+            log.exception('Could not capture slow document of %s',
+                          mapper.__class__)
+            return None
+
+
+def load_case(path):
+    with io.open(path, 'r', encoding='utf-8') as fid:
+        case = json.load(fid)
+    if case['document'] is not None:
+        case['document'] = json.loads(case['document'])
+    return case
+
+
+def replay(path, mapper=None, profile=True):
+    """
+    Rerun the captured case against the current mapper plan.
+
+    Args:
+        path (str): path of the captured case
+        mapper: mapper class to use. By default mapper
+            is imported by its captured reference.
+        profile (bool): whether to run mapping under ``cProfile``
+
+    Returns:
+        Tuple of mapped output and ``pstats.Stats``
+        (``None`` when not profiled)
+    """
+    case = load_case(path)
+    if case['document'] is None:
+        raise ValueError(
+            'Case "{}" does not include the document since it did not '
+            'fit within the max size'.format(path)
+        )
+
+    if mapper is None:
+        if case['mapper'] is None:
+            raise ValueError(
+                'Case "{}" was captured from a mapper which cannot be '
+                'imported. Please provide the mapper to replay it with.'
+                ''.format(path)
+            )
+        mapper = import_string(case['mapper'])
+
+    if not profile:
+        return mapper.map_data(case['document']), None
+
+    profiler = cProfile.Profile()
+    output = profiler.runcall(mapper.map_data, case['document'])
+    return output, pstats.Stats(profiler, stream=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m simplepath.capture',
+        description='Replay captured slow documents under the profiler',
+    )
+    parser.add_argument('cases', nargs='+',
+                        help='paths of captured cases')
+    parser.add_argument('--mapper',
+                        help='"module:Class" mapper to use instead of '
+                             'the captured one')
+    parser.add_argument('--sort', default='cumulative',
+                        help='profile stats sort key')
+    parser.add_argument('--limit', default=25, type=int,
+                        help='number of profile stats lines to print')
+    args = parser.parse_args(argv)
+
+    mapper = import_string(args.mapper) if args.mapper else None
+
+    for path in args.cases:
+        case = load_case(path)
+        print('{} ({} captured in {:.6f} sec)'.format(
+            path, case['mapper'], case['elapsed'],
+        ), file=sys.stderr)
+        _, stats = replay(path, mapper=mapper)
+        stats.sort_stats(args.sort).print_stats(args.limit)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Command-line bulk mapper.
+
+Maps JSON Lines documents from files or stdin with either an importable
+mapper class or a mapper config stored in a JSON/YAML file and writes
+mapped documents as JSON Lines::
+
+    $ python -m simplepath myapp.mappers:MyMapper input.jsonl > output.jsonl
+    $ cat input.jsonl | simplepath config.yaml --workers 4 --unordered
+
+Documents are mapped in parallel by worker processes. Each worker loads
+the mapper once on startup so only JSON text is sent between processes.
+Throughput and error counts are reported to stderr at the end.
+"""
+from __future__ import division, print_function, unicode_literals
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import sys
+import timeit
+
+import six
+
+from .utils import import_string
+
+
+CONFIG_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+# mapper used by the current (worker) process
+_mapper = None
+
+
+def load_config(path):
+    with io.open(path, 'r', encoding='utf-8') as fid:
+        if path.endswith('.json'):
+            return json.load(fid)
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(
+                'PyYAML is required for loading YAML config "{}"'
+                ''.format(path)
+            )
+        return yaml.safe_load(fid)
+
+
+def load_mapper(reference):
+    """
+    Load mapper either by ``module:Class`` reference or
+    from JSON/YAML config file with the mapper config.
+    """
+    if reference.endswith(CONFIG_EXTENSIONS) and os.path.exists(reference):
+        from .mapper import SimpleMapper
+
+        return SimpleMapper(load_config(reference))
+    return import_string(reference)
+
+
+def initialize(reference):
+    global _mapper
+    _mapper = load_mapper(reference)
+
+
+def process(item):
+    """
+    Map a single JSON Lines document.
+
+    Args:
+        item (tuple): line number and line text
+
+    Returns:
+        Tuple of line number, mapped JSON text and error message.
+        Either mapped text or error is ``None``.
+    """
+    number, line = item
+    try:
+        output = _mapper.map_data(json.loads(line))
+        return number, json.dumps(output, default=six.text_type), None
+    except Exception as e:
+        return number, None, '{}: {}'.format(type(e).__name__, e)
+
+
+def iter_lines(paths, stdin=None):
+    """
+    Iterate over numbered non-empty lines of all input files.
+
+    ``-`` reads from stdin.
+    """
+    number = 0
+    for path in paths or ['-']:
+        if path == '-':
+            fid = stdin or sys.stdin
+        else:
+            fid = io.open(path, 'r', encoding='utf-8')
+        try:
+            for line in fid:
+                number += 1
+                if line.strip():
+                    yield number, line
+        finally:
+            if fid is not stdin and fid is not sys.stdin:
+                fid.close()
+
+
+def run(reference, lines, output, workers=1, ordered=True, chunk_size=100,
+        errors=None):
+    """
+    Map lines and write mapped documents into the output file object.
+
+    Args:
+        reference (str): mapper reference or config path
+        lines: iterable of ``(number, line)`` tuples
+        output: text file object for mapped JSON Lines
+        workers (int): number of worker processes. With single worker
+            documents are mapped within the current process.
+        ordered (bool): whether to preserve the input order in output.
+            Unordered output avoids waiting on slow documents.
+        chunk_size (int): number of lines sent to a worker at once
+        errors: text file object for error messages
+
+    Returns:
+        Tuple of mapped documents count, errors count
+        and elapsed seconds.
+    """
+    start = timeit.default_timer()
+    mapped = failed = 0
+    pool = None
+
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initialize, (reference,))
+        imap = pool.imap if ordered else pool.imap_unordered
+        results = imap(process, lines, chunk_size)
+    else:
+        initialize(reference)
+        results = six.moves.map(process, lines)
+
+    try:
+        for number, text, error in results:
+            if error is None:
+                output.write(text + '\n')
+                mapped += 1
+            else:
+                failed += 1
+                if errors is not None:
+                    errors.write('line {}: {}\n'.format(number, error))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return mapped, failed, timeit.default_timer() - start
+
+
+def main(argv=None, stdin=None, stdout=None, stderr=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m simplepath',
+        description='Map JSON Lines documents with a simplepath mapper',
+    )
+    parser.add_argument('mapper',
+                        help='"module:Class" mapper reference or path of '
+                             'JSON/YAML file with the mapper config')
+    parser.add_argument('inputs', nargs='*',
+                        help='JSON Lines input files. "-" or no files '
+                             'read from stdin')
+    parser.add_argument('-o', '--output',
+                        help='output file. stdout by default')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='number of worker processes. '
+                             '0 uses all CPUs. Default is %(default)s')
+    parser.add_argument('--unordered', action='store_true',
+                        help='write mapped documents as soon as they are '
+                             'mapped regardless of the input order')
+    parser.add_argument('--chunk-size', type=int, default=100,
+                        help='number of documents sent to workers at once. '
+                             'Default is %(default)s')
+    args = parser.parse_args(argv)
+
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    workers = args.workers or multiprocessing.cpu_count()
+
+    if args.output:
+        output = io.open(args.output, 'w', encoding='utf-8')
+    else:
+        output = stdout
+
+    try:
+        mapped, failed, elapsed = run(
+            args.mapper,
+            iter_lines(args.inputs, stdin=stdin),
+            output,
+            workers=workers,
+            ordered=not args.unordered,
+            chunk_size=args.chunk_size,
+            errors=stderr,
+        )
+    finally:
+        if output is not stdout:
+            output.close()
+
+    print(
+        'Mapped {} documents with {} errors in {:.3f} sec '
+        '({:.1f} documents/sec, {} workers)'
+        ''.format(mapped, failed, elapsed,
+                  (mapped + failed) / elapsed if elapsed else 0, workers),
+        file=stderr,
+    )
+    return 1 if failed else 0
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar mapping of document batches.
+
+Instead of producing an output dictionary per document, flat mapper
+configs (only expressions and values, no nested configs or lists)
+can map a batch of documents into a column per output key::
+
+    columns = MyMapper.map_columnar(documents)
+    columns['amount'].values  # [10, 0, 15] or numpy.array([10, 0, 15])
+    columns['amount'].mask    # [False, True, False]
+
+Mask marks values which were skipped or replaced by the default value
+due to the fail mode. Invocations of batched lookups of all documents
+of the batch are dispatched together. When NumPy is installed, columns where all
+present values are booleans, integers or floats are returned as typed
+NumPy arrays. NumPy is optional and otherwise Python lists are used.
+"""
+from __future__ import unicode_literals
+from collections import namedtuple
+
+import six
+
+from .exceptions import Skip
+from .expressions import Expression
+from .lut import LUT, Scratch
+from .mapper import Value
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+Column = namedtuple('Column', ['values', 'mask'])
+
+
+def column_dtype(values, mask):
+    """
+    Get NumPy dtype name of the column or ``None`` when the column
+    has non-numeric values and has to remain a list.
+    """
+    types = {type(v) for v, m in zip(values, mask) if not m}
+    if not types:
+        return None
+    if types == {bool}:
+        return 'bool'
+    if types <= set(six.integer_types):
+        return 'int64'
+    if types <= set(six.integer_types) | {float}:
+        return 'float64'
+    return None
+
+
+def to_array(values, mask):
+    """
+    Convert column values to a typed NumPy array when possible.
+    """
+    dtype = column_dtype(values, mask)
+    if dtype is None:
+        return Column(values, mask)
+
+    # masked values are filled in with zeros so that array can be typed
+    fill = {'bool': False, 'int64': 0, 'float64': 0.0}[dtype]
+    filled = [fill if m else v for v, m in zip(values, mask)]
+    try:
+        array = numpy.array(filled, dtype=dtype)
+    except OverflowError:
+        return Column(values, mask)
+    return Column(array, numpy.array(mask, dtype='bool'))
+
+
+def validate_flat(config):
+    for key, node in config.items():
+        if not isinstance(node, (Expression, Value)):
+            raise ValueError(
+                'Columnar mapping only supports flat configs with '
+                'expressions and values. "{}" is {}'
+                ''.format(key, type(node).__name__)
+            )
+
+
+def map_columnar(mapper, documents, use_numpy=None):
+    """
+    Map documents into columns.
+
+    Args:
+        mapper: mapper instance with a flat config
+        documents: iterable of documents to map
+        use_numpy (bool): whether numeric columns should be NumPy
+            arrays. By default NumPy is used when it is installed.
+
+    Returns:
+        Dictionary of ``Column`` per output key.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ValueError('NumPy is not installed')
+
+    config = mapper.config
+    validate_flat(config)
+    columns = {key: Column([], []) for key in config}
+    nodes = [
+        (node, columns[key].values.append, columns[key].mask.append)
+        for key, node in config.items()
+    ]
+
+    if config.batched():
+        map_batched(mapper, documents, nodes)
+        return finish(columns, use_numpy)
+
+    for document in documents:
+        mapper.data = document
+        # lut is per document since expressions are relative to it
+        lut = LUT()
+        context = mapper.get_lookup_context()
+        scratch = mapper.scratch = Scratch()
+
+        for node, add_value, add_mask in nodes:
+            if isinstance(node, Value):
+                add_value(node.value)
+                add_mask(False)
+                continue
+
+            data, node_lut = document, lut
+            if node.uses_side_input:
+                node_lut = mapper.side_input_view(node)
+                data = node_lut.data
+
+            try:
+                add_value(node.evaluate(data, super_root=document,
+                                        lut=node_lut, context=context,
+                                        scratch=scratch))
+                add_mask(False)
+            except Exception:
+                add_fallback(node, add_value, add_mask)
+
+    return finish(columns, use_numpy)
+
+
+def add_fallback(node, add_value, add_mask):
+    """
+    Add value of the failed expression according to its fail mode.
+
+    Must be called within the ``except`` block handling the error.
+    """
+    try:
+        add_value(node.fallback())
+    except Skip:
+        add_value(None)
+    add_mask(True)
+
+
+def map_batched(mapper, documents, nodes):
+    """
+    Map documents dispatching invocations of batched lookups
+    of all documents together.
+    """
+    from .batching import Batcher
+    from .deferred import Deferred
+
+    batcher = Batcher()
+    results = []
+
+    def store(result):
+        def done(value, error):
+            result[:] = value, error
+        return done
+
+    for document in documents:
+        # scratch and lut are per document hence so are mapper instances
+        instance = mapper.__class__()
+        instance.data = document
+        deferred = Deferred(instance, batcher=batcher)
+
+        for node, add_value, add_mask in nodes:
+            if isinstance(node, Value):
+                results.append((node, add_value, add_mask,
+                                [node.value, None]))
+                continue
+
+            data, lut = document, instance.lut
+            if node.uses_side_input:
+                lut = instance.side_input_view(node)
+                data = lut.data
+
+            result = []
+            results.append((node, add_value, add_mask, result))
+            deferred.evaluate(node, data, document, lut, store(result))
+
+    while batcher:
+        batcher.dispatch()
+
+    for node, add_value, add_mask, (value, error) in results:
+        if error is None:
+            add_value(value)
+            add_mask(False)
+            continue
+        try:
+            raise error
+        except Exception:
+            add_fallback(node, add_value, add_mask)
+
+
+def finish(columns, use_numpy):
+    """
+    Convert columns to NumPy arrays when requested.
+    """
+    if use_numpy:
+        columns = {k: to_array(*v) for k, v in columns.items()}
+    return columns
@@ -15,6 +15,10 @@ DELIMITERS = {
 # provided or provided as None
 NONE = type(str('None'), (object,), {'__init__': lambda self: None()})
 
+# placeholder of skipped values in outputs which cannot omit keys
+# such as tuple records
+SKIPPED = type(str('Skipped'), (object,), {})
+
 
 class FailMode(object):
     DEFAULT = 'default'
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+Deferred mapping in continuation-passing style.
+
+Instead of returning mapped values, mapping methods call
+``done(value, error)`` once the value is mapped which can happen
+either immediately or later when a lookup value becomes available.
+Lookup values are deferred either when:
+
+* lookup defines ``batch_call`` and batcher is provided.
+  See ``simplepath.batching``
+* lookup is asynchronous, returns an awaitable and limiter is provided.
+  See ``simplepath.aio``
+
+Evaluation of an expression is only suspended at deferred lookups so
+all other config nodes continue to be mapped. Identical expression
+prefixes within the same lookup table are only deferred once.
+"""
+from __future__ import unicode_literals
+import inspect
+
+import six
+
+from .exceptions import Skip
+from .expressions import Expression
+from .mapper import MapperConfig, MapperListConfig, Value
+
+
+# inspect helpers are not available on Python 2
+_isawaitable = getattr(inspect, 'isawaitable', lambda value: False)
+_iscoroutinefunction = getattr(
+    inspect, 'iscoroutinefunction', lambda func: False,
+)
+
+
+def is_batched(lookup):
+    return getattr(lookup, 'batch_call', None) is not None
+
+
+def is_asynchronous(lookup):
+    return bool(getattr(lookup, 'asynchronous', False) or
+                _iscoroutinefunction(lookup.__call__))
+
+
+def is_awaitable(value):
+    return _isawaitable(value)
+
+
+def compile_expression(expression):
+    """
+    Get full lookup chain of the expression, chain hashes of all lookups
+    and indexes of batched and asynchronous lookups.
+
+    Result is cached on the expression since configs are compiled once.
+    """
+    try:
+        return expression._deferred_plan
+    except AttributeError:
+        pass
+
+    # optimizer prefixes are evaluated eagerly hence full chain is used
+    chain = expression.full_chain
+    hashes = [
+        '.'.join(six.text_type(j.expression) for j in chain[:i + 1])
+        for i in range(len(chain))
+    ]
+    batched = frozenset(
+        i for i, lookup in enumerate(chain) if is_batched(lookup)
+    )
+    asynchronous = frozenset(
+        i for i, lookup in enumerate(chain) if is_asynchronous(lookup)
+    )
+    expression._deferred_plan = chain, hashes, batched, asynchronous
+    return expression._deferred_plan
+
+
+class Pending(object):
+    """
+    Lookup table placeholder of a value which is deferred.
+    """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def resolve(self, value, error):
+        for callback in self.callbacks:
+            callback(value, error)
+
+
+class Deferred(object):
+    """
+    Deferred mapping of a single mapper call.
+
+    Args:
+        mapper: mapper instance
+        batcher: ``simplepath.batching.Batcher`` which collects
+            calls of batched lookups
+        limiter: ``simplepath.aio.Limiter`` which awaits
+            awaitables returned by asynchronous lookups
+    """
+
+    def __init__(self, mapper, batcher=None, limiter=None):
+        self.mapper = mapper
+        self.batcher = batcher
+        self.limiter = limiter
+
+    def evaluate(self, node, data, super_root, lut, done,
+                 start=0, value=None):
+        """
+        Evaluate expression chain without applying the fail mode.
+        """
+        chain, hashes, batched, asynchronous = compile_expression(node)
+        value = data if start == 0 else value
+
+        for i in range(start, len(chain)):
+            chain_hash = hashes[i]
+            if chain_hash in lut:
+                value = lut[chain_hash]
+                if isinstance(value, Pending):
+                    value.callbacks.append(self.resume(
+                        node, data, super_root, lut, done, i + 1,
+                    ))
+                    return
+                continue
+
+            lookup = chain[i]
+            if i in batched and self.batcher is not None:
+                return self.batcher.load(lookup, value, self.guard(
+                    self.defer(lut, chain_hash, self.resume(
+                        node, data, super_root, lut, done, i + 1,
+                    )),
+                ))
+
+            extra = {
+                'root': data,
+                'super_root': super_root,
+                'lut': lut,
+                'context': self.mapper.get_lookup_context(),
+                'scratch': self.mapper.scratch,
+            }
+            try:
+                value = lookup(value, extra=extra)
+            except Exception as e:
+                return done(None, e)
+
+            if (i in asynchronous and self.limiter is not None and
+                    is_awaitable(value)):
+                return self.limiter.submit(value, self.guard(
+                    self.defer(lut, chain_hash, self.resume(
+                        node, data, super_root, lut, done, i + 1,
+                    )),
+                ))
+
+            lut[chain_hash] = value
+
+        done(value, None)
+
+    def resume(self, node, data, super_root, lut, done, start):
+        def callback(value, error):
+            if error is not None:
+                return done(None, error)
+            self.evaluate(node, data, super_root, lut, done,
+                          start=start, value=value)
+        return callback
+
+    def defer(self, lut, chain_hash, callback):
+        """
+        Mark chain value as pending in the lookup table.
+
+        Returns:
+            Callback which settles the pending value.
+        """
+        pending = lut[chain_hash] = Pending()
+        pending.callbacks.append(callback)
+
+        def settle(value, error):
+            if error is None:
+                lut[chain_hash] = value
+            else:
+                # failed prefix can be retried by other expressions
+                lut.pop(chain_hash, None)
+            pending.resolve(value, error)
+        return settle
+
+    def guard(self, callback):
+        """
+        Wrap continuation resumed by the batcher or limiter so that
+        no exception escapes into their callers such as event loop
+        callbacks. Escaped exceptions fail the whole mapping instead.
+        """
+        def guarded(value, error):
+            try:
+                callback(value, error)
+            except BaseException as e:
+                self.done(None, e)
+        return guarded
+
+    def with_fallback(self, node, done):
+        """
+        Wrap continuation to apply fail mode of the expression on errors.
+
+        Errors which are not exceptions such as cancellation
+        of awaited lookups on Python 3.8+ are always propagated.
+        """
+        def callback(value, error):
+            if error is None:
+                return done(value, None)
+            if not isinstance(error, Exception):
+                return done(None, error)
+            try:
+                try:
+                    raise error
+                except Exception:
+                    value = node.fallback()
+            except Exception as e:
+                return done(None, e)
+            if self.mapper.collector is not None:
+                self.mapper.collector.defaults += 1
+            done(value, None)
+        return callback
+
+    def map_expression(self, node, data, super_root, lut, done):
+        if node.uses_side_input:
+            lut = self.mapper.side_input_view(node)
+            data = lut.data
+        self.evaluate(node, data, super_root, lut,
+                      self.with_fallback(node, done))
+
+    def map_list_node(self, node, data, super_root, lut, done):
+        def callback(input_list, error):
+            if error is not None:
+                return done(None, error)
+            if input_list is None:
+                return done([], None)
+            # due to relative lookups, cannot use main lut
+            self.gather([
+                (node, value, super_root, {}) for value in input_list
+            ], self.map_config_node, done)
+
+        # please note that Skip is propagated here similar to
+        # MapperBase.map_list_node since map_config_node handles it
+        self.map_expression(node.root, data, super_root, lut, callback)
+
+    def map_config_node(self, node, data, super_root, lut, done):
+        output = {}
+        remaining = [len(node)]
+        failed = []
+
+        if not node:
+            return done(output, None)
+
+        def child(key):
+            def callback(value, error):
+                if failed:
+                    return
+                if error is None:
+                    output[key] = value
+                elif isinstance(error, Skip):
+                    output.pop(key, None)
+                    if self.mapper.collector is not None:
+                        self.mapper.collector.skips += 1
+                else:
+                    failed.append(error)
+                    return done(None, error)
+                remaining[0] -= 1
+                if not remaining[0]:
+                    done(output, None)
+            return callback
+
+        for key, child_node in node.items():
+            # placeholder preserves config order of the output keys
+            output[key] = None
+            self.map_node(child_node, data, super_root, lut, child(key))
+
+    def map_list(self, node, data, super_root, lut, done):
+        self.gather([
+            (i, data, super_root, lut) for i in node
+        ], self.map_node, done)
+
+    def gather(self, items, func, done):
+        """
+        Map all items with the mapping function into a list.
+        """
+        output = [None] * len(items)
+        remaining = [len(items)]
+        failed = []
+
+        if not items:
+            return done(output, None)
+
+        def item(index):
+            def callback(value, error):
+                if failed:
+                    return
+                if error is not None:
+                    failed.append(error)
+                    return done(None, error)
+                output[index] = value
+                remaining[0] -= 1
+                if not remaining[0]:
+                    done(output, None)
+            return callback
+
+        for index, args in enumerate(items):
+            func(*args, done=item(index))
+
+    def map_node(self, node, data, super_root, lut, done):
+        if isinstance(node, Value):
+            return done(node.value, None)
+
+        elif isinstance(node, MapperListConfig):
+            return self.map_list_node(node, data, super_root, lut, done)
+
+        elif isinstance(node, MapperConfig):
+            return self.map_config_node(node, data, super_root, lut, done)
+
+        elif isinstance(node, Expression):
+            return self.map_expression(node, data, super_root, lut, done)
+
+        elif isinstance(node, list):
+            return self.map_list(node, data, super_root, lut, done)
+
+        else:
+            raise TypeError(
+                '"{}" does not qualify for free ice-cream.'
+                ''.format(type(node))
+            )
+
+    def map_root(self, done):
+        mapper = self.mapper
+        self.done = done
+        try:
+            self.map_node(mapper.config, mapper.data, mapper.data,
+                          mapper.lut, done)
+        except Exception as e:
+            done(None, e)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Human-readable description of compiled mapper configs.
+
+This allows to see how the optimizer rewrote a config
+and to reason about the expected amount of work
+a mapper does per mapped document.
+"""
+from __future__ import unicode_literals
+from collections import OrderedDict
+
+from .constants import DELIMITERS
+from .expressions import Expression
+from .lookups import LUTLookup
+from .mapper import MapperConfig, MapperListConfig, Value
+
+
+def chain_hashes(chain):
+    """
+    Get LUT keys of all prefixes of the lookup chain
+    in the same format as used by ``Expression`` itself.
+    """
+    return [
+        DELIMITERS['expression'].join(i.expression for i in chain[:j + 1])
+        for j in range(len(chain))
+    ]
+
+
+class Namespace(object):
+    """
+    Group of expressions which share the same LUT during mapping.
+
+    Top-level config and all of its nested configs share a single
+    LUT whereas each ``ListConfig`` gets its own LUT per list element.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.expressions = []
+
+    def add(self, path, expression):
+        self.expressions.append((path, expression))
+
+    @property
+    def consumers(self):
+        consumers = OrderedDict()
+        for _, expression in self.expressions:
+            for chain_hash in chain_hashes(expression.full_chain):
+                consumers[chain_hash] = consumers.get(chain_hash, 0) + 1
+        return consumers
+
+    @property
+    def shared_prefixes(self):
+        return OrderedDict(
+            (k, v) for k, v in self.consumers.items() if v > 1
+        )
+
+    @property
+    def unoptimized_steps(self):
+        return sum(len(e.full_chain) for _, e in self.expressions)
+
+    @property
+    def optimized_steps(self):
+        return sum(len(e) for _, e in self.expressions)
+
+    @property
+    def evaluations(self):
+        # the runtime LUT guarantees each unique prefix
+        # is evaluated at most once regardless of optimization
+        return len(self.consumers)
+
+
+class PlanExplainer(object):
+    """
+    Walks compiled ``MapperConfig`` and renders its plan as text.
+    """
+
+    def __init__(self, config, name=None):
+        self.config = config
+        self.name = name
+        self.lines = []
+        self.namespaces = []
+        self.custom = []
+
+    def explain(self):
+        self.lines = []
+        self.namespaces = []
+        self.custom = []
+
+        optimized = getattr(self.config, 'optimized', False)
+        self.lines.append('Plan for {}{}'.format(
+            self.name or self.config.__class__.__name__,
+            ' (optimized)' if optimized else ' (not optimized)',
+        ))
+
+        namespace = self._namespace('document')
+        self._walk(self.config, '', namespace, 1)
+
+        self._render_shared_prefixes()
+        self._render_custom()
+        self._render_estimates()
+
+        return '\n'.join(self.lines)
+
+    def _namespace(self, name):
+        namespace = Namespace(name)
+        self.namespaces.append(namespace)
+        return namespace
+
+    def _line(self, level, text):
+        self.lines.append('{}{}'.format('  ' * level, text))
+
+    def _walk(self, node, path, namespace, level):
+        for key, value in node.items():
+            self._walk_node(
+                value,
+                '{}.{}'.format(path, key) if path else key,
+                namespace,
+                level,
+            )
+
+    def _walk_node(self, node, path, namespace, level):
+        if isinstance(node, Value):
+            self._line(level, '{}: value {!r}'.format(path, node.value))
+
+        elif isinstance(node, MapperListConfig):
+            self._line(level, '{}: list over "{}" (separate LUT per element)'
+                              ''.format(path, node.root.expression))
+            self._walk_expression(node.root, path + '<root>',
+                                  namespace, level + 1)
+            self._walk(node, path + '[]',
+                       self._namespace(path + '[]'), level + 1)
+
+        elif isinstance(node, MapperConfig):
+            self._line(level, '{}:'.format(path))
+            self._walk(node, path, namespace, level + 1)
+
+        elif isinstance(node, Expression):
+            self._walk_expression(node, path, namespace, level)
+
+        elif isinstance(node, list):
+            for i, value in enumerate(node):
+                self._walk_node(value, '{}[{}]'.format(path, i),
+                                namespace, level)
+
+    def _walk_expression(self, expression, path, namespace, level):
+        namespace.add(path, expression)
+
+        rewritten = expression and isinstance(expression[0], LUTLookup)
+        self._line(level, '{}: {}{}'.format(
+            path,
+            expression.expression,
+            ' (rewritten)' if rewritten else '',
+        ))
+        self._line(level + 1, 'chain: {}'.format(' -> '.join(
+            'LUT[{}]'.format(i.key) if isinstance(i, LUTLookup)
+            else i.expression
+            for i in expression
+        )))
+
+        for lookup in expression.full_chain:
+            if lookup.opaque:
+                self.custom.append((path, lookup))
+
+    def _render_shared_prefixes(self):
+        self.lines.append('Shared prefixes:')
+        found = False
+        for namespace in self.namespaces:
+            for chain_hash, count in namespace.shared_prefixes.items():
+                found = True
+                self._line(1, '[{}] {} ({} consumers)'
+                              ''.format(namespace.name, chain_hash, count))
+        if not found:
+            self._line(1, 'none')
+
+    def _render_custom(self):
+        self.lines.append('Custom lookups (opaque to optimization):')
+        for path, lookup in self.custom:
+            self._line(1, '{}: {} ({})'.format(
+                path, lookup.expression, lookup.__class__.__name__,
+            ))
+        if not self.custom:
+            self._line(1, 'none')
+
+    def _render_estimates(self):
+        self.lines.append('Estimated lookup steps:')
+        for namespace in self.namespaces:
+            self._line(1, '[{}] without optimization: {}, '
+                          'with optimization: {}, '
+                          'unique evaluations: {}{}'
+                          ''.format(namespace.name,
+                                    namespace.unoptimized_steps,
+                                    namespace.optimized_steps,
+                                    namespace.evaluations,
+                                    '' if namespace is self.namespaces[0]
+                                    else ' (per element)'))
+
+
+def explain(config, name=None):
+    """
+    Get text description of the compiled mapper config.
+    """
+    return PlanExplainer(config, name=name).explain()
@@ -5,10 +5,24 @@ import six
 
 from .constants import DEFAULT_FAIL_MODE, DELIMITERS, NONE, FailMode
 from .exceptions import Skip
+from .lookups import FanOutLookup, LUTLookup, SideInputLookup
 from .registry import registry
 
 
+def is_pure(lookup):
+    """
+    Whether the lookup value only depends on the node it is applied to.
+    """
+    if lookup.opaque:
+        return False
+    # fan-out applies the rest of the chain to the elements
+    return all(is_pure(i) for i in getattr(lookup, 'tail', ()))
+
+
 class Expression(list):
+    # whether expression is evaluated against mapper side input
+    uses_side_input = False
+
     def __init__(self,
                  expression,
                  default=NONE,
@@ -40,12 +54,47 @@ class Expression(list):
             do_compile=False,
         )
         copy.extend(iterable)
+        copy.uses_side_input = self.uses_side_input
         return copy
 
     @property
     def has_default(self):
         return self.default is not NONE
 
+    @property
+    def full_chain(self):
+        """
+        Lookup chain as it was compiled, before any of its prefixes
+        were replaced with ``LUTLookup`` by the mapper optimizer.
+        """
+        if self and isinstance(self[0], LUTLookup):
+            return self[0].chain + self[1:]
+        return list(self)
+
+    @property
+    def side_input_keys(self):
+        """
+        Chain hashes of the longest prefix of the chain which only
+        depends on the side input and can be cached across calls.
+
+        Opaque lookups can read anything such as ``super_root``
+        hence the prefix ends before the first of them.
+        """
+        try:
+            return self._side_input_keys
+        except AttributeError:
+            pass
+
+        keys = set()
+        chain = self.full_chain
+        for i, lookup in enumerate(chain):
+            if not is_pure(lookup):
+                break
+            keys.add('.'.join(six.text_type(j.expression)
+                              for j in chain[:i + 1]))
+        self._side_input_keys = frozenset(keys)
+        return self._side_input_keys
+
     def compile(self):
         expressions = self.expression.split(DELIMITERS['expression'])
 
@@ -95,41 +144,77 @@ class Expression(list):
 
             self.append(lookup)
 
-    def __call__(self, data, super_root=None, lut=None, context=None):
+        self[:] = self.fan_out(self, top=True)
+        self.uses_side_input = bool(self) and isinstance(self[0],
+                                                         SideInputLookup)
+
+    def fan_out(self, chain, top=False):
+        """
+        Fold lookups following the first ``<*>`` lookup into its tail.
+        """
+        for i, lookup in enumerate(chain):
+            if isinstance(lookup, FanOutLookup):
+                prefix = DELIMITERS['expression'].join(
+                    j.expression for j in chain[:i + 1]
+                )
+                lookup.fan_out(self.fan_out(chain[i + 1:]),
+                               prefix=prefix if top else None)
+                return chain[:i + 1]
+        return chain
+
+    def __call__(self, data, super_root=None, lut=None, context=None,
+                 scratch=None):
+        try:
+            return self.evaluate(data, super_root, lut, context, scratch)
+        except Exception:
+            return self.fallback()
+
+    def evaluate(self, data, super_root=None, lut=None, context=None,
+                 scratch=None):
+        """
+        Evaluate the expression chain without applying the fail mode.
+        Any errors from the lookups are propagated as-is.
+        """
         lut = lut if lut is not None else {}
         context = context if context is not None else {}
         super_root = super_root if super_root is not None else data
 
-        try:
-            node = data
-            for i, lookup in enumerate(self):
-                chain_hash = '{}'.format('.'.join(map(
-                    lambda l: six.text_type(l.expression),
-                    self[:i + 1]
-                )))
-                if chain_hash in lut:
-                    node = lut[chain_hash]
-                else:
-                    extra = {
-                        'root': data,
-                        'super_root': super_root,
-                        'lut': lut,
-                        'context': context,
-                    }
-                    node = lookup(node, extra=extra)
-                    lut[chain_hash] = node
-
-        except Exception:
-            if any((self.fail_mode == FailMode.FAIL,
-                    self.fail_mode == FailMode.DEFAULT
-                    and not self.has_default)):
-                raise
-            if self.fail_mode == FailMode.SKIP:
-                raise Skip
-            return self.default
-
-        else:
-            return node
+        node = data
+        for i, lookup in enumerate(self):
+            chain_hash = '{}'.format('.'.join(map(
+                lambda l: six.text_type(l.expression),
+                self[:i + 1]
+            )))
+            if chain_hash in lut:
+                node = lut[chain_hash]
+            else:
+                extra = {
+                    'root': data,
+                    'super_root': super_root,
+                    'lut': lut,
+                    'context': context,
+                    'scratch': scratch,
+                }
+                node = lookup(node, extra=extra)
+                lut[chain_hash] = node
+
+        return node
+
+    def fallback(self):
+        """
+        Get the value of the expression after its evaluation failed
+        according to the fail mode.
+
+        Must be called within the ``except`` block handling the error
+        since for ``fail`` fail mode the error is re-raised.
+        """
+        if any((self.fail_mode == FailMode.FAIL,
+                self.fail_mode == FailMode.DEFAULT
+                and not self.has_default)):
+            raise
+        if self.fail_mode == FailMode.SKIP:
+            raise Skip
+        return self.default
 
     def __repr__(self):
         return ('<{} expression="{}" chain=[{}]>'
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental re-mapping of updated documents.
+
+Compiled configs know which input paths each output key reads
+(see ``MapperConfig.dependencies``). When only a few input paths
+of a document change, only output keys which depend on them
+need to be mapped again::
+
+    output = MyMapper.map_data(data)
+    data['customer']['name'] = 'Jane'
+    output = MyMapper.remap(output, data, ['customer.name'])
+
+Changes within elements of lists mapped by ``ListConfig`` only map
+the changed elements again when the list is referenced by a plain
+key path and its length did not change. Output keys which use opaque
+custom lookups are always mapped again since they can read anything.
+"""
+from __future__ import unicode_literals
+from collections import OrderedDict
+
+import six
+
+from .batching import Batcher
+from .deferred import Deferred
+from .lookups import KeyLookup
+from .mapper import MapperListConfig
+from .projection import PathNode
+
+
+def normalize_path(path):
+    if isinstance(path, six.string_types):
+        return tuple(path.split('.'))
+    return tuple(six.text_type(i) for i in path)
+
+
+def static_path(expression):
+    """
+    Get input path of the expression when it only consists
+    of key lookups or ``None`` otherwise.
+    """
+    chain = expression.full_chain
+    if not all(type(i) is KeyLookup for i in chain):
+        return None
+    return tuple(i.key for i in chain)
+
+
+def _index(segment):
+    try:
+        index = int(segment)
+    except ValueError:
+        return None
+    return index if index >= 0 else None
+
+
+def element_indexes(node, changed, input_list, previous_list):
+    """
+    Get indexes of ``ListConfig`` elements affected by the changes.
+
+    Returns:
+        Set of indexes or ``None`` when the whole list
+        has to be mapped again.
+    """
+    root = static_path(node.root)
+    if root is None:
+        return None
+    if not isinstance(input_list, (list, tuple)):
+        return None
+    if not isinstance(previous_list, list):
+        return None
+    if len(input_list) != len(previous_list):
+        return None
+
+    tree = node.project(PathNode())
+    if tree is None:
+        return None
+
+    indexes = set()
+    for path in changed:
+        if path[:len(root)] != root:
+            # change outside of the list which still affects it
+            # such as parent of the list
+            return None
+        index = _index(path[len(root)]) if len(path) > len(root) else None
+        if index is None or index >= len(input_list):
+            return None
+        if tree.affected_by(path[len(root) + 1:]):
+            indexes.add(index)
+    return indexes
+
+
+def _get(output, path):
+    for key in path:
+        output = output[key]
+    return output
+
+
+def map_nodes(instance, nodes):
+    """
+    Map config nodes of the compiled mapper config against the data
+    of the mapper instance.
+
+    Nodes are mapped together so that invocations of batched lookups
+    are dispatched at once.
+
+    Args:
+        instance: mapper instance with data to map
+        nodes: ordered dictionary of config nodes by their output paths
+
+    Returns:
+        Dictionary of mapped values by output paths.
+        Skipped values are absent.
+    """
+    batcher = Batcher()
+    result = []
+    Deferred(instance, batcher=batcher).map_config_node(
+        nodes, instance.data, instance.data, instance.lut,
+        lambda value, error: result.append((value, error)),
+    )
+    while batcher:
+        batcher.dispatch()
+
+    [(output, error)] = result
+    if error is not None:
+        raise error
+    return output
+
+
+class _Output(object):
+    """
+    Copy of the previous output which only copies nested
+    dictionaries which are modified.
+    """
+
+    def __init__(self, previous):
+        self.data = dict(previous)
+        self.copied = {id(self.data)}
+
+    def parent(self, path):
+        node = self.data
+        for key in path[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = {}
+            if id(child) not in self.copied:
+                child = dict(child)
+                self.copied.add(id(child))
+                node[key] = child
+            node = child
+        return node
+
+    def set(self, path, value):
+        self.parent(path)[path[-1]] = value
+
+    def remove(self, path):
+        self.parent(path).pop(path[-1], None)
+
+
+def remap(mapper, previous_output, data, changed_paths):
+    """
+    Update previous output of the mapper after input paths changed.
+
+    Args:
+        mapper: mapper class
+        previous_output (dict): output of the mapper for the data
+            before it changed. It is not modified.
+        data: changed data
+        changed_paths: iterable of changed input paths either as
+            dot-separated strings or tuples of keys/indexes.
+            Changing a path changes all paths under it.
+
+    Returns:
+        New output dictionary.
+    """
+    changed = [normalize_path(i) for i in changed_paths]
+    output = _Output(previous_output)
+    instance = mapper()
+    instance.data = data
+    remapped = OrderedDict()
+
+    for path, node, tree in mapper.config.dependencies():
+        affecting = [
+            i for i in changed if tree is None or tree.affected_by(i)
+        ]
+        if not affecting:
+            continue
+
+        if isinstance(node, MapperListConfig):
+            try:
+                input_list = instance.map_list_root(node, data, data, {})
+                previous_list = _get(previous_output, path)
+            except Exception:
+                input_list = previous_list = None
+            indexes = element_indexes(node, affecting,
+                                      input_list, previous_list)
+            if indexes is not None:
+                elements = list(previous_list)
+                for i in indexes:
+                    # due to relative lookups, cannot use main lut
+                    elements[i] = instance.map_config_node(
+                        node, input_list[i], data, {},
+                    )
+                output.set(path, elements)
+                continue
+
+        remapped[path] = node
+
+    if remapped:
+        # affected nodes are mapped directly with the compiled config
+        # instead of compiling a mapper of the selected paths
+        mapped = map_nodes(instance, remapped)
+        for path in remapped:
+            if path in mapped:
+                output.set(path, mapped[path])
+            else:
+                # skipped keys are absent
+                output.remove(path)
+
+    return output.data
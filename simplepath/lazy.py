@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Lazily evaluated mapper output.
+
+Instead of mapping all config keys upfront, ``LazyMapping`` evaluates
+each config node only when its key is accessed for the first time::
+
+    output = MyMapper.map_lazy(data)
+    output['foo']  # only "foo" is mapped
+
+Evaluated values are memoized and all keys share the LUT of the mapping
+call so values of shared expression prefixes are still reused.
+Nested configs are lazy as well. Skipped keys are absent exactly as with
+eager mapping which however means that checking the length, membership
+or iterating over keys has to evaluate the corresponding keys.
+"""
+from __future__ import unicode_literals
+
+from .exceptions import Skip
+from .mapper import MapperConfig, MapperListConfig
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+
+class LazyMapping(Mapping):
+    """
+    Read-only mapping of lazily evaluated mapper output.
+    """
+
+    def __init__(self, mapper, node, data, super_root, lut):
+        self._mapper = mapper
+        self._node = node
+        self._data = data
+        self._super_root = super_root
+        self._lut = lut
+        self._values = {}
+        self._skipped = set()
+
+    def _evaluate(self, key):
+        if key in self._skipped:
+            raise KeyError(key)
+
+        node = self._node[key]
+        if (isinstance(node, MapperConfig)
+                and not isinstance(node, MapperListConfig)):
+            value = LazyMapping(self._mapper, node, self._data,
+                                self._super_root, self._lut)
+        else:
+            try:
+                value = self._mapper.map_node(
+                    node, self._data, self._super_root, self._lut,
+                )
+            except Skip:
+                self._skipped.add(key)
+                raise KeyError(key)
+
+        self._values[key] = value
+        return value
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            return self._evaluate(key)
+
+    def __iter__(self):
+        for key in self._node:
+            if key in self:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    @property
+    def evaluated(self):
+        """
+        Keys which were already evaluated and are present.
+        """
+        return set(self._values)
+
+    def materialize(self):
+        """
+        Evaluate all keys and convert the output to regular dictionaries.
+        """
+        return {
+            k: v.materialize() if isinstance(v, LazyMapping) else v
+            for k, v in self.items()
+        }
+
+    def __repr__(self):
+        return '<{} evaluated={}/{}>'.format(
+            self.__class__.__name__, len(self._values), len(self._node),
+        )
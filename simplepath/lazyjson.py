@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy on-demand decoding of large JSON documents.
+
+Instead of decoding the whole document upfront, raw JSON bytes
+(usually a memory-mapped file) are indexed one container at a time
+as lookups step into them. Only values which are actually accessed
+are decoded so mapping a few branches of a huge export does not
+require materializing it::
+
+    with lazyjson.load('export.json') as document:
+        mapped = MyMapper.map_data(document)
+        mapped = lazyjson.materialize(mapped)
+
+Objects and arrays are represented by ``LazyObject`` and ``LazyArray``
+which behave like read-only ``dict`` and ``list`` respectively.
+They are not ``dict`` and ``list`` subclasses though hence custom
+lookups which need actual Python containers, for example to construct
+values of the same type as ``<arith>`` does, should materialize
+lazy values first.
+JSON text is not validated beyond what is needed to find value
+boundaries until the values are decoded.
+"""
+from __future__ import unicode_literals
+import json
+import mmap
+import re
+
+import six
+
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:  # pragma: no cover
+    from collections import Mapping, Sequence
+
+
+WHITESPACE = re.compile(br'[ \t\n\r]*')
+STRING = re.compile(br'"(?:[^"\\]|\\.)*"', re.DOTALL)
+SCALAR = re.compile(br'[^ \t\n\r,\]}]+')
+# everything except brackets (strings are matched as a whole since
+# they can contain brackets) which allows to skip over containers
+# only stopping at brackets
+SKIP = re.compile(br'(?:[^"\[\]{}]+|"(?:[^"\\]|\\.)*")*', re.DOTALL)
+
+
+def _decode(buf, start, end):
+    return json.loads(buf[start:end].decode('utf-8'))
+
+
+def skip_container(buf, pos):
+    """
+    Find the end position of the JSON container starting at ``pos``.
+    """
+    depth = 0
+    while True:
+        pos = SKIP.match(buf, pos).end()
+        char = buf[pos:pos + 1]
+        if not char or char == b'"':
+            raise ValueError('Unterminated JSON container')
+        pos += 1
+        if char in (b'[', b'{'):
+            depth += 1
+        else:
+            depth -= 1
+            if not depth:
+                return pos
+
+
+def skip_value(buf, pos):
+    """
+    Find the end position of the JSON value starting at ``pos``.
+    """
+    char = buf[pos:pos + 1]
+    if char in (b'[', b'{'):
+        return skip_container(buf, pos)
+    match = (STRING if char == b'"' else SCALAR).match(buf, pos)
+    if not match:
+        raise ValueError('Invalid JSON value at {}'.format(pos))
+    return match.end()
+
+
+def _expect(buf, pos, chars):
+    pos = WHITESPACE.match(buf, pos).end()
+    char = buf[pos:pos + 1]
+    if not char or char not in chars:
+        raise ValueError('Expected one of {} at {}'.format(
+            b', '.join(chars).decode('utf-8'), pos,
+        ))
+    return char, WHITESPACE.match(buf, pos + 1).end()
+
+
+def index_container(buf, pos):
+    """
+    Find boundaries of direct children of a JSON container.
+
+    Nested containers are skipped without being indexed.
+
+    Args:
+        buf: bytes-like object supporting regex matching such
+            as ``bytes`` or ``mmap``
+        pos (int): position of the opening bracket of the container
+
+    Returns:
+        Tuple of list of children and the end position of the container.
+        Children are ``(key_span, start, end)`` tuples where
+        ``key_span`` is ``(start, end)`` of the key string for objects
+        and ``None`` for arrays.
+    """
+    is_object = buf[pos:pos + 1] == b'{'
+    closing = b'}' if is_object else b']'
+    children = []
+
+    pos = WHITESPACE.match(buf, pos + 1).end()
+    if buf[pos:pos + 1] == closing:
+        return children, pos + 1
+
+    while True:
+        key = None
+        if is_object:
+            match = STRING.match(buf, pos)
+            if not match:
+                raise ValueError('Expected object key at {}'.format(pos))
+            key = match.span()
+            _, pos = _expect(buf, match.end(), (b':',))
+
+        end = skip_value(buf, pos)
+        children.append((key, pos, end))
+
+        char, pos = _expect(buf, end, (b',', closing))
+        if char == closing:
+            return children, pos
+
+
+class LazyValue(object):
+    """
+    Base class for lazily decoded JSON containers.
+    """
+
+    def __init__(self, buf, pos):
+        self._buf = buf
+        self._pos = pos
+        self._end = None
+        self._children = None
+
+    def _index(self, children):
+        raise NotImplementedError
+
+    def _ensure_index(self):
+        if self._children is None:
+            children, self._end = index_container(self._buf, self._pos)
+            self._index(children)
+
+    def _value(self, span):
+        # spans of children are replaced by the values once accessed
+        if not isinstance(span, tuple):
+            return span
+        start, end = span
+        char = self._buf[start:start + 1]
+        if char == b'{':
+            return LazyObject(self._buf, start)
+        elif char == b'[':
+            return LazyArray(self._buf, start)
+        return _decode(self._buf, start, end)
+
+    def materialize(self):
+        """
+        Decode the whole container into regular Python objects.
+        """
+        self._ensure_index()
+        return _decode(self._buf, self._pos, self._end)
+
+
+class LazyObject(LazyValue, Mapping):
+    """
+    Read-only ``dict``-like lazily decoded JSON object.
+    """
+
+    def _index(self, children):
+        self._children = {
+            _decode(self._buf, *key): (start, end)
+            for key, start, end in children
+        }
+
+    def __getitem__(self, key):
+        self._ensure_index()
+        value = self._value(self._children[key])
+        self._children[key] = value
+        return value
+
+    def __iter__(self):
+        self._ensure_index()
+        return iter(self._children)
+
+    def __len__(self):
+        self._ensure_index()
+        return len(self._children)
+
+    def __contains__(self, key):
+        self._ensure_index()
+        return key in self._children
+
+    def __repr__(self):
+        return '<{} keys={}>'.format(self.__class__.__name__, len(self))
+
+
+class LazyArray(LazyValue, Sequence):
+    """
+    Read-only ``list``-like lazily decoded JSON array.
+    """
+
+    def _index(self, children):
+        self._children = [(start, end) for _, start, end in children]
+
+    def __getitem__(self, index):
+        self._ensure_index()
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = self._value(self._children[index])
+        self._children[index] = value
+        return value
+
+    def __len__(self):
+        self._ensure_index()
+        return len(self._children)
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, LazyArray)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            a == b for a, b in zip(self, other)
+        )
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<{} length={}>'.format(self.__class__.__name__, len(self))
+
+
+def loads(data):
+    """
+    Lazily decode JSON document from bytes-like object.
+
+    Scalar documents are decoded right away.
+    """
+    if isinstance(data, six.text_type):
+        data = data.encode('utf-8')
+    pos = WHITESPACE.match(data).end()
+    char = data[pos:pos + 1]
+    if char == b'{':
+        return LazyObject(data, pos)
+    elif char == b'[':
+        return LazyArray(data, pos)
+    return _decode(data, pos, len(data))
+
+
+class LazyDocument(object):
+    """
+    Lazily decoded JSON file backed by ``mmap``.
+
+    Use as context manager which returns the document root
+    and closes the memory map on exit. Lazy values cannot be
+    accessed after the document is closed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.mmap = None
+
+    def open(self):
+        with open(self.path, 'rb') as fid:
+            self.mmap = mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ)
+        return loads(self.mmap)
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def load(path):
+    """
+    Lazily decode JSON file. See ``LazyDocument``.
+    """
+    return LazyDocument(path)
+
+
+def materialize(data):
+    """
+    Recursively replace all lazy values with regular Python objects.
+
+    Useful for mapped output which can reference lazy containers
+    from the input document.
+    """
+    if isinstance(data, LazyValue):
+        return data.materialize()
+    elif isinstance(data, dict):
+        return {k: materialize(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [materialize(i) for i in data]
+    return data
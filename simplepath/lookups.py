@@ -1,10 +1,27 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 import operator
+from collections import OrderedDict
 from decimal import Decimal
 
+from .constants import DELIMITERS
+from .lazyjson import LazyArray, LazyObject, LazyValue
+from .projection import ANY, GroupsNode, ListNode, PathNode
+from .tables import tables
+
 
 class BaseLookup(object):
+    # whether the lookup is a black box to the mapper which
+    # cannot reason about what the lookup reads from the data.
+    # all built-in lookups override this to False
+    opaque = True
+    # whether the lookup can return awaitables.
+    # only used by simplepath.aio.AsyncMapper
+    asynchronous = False
+    # batch_call(nodes) method which looks up many nodes at once.
+    # see simplepath.batching
+    batch_call = None
+
     def config(self, *args, **kwargs):
         pass
 
@@ -16,6 +33,22 @@ class BaseLookup(object):
     def repr(self):
         return ''
 
+    def project(self, node):
+        """
+        Record which paths of the data this lookup reads.
+
+        Args:
+            node (PathNode): tree node of the value this lookup is
+                applied to. See ``simplepath.projection``.
+
+        Returns:
+            Tree node of the value this lookup returns or ``None``
+            when the lookup can read anything in the whole document.
+            By default lookups are opaque and therefore conservatively
+            assumed to read the whole document.
+        """
+        return None
+
     def call_expression(self, expression, data, extra):
         return expression(
             data,
@@ -23,6 +56,27 @@ class BaseLookup(object):
             # cant use global lut since state can leak between calls
             lut={},
             context=extra.get('context'),
+            scratch=extra.get('scratch'),
+        )
+
+    def cached(self, extra, args, factory, namespace=None):
+        """
+        Get value from the scratch cache of the current mapper call
+        or compute it with ``factory`` when it is not cached yet.
+
+        Values are keyed by the lookup class and ``args`` hence are
+        shared by all expressions using the lookup within the call.
+        Lookups of different classes can share values by using
+        the same ``namespace`` instead of the lookup class.
+        ``args`` must be hashable. Data nodes can be keyed by ``id()``
+        since the data is not garbage-collected during the call.
+        When no scratch cache is provided, value is always computed.
+        """
+        scratch = extra.get('scratch') if extra else None
+        if scratch is None:
+            return factory()
+        return scratch.get_or_create(
+            (namespace or self.__class__,) + tuple(args), factory,
         )
 
     def __call__(self, node, extra=None):
@@ -48,30 +102,104 @@ class BaseLookup(object):
 
 
 class KeyLookup(BaseLookup):
+    opaque = False
+
     def config(self, key):
         self.key = key
 
     def __call__(self, node, extra=None):
-        if isinstance(node, (list, tuple)):
+        if isinstance(node, (list, tuple, LazyArray)):
             return node[int(self.key)]
         else:
             return node[self.key]
 
+    def project(self, node):
+        return node.child(self.key)
+
     def repr(self):
         return 'key="{}"'.format(self.key)
 
 
 class FindInListLookup(BaseLookup):
+    """
+    Get the first node in the list matching all conditions.
+    Nodes which are not objects never match.
+    Example: To get the fee of the deal, do
+    deal.items.<find:type=fee>
+
+    Within a mapper call, the first lookup on a list scans it only until
+    the first match. Further find and filter lookups on the same list
+    with the same condition keys share an index which groups the nodes
+    by the values of the condition keys.
+    """
+    opaque = False
+
     def config(self, **conditions):
         self.conditions = conditions
 
-    def __call__(self, nodes, extra=None):
+    def condition_values(self):
+        keys = tuple(sorted(self.conditions))
+        return keys, tuple(self.conditions[k] for k in keys)
+
+    def group(self, nodes, keys):
+        groups = {}
         for node in nodes:
-            present = {k: node.get(k) for k in self.conditions}
-            if present == self.conditions:
+            if not isinstance(node, (dict, LazyObject)):
+                continue
+            try:
+                groups.setdefault(tuple(node.get(k) for k in keys),
+                                  []).append(node)
+            except TypeError:
+                # unhashable values cannot match string conditions
+                continue
+        # reference to the nodes keeps their id() from being reused
+        return nodes, groups
+
+    def groups(self, nodes, keys, extra, build=True):
+        """
+        Get index of the nodes grouped by values of the condition keys
+        from the scratch cache.
+
+        Returns:
+            Groups or ``None`` when there is no scratch cache or when
+            the index is not built yet and ``build`` is false. In that
+            case the list is marked so that the next lookup on it
+            builds the index.
+        """
+        scratch = extra.get('scratch') if extra else None
+        if scratch is None:
+            return None
+        key = (FindInListLookup, id(nodes), keys)
+        entry = scratch.get(key)
+        if entry is None and not build:
+            scratch[key] = nodes, None
+            return None
+        if entry is None or entry[1] is None:
+            entry = scratch[key] = self.group(nodes, keys)
+        return entry[1]
+
+    def scan(self, nodes, keys, values):
+        for node in nodes:
+            if (isinstance(node, (dict, LazyObject)) and
+                    tuple(node.get(k) for k in keys) == values):
+                yield node
+
+    def __call__(self, nodes, extra=None):
+        keys, values = self.condition_values()
+        groups = self.groups(nodes, keys, extra, build=False)
+        if groups is None:
+            for node in self.scan(nodes, keys, values):
                 return node
+        elif values in groups:
+            return groups[values][0]
         raise ValueError('Not found any node matching all conditions')
 
+    def project(self, node):
+        node = node.child(ANY)
+        for key in self.conditions:
+            node.child(key).full = True
+        return node
+
     def repr(self):
         return ', '.join(
             '{}="{}"'.format(k, v)
@@ -79,9 +207,249 @@ class FindInListLookup(BaseLookup):
         )
 
 
+class FilterLookup(FindInListLookup):
+    """
+    Get all nodes in the list matching all conditions.
+    Nodes which are not objects never match.
+    Example: To get all fees of the deal, do
+    deal.items.<filter:type=fee>
+
+    Within a mapper call, nodes are looked up in the index shared
+    with ``<find>`` lookups so for example partitioning a list
+    by type into several outputs takes a single pass over the list.
+    """
+
+    def __call__(self, nodes, extra=None):
+        keys, values = self.condition_values()
+        groups = self.groups(nodes, keys, extra)
+        if groups is None:
+            return list(self.scan(nodes, keys, values))
+        return groups.get(values, [])
+
+    def project(self, node):
+        return ListNode(super(FilterLookup, self).project(node))
+
+
+class GroupByLookup(BaseLookup):
+    """
+    Group nodes in the list by the value of the field in a single pass.
+    Example: To get all fees of the deal, do
+    deal.items.<group_by:type>.fee
+
+    Groups are keyed by field values as they are and are ordered
+    by the first occurrence. Nodes without the field are grouped
+    under ``None``.
+    """
+    opaque = False
+
+    def config(self, field):
+        self.field = field
+
+    def __call__(self, nodes, extra=None):
+        groups = OrderedDict()
+        for node in nodes:
+            value = node.get(self.field)
+            if value in groups:
+                groups[value].append(node)
+            else:
+                groups[value] = [node]
+        return groups
+
+    def project(self, node):
+        node = node.child(ANY)
+        node.child(self.field).full = True
+        return GroupsNode(node)
+
+    def repr(self):
+        return 'field="{}"'.format(self.field)
+
+
+class SortByLookup(BaseLookup):
+    """
+    Sort nodes in the list by the value of the field.
+    Nodes without the field or where it is ``None`` are sorted last.
+    Example: To get items sorted by descending amount, do
+    items.<sort_by:amount,reverse>
+    """
+    opaque = False
+
+    def config(self, field, reverse=False):
+        self.field = field
+        self.reverse = reverse in (True, 'reverse', 'True', 'true')
+
+    def key(self, node):
+        value = node.get(self.field)
+        return (value is None) != self.reverse, value
+
+    def __call__(self, nodes, extra=None):
+        # key is extracted once per node
+        return sorted(nodes, key=self.key, reverse=self.reverse)
+
+    def project(self, node):
+        node = node.child(ANY)
+        node.child(self.field).full = True
+        return ListNode(node)
+
+    def repr(self):
+        return 'field="{}", reverse={}'.format(self.field, self.reverse)
+
+
+class FanOutLookup(BaseLookup):
+    """
+    Apply the rest of the expression chain to all list elements.
+    Example: To get amounts of all fees as a list, do
+    fees.<*>.amount
+
+    Rest of the chain is compiled into ``tail`` of this lookup
+    and is applied lookup by lookup to all elements at once.
+    Intermediate lists are cached in the LUT under the same chain hashes
+    as a regular chain would use hence for example ``fees.<*>`` is only
+    computed once for all expressions using it.
+    """
+    opaque = False
+
+    def config(self):
+        self.tail = []
+        # chain hash of the elements list. only top-level fan-outs
+        # have it since nested fan-outs are applied per element
+        self.prefix = None
+
+    def fan_out(self, tail, prefix=None):
+        self.tail = tail
+        self.prefix = prefix
+        self.expression = DELIMITERS['expression'].join(
+            [self.expression] + [i.expression for i in tail]
+        )
+
+    def __call__(self, nodes, extra=None):
+        if not isinstance(nodes, (list, tuple, LazyArray)):
+            raise TypeError('Cannot fan out {}'.format(type(nodes)))
+
+        lut = extra.get('lut') if extra else None
+        if lut is None or self.prefix is None:
+            values = list(nodes)
+            for lookup in self.tail:
+                values = [lookup(i, extra=extra) for i in values]
+            return values
+
+        chain_hash = self.prefix
+        if chain_hash in lut:
+            values = lut[chain_hash]
+        else:
+            values = lut[chain_hash] = list(nodes)
+
+        for lookup in self.tail:
+            chain_hash = DELIMITERS['expression'].join(
+                (chain_hash, lookup.expression)
+            )
+            if chain_hash in lut:
+                values = lut[chain_hash]
+            else:
+                values = [lookup(i, extra=extra) for i in values]
+                lut[chain_hash] = values
+
+        return values
+
+    def project(self, node):
+        node = node.child(ANY)
+        for lookup in self.tail:
+            node = lookup.project(node)
+            if node is None:
+                return None
+        return ListNode(node)
+
+    def repr(self):
+        return 'tail=[{}]'.format(','.join(repr(i) for i in self.tail))
+
+
 class LUTLookup(KeyLookup):
+    """
+    Lookup used by the optimizer which replaces a prefix of an
+    expression chain with a value already computed in the LUT
+    by another expression.
+
+    ``chain`` are the lookups which were replaced.
+    """
+
+    def config(self, key, chain=None):
+        super(LUTLookup, self).config(key)
+        self.chain = list(chain or [])
+
+    def __call__(self, node, extra=None):
+        lut = extra['lut']
+        if self.key in lut or not self.chain:
+            return lut[self.key]
+
+        # the expression which computes the value was not evaluated yet
+        # such as when output keys are evaluated lazily in any order
+        for i, lookup in enumerate(self.chain):
+            chain_hash = '.'.join(j.expression for j in self.chain[:i + 1])
+            if chain_hash in lut:
+                node = lut[chain_hash]
+            else:
+                node = lookup(node, extra=extra)
+                lut[chain_hash] = node
+        return node
+
+    def project(self, node):
+        # replaced lookups should be projected instead
+        # via Expression.full_chain
+        return None
+
+
+class SideInputLookup(BaseLookup):
+    """
+    Get static side input of the mapper class instead of the data.
+    Example: To find a rate in the side input rate table, do
+    <side>.rates.<find:code=A>.value
+
+    Side input is provided by the mapper hence this lookup
+    is never called when used within a mapper with ``side_input``.
+    """
+    opaque = False
+
     def __call__(self, node, extra=None):
-        return extra['lut'][self.key]
+        raise ValueError(
+            'Side input is only available within mappers with side_input'
+        )
+
+    def project(self, node):
+        # side input is not part of the data
+        return PathNode()
+
+
+class ReferenceTableLookup(BaseLookup):
+    """
+    Get row of a registered reference table by the current node.
+    Example: To get name of the state by its code in the states table, do
+    state.<ref:states,code>.name
+
+    See ``simplepath.tables``.
+    """
+    opaque = False
+
+    def config(self, table, key_field):
+        self.table = table
+        self.key_field = key_field
+
+    def __call__(self, node, extra=None):
+        # tables are resolved when called so that they can be
+        # registered after mapper configs are compiled
+        try:
+            table = tables[self.table]
+        except KeyError:
+            raise ValueError(
+                'Reference table "{}" is not registered'.format(self.table)
+            )
+        return table.get(self.key_field, node)
+
+    def project(self, node):
+        node.full = True
+        # table row is not part of the data
+        return PathNode()
+
+    def repr(self):
+        return 'table="{}", key_field="{}"'.format(self.table, self.key_field)
 
 
 class AsTypeLookup(BaseLookup):
@@ -96,6 +464,7 @@ class AsTypeLookup(BaseLookup):
         "decimal": Decimal,
         "bool": bool
     }
+    opaque = False
 
     def config(self, type_name):
         if type_name not in self.TYPES:
@@ -105,6 +474,9 @@ class AsTypeLookup(BaseLookup):
     def __call__(self, node, extra=None):
         return self.type(node)
 
+    def project(self, node):
+        return node
+
 
 class ArithmeticLookup(BaseLookup):
     """
@@ -124,6 +496,7 @@ class ArithmeticLookup(BaseLookup):
         '%': operator.mod,
         '^': operator.pow
     }
+    opaque = False
 
     def config(self, oper_name, operand, reverse=False):
         """
@@ -142,6 +515,13 @@ class ArithmeticLookup(BaseLookup):
         self.operand = operand
 
     def __call__(self, node, extra=None):
+        if isinstance(node, LazyValue):
+            # operand is converted to the node type which is not
+            # possible for lazy containers
+            node = node.materialize()
         if self.reverse:
             return self.operator(type(node)(self.operand), node)
         return self.operator(node, type(node)(self.operand))
+
+    def project(self, node):
+        return node
@@ -15,3 +15,71 @@ class LUT(dict):
     def __setitem__(self, *args, **kwargs):
         self.writes += 1
         return super(LUT, self).__setitem__(*args, **kwargs)
+
+
+class SideInputLUT(LUT):
+    """
+    LUT of expressions evaluated against static side input
+    of a mapper class which is shared across mapper calls.
+
+    It is seeded with the side input itself so that the ``<side>``
+    lookup which starts such expressions resolves to it.
+    """
+
+    def __init__(self, data, key):
+        super(SideInputLUT, self).__init__({key: data})
+        self.data = data
+
+
+class SideInputView(object):
+    """
+    LUT of a side input expression within a single mapper call.
+
+    Only values of the longest prefix of the expression which depends
+    on nothing but the side input (``keys``) are cached in the shared
+    ``SideInputLUT``. Values of the rest of the chain can depend on
+    the mapped document hence are only cached in ``local``.
+    """
+
+    def __init__(self, shared, local, keys):
+        self.shared = shared
+        self.local = local
+        self.keys = keys
+        self.data = shared.data
+
+    def lut(self, key):
+        return self.shared if key in self.keys else self.local
+
+    def __contains__(self, key):
+        return key in self.lut(key)
+
+    def __getitem__(self, key):
+        return self.lut(key)[key]
+
+    def __setitem__(self, key, value):
+        self.lut(key)[key] = value
+
+    def get(self, key, default=None):
+        return self.lut(key).get(key, default)
+
+    def pop(self, key, *args):
+        return self.lut(key).pop(key, *args)
+
+
+class Scratch(dict):
+    """
+    Scratch cache of a single mapper call.
+
+    Lookups can memoize expensive derived structures such as
+    indexes or parsed values in it via ``BaseLookup.cached``.
+    Unlike ``LUT``, the same scratch cache is shared by all
+    expressions of the call including ``ListConfig`` elements
+    and expressions evaluated by lookups.
+    """
+
+    def get_or_create(self, key, factory):
+        try:
+            return self[key]
+        except KeyError:
+            value = self[key] = factory()
+            return value
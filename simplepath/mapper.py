@@ -1,14 +1,39 @@
 # -*- coding: utf-8 -*-
-from __future__ import unicode_literals
+from __future__ import print_function, unicode_literals
+import functools
+import itertools
+import sys
+import timeit
+from collections import OrderedDict
 
 import six
 
-from .constants import DEFAULT_FAIL_MODE, NONE
+from .constants import DEFAULT_FAIL_MODE, DELIMITERS, NONE, SKIPPED
 from .exceptions import Skip
 from .expressions import Expression
+from .lazyjson import load as lazy_load, materialize
 from .lookups import LUTLookup
-from .lut import LUT
+from .lut import LUT, Scratch, SideInputLUT, SideInputView
+from .memo import LRUCache, clone, digest, frozen
+from .metrics import Collector, metrics_registry
+from .projection import (
+    ANY,
+    PathNode,
+    ProjectedDecoder,
+    project_expression,
+    prune,
+)
+from .records import TUPLE, RecordLayout
 from .registry import registry
+from .serialization import JSONWriter, encode_key
+from .streaming import iter_documents
+from .tables import tables
+
+
+# chain hash of the <side> lookup which starts side input expressions
+SIDE_INPUT_KEY = '{start}side{end}'.format(**DELIMITERS['lookup'])
+# max number of mappers of selected output paths cached per config
+SELECTIONS_CACHE_SIZE = 128
 
 
 class Value(object):
@@ -71,8 +96,16 @@ class MapperConfig(dict):
         self.fail_mode = fail_mode
         self.registry = lookup_registry or registry
         self.to_optimize = optimize
+        self._projection = NONE
+        self._dependencies = NONE
+        self._batched = NONE
+        self._record_layouts = {}
+        # created on first selection. see MapperBase.select
+        self._selections = None
 
         self.update(self.compile(config))
+        # output keys encoded for direct JSON serialization
+        self.encoded_keys = {k: encode_key(k) for k in self}
         self.optimized = False
         if optimize:
             self.run_optimization()
@@ -129,7 +162,8 @@ class MapperConfig(dict):
             if chain_hash in lut:
                 optimized = node.copy_with(
                     [LUTLookup().setup(expression=chain_hash,
-                                       key=chain_hash)]
+                                       key=chain_hash,
+                                       chain=node[:i + 1])]
                     + node[i + 1:]
                 )
             else:
@@ -179,6 +213,197 @@ class MapperConfig(dict):
         self.optimized = True
         return self
 
+    def _project(self, node, tree):
+        if isinstance(node, Value):
+            return tree
+
+        elif isinstance(node, MapperListConfig):
+            root = project_expression(node.root, tree, full=False)
+            if root is None:
+                return None
+            # list config expressions are relative to list elements
+            if node.project(root.child(ANY)) is None:
+                return None
+            return tree
+
+        elif isinstance(node, MapperConfig):
+            return node.project(tree)
+
+        elif isinstance(node, Expression):
+            if project_expression(node, tree) is None:
+                return None
+            return tree
+
+        elif isinstance(node, list):
+            for i in node:
+                if self._project(i, tree) is None:
+                    return None
+            return tree
+
+    def project(self, tree):
+        """
+        Record all input paths referenced by this config
+        into the paths tree.
+
+        Returns:
+            Given ``tree`` or ``None`` when the whole document
+            is referenced.
+        """
+        for node in self.values():
+            if self._project(node, tree) is None:
+                return None
+        return tree
+
+    def projection(self):
+        """
+        Get tree of all input paths referenced by this config.
+
+        Returns:
+            ``PathNode`` tree or ``None`` when the whole document
+            is referenced such as when opaque custom lookups are used.
+        """
+        if self._projection is NONE:
+            self._projection = self.project(PathNode())
+        return self._projection
+
+    def _uses_batched_lookups(self, node):
+        if isinstance(node, MapperListConfig):
+            return (self._uses_batched_lookups(node.root) or
+                    node.batched())
+        elif isinstance(node, MapperConfig):
+            return node.batched()
+        elif isinstance(node, Expression):
+            return any(getattr(i, 'batch_call', None) is not None
+                       for i in node.full_chain)
+        elif isinstance(node, list):
+            return any(self._uses_batched_lookups(i) for i in node)
+        return False
+
+    def batched(self):
+        """
+        Whether this config uses lookups which define ``batch_call``.
+        See ``simplepath.batching``.
+        """
+        if self._batched is NONE:
+            self._batched = any(
+                self._uses_batched_lookups(i) for i in self.values()
+            )
+        return self._batched
+
+    def _collect_dependencies(self, config, prefix, dependencies):
+        for key, node in config.items():
+            path = prefix + (key,)
+            if (isinstance(node, MapperConfig)
+                    and not isinstance(node, MapperListConfig)):
+                self._collect_dependencies(node, path, dependencies)
+            else:
+                tree = self._project(node, PathNode())
+                dependencies.append((path, node, tree))
+
+    def dependencies(self):
+        """
+        Get dependency graph of output keys on input paths.
+
+        Returns:
+            List of ``(output_path, node, tree)`` tuples for all
+            output keys (nested configs are expanded) where ``tree``
+            is ``PathNode`` of input paths the node reads or ``None``
+            when it can read anything such as with opaque lookups.
+        """
+        if self._dependencies is NONE:
+            dependencies = []
+            self._collect_dependencies(self, (), dependencies)
+            self._dependencies = dependencies
+        return self._dependencies
+
+    def record_layout(self, kind=TUPLE, name='Record'):
+        """
+        Get cached layout of records with the config keys as fields.
+
+        Fields are in the same order as config values are iterated.
+        See ``simplepath.records``.
+        """
+        key = (kind, name)
+        if key not in self._record_layouts:
+            self._record_layouts[key] = RecordLayout(list(self), kind, name)
+        return self._record_layouts[key]
+
+    def _unoptimized(self, node):
+        # compiled nodes in the format accepted by the compiler
+        # with expressions restored to their full chains
+        if isinstance(node, Expression):
+            return node.copy_with(node.full_chain)
+        elif isinstance(node, MapperListConfig):
+            return ListConfig(self._unoptimized(node.root), {
+                k: self._unoptimized(v) for k, v in node.items()
+            })
+        elif isinstance(node, MapperConfig):
+            return {k: self._unoptimized(v) for k, v in node.items()}
+        elif isinstance(node, list):
+            return [self._unoptimized(i) for i in node]
+        return node
+
+    def _select(self, node, tree):
+        missing = set(tree) - set(node)
+        if missing:
+            raise KeyError('"{}" not in the mapper config. Available '
+                           'keys are "{}"'
+                           ''.format('", "'.join(map(str, missing)),
+                                     ', '.join(map(str, node))))
+
+        selected = {}
+        # preserve the order of config keys
+        for key, child in node.items():
+            if key not in tree:
+                continue
+            subtree = tree[key]
+            if subtree is None:
+                selected[key] = self._unoptimized(child)
+            elif isinstance(child, MapperConfig):
+                selected[key] = self._select(child, subtree)
+            else:
+                raise KeyError('Cannot select keys within "{}" since it is '
+                               'not a nested config'.format(key))
+
+        if isinstance(node, MapperListConfig):
+            return ListConfig(self._unoptimized(node.root), selected)
+        return selected
+
+    def select(self, paths):
+        """
+        Get config with only the given output paths.
+
+        Selected config is compiled from the unoptimized expressions
+        and optimized on its own so that it only evaluates
+        the selected expressions and their shared prefixes.
+
+        Args:
+            paths: iterable of output paths either as dot-separated
+                strings such as ``"foo.bar"`` or tuples of keys.
+                Paths can select keys within nested configs
+                including list configs.
+        """
+        tree = {}
+        for path in paths:
+            if isinstance(path, six.string_types):
+                path = path.split('.')
+            node = tree
+            for key in path[:-1]:
+                # parent path was already selected as a whole
+                if node.get(key, {}) is None:
+                    break
+                node = node.setdefault(key, {})
+            else:
+                node[path[-1]] = None
+
+        return MapperConfig(
+            self._select(self, tree),
+            default=self.default,
+            fail_mode=self.fail_mode,
+            lookup_registry=self.registry,
+            optimize=self.to_optimize,
+        )
+
 
 class MapperListConfig(MapperConfig):
     """
@@ -249,57 +474,377 @@ class MapperBase(object):
     fail_mode = DEFAULT_FAIL_MODE
     lookup_registry = registry
     optimize = True
+    # opt-in metrics collection. see simplepath.metrics
+    metrics = False
+    metrics_sample_rate = 1.0
+    metrics_document_size = False
+    metrics_registry = metrics_registry
+    # instance of simplepath.capture.SlowDocumentCapture
+    slow_capture = None
+    # opt-in memoization. see simplepath.memo
+    # map structurally identical ListConfig elements once per call
+    memoize_list_elements = False
+    # max number of memoized document outputs across calls
+    memoize_documents = 0
+    # return memoized outputs as read-only structures instead of copies
+    memoize_frozen = False
+    # static data addressable in expressions via <side> lookup
+    side_input = None
 
     def __init__(self):
         self.lut = LUT()
+        self.scratch = Scratch()
+        self.collector = None
+        # timings of top-level config keys when slow documents
+        # are captured. see map_capturing_slow_document
+        self.timings = None
 
     @classmethod
-    def map_data(cls, data):
+    def map_data(cls, data, only=None):
         """
         Shortcut for mapping data which does not require
         to instantiate class in order to map data.
+
+        Args:
+            data: data to be mapped
+            only: output paths to map. When provided, only those
+                are mapped. See :meth:`select`.
         """
+        if only is not None:
+            cls = cls.select(only)
         return cls()(data)
 
+    @classmethod
+    def select(cls, paths):
+        """
+        Get mapper which maps only the given output paths.
+
+        Mappers of recently selected paths are cached so selecting
+        the same paths again does not compile the config again.
+        See :meth:`MapperConfig.select` for supported paths.
+        """
+        key = cls, frozenset(
+            tuple(i.split('.')) if isinstance(i, six.string_types)
+            else tuple(six.text_type(j) for j in i)
+            for i in paths
+        )
+        config = cls.config
+        if config._selections is None:
+            config._selections = LRUCache(SELECTIONS_CACHE_SIZE)
+        mapper = config._selections.get(key)
+        if mapper is None:
+            # config is assigned after class creation since
+            # it is already compiled
+            mapper = type(cls.__name__, (cls,), {})
+            mapper.config = config.select(key[1])
+            config._selections.set(key, mapper)
+        return mapper
+
+    @classmethod
+    def map_to_json(cls, data, fp=None):
+        """
+        Shortcut for mapping data directly into JSON text.
+
+        See :meth:`dump`.
+        """
+        return cls().dump(data, fp)
+
+    @classmethod
+    def map_columnar(cls, documents, use_numpy=None):
+        """
+        Map a batch of documents into a column per output key.
+
+        Only flat configs are supported.
+        See :func:`simplepath.columnar.map_columnar`.
+        """
+        from .columnar import map_columnar
+
+        return map_columnar(cls(), documents, use_numpy=use_numpy)
+
+    @classmethod
+    def map_lazy(cls, data):
+        """
+        Map data lazily evaluating config keys only when accessed.
+
+        See :mod:`simplepath.lazy`.
+        """
+        return cls().lazy(data)
+
+    @classmethod
+    def remap(cls, previous_output, data, changed_paths):
+        """
+        Update previous output after some input paths changed.
+
+        Only output keys and ``ListConfig`` elements which depend on
+        the changed paths are mapped again.
+        See :func:`simplepath.incremental.remap`.
+        """
+        from .incremental import remap
+
+        return remap(cls, previous_output, data, changed_paths)
+
+    @classmethod
+    def record_layout(cls, kind=TUPLE):
+        """
+        Get layout of records produced by :meth:`map_record`.
+        """
+        return cls.config.record_layout(
+            kind, name='{}Record'.format(cls.__name__),
+        )
+
+    @classmethod
+    def map_record(cls, data, kind=TUPLE):
+        """
+        Map data into a record instead of a dictionary.
+
+        Args:
+            data: data to be mapped
+            kind (str): either ``tuple``, ``namedtuple`` or ``slots``.
+                See :mod:`simplepath.records`.
+
+        Returns:
+            Record with a field per config key. Skipped values
+            are ``simplepath.constants.SKIPPED``.
+        """
+        return cls().to_record(data, cls.record_layout(kind))
+
+    @classmethod
+    def map_records(cls, documents, kind=TUPLE):
+        """
+        Lazily map an iterable of documents into records.
+        """
+        layout = cls.record_layout(kind)
+        for document in documents:
+            yield cls().to_record(document, layout)
+
+    @classmethod
+    def map_many(cls, documents, batch_size=None):
+        """
+        Lazily map an iterable of documents one document at a time.
+
+        Args:
+            documents: iterable of documents to map
+            batch_size (int): number of documents which are mapped
+                together when config uses batched lookups so that
+                their invocations are dispatched together.
+                See ``simplepath.batching``.
+        """
+        if not batch_size or not cls.config.batched():
+            for document in documents:
+                yield cls.map_data(document)
+            return
+
+        from .batching import map_batched
+
+        documents = iter(documents)
+        while True:
+            mappers = []
+            for document in itertools.islice(documents, batch_size):
+                mapper = cls()
+                mapper.data = document
+                mappers.append(mapper)
+            if not mappers:
+                return
+            elapsed = [None] * len(mappers)
+            results = map_batched(mappers, elapsed)
+            for mapper, (output, error), seconds in zip(mappers, results,
+                                                        elapsed):
+                if mapper.slow_capture is not None:
+                    mapper.capture_slow_document(seconds, OrderedDict())
+                if error is not None:
+                    raise error
+                yield output
+
+    @classmethod
+    def map_stream(cls, fp, format=None, decoder=None, project=False):
+        """
+        Lazily map JSON documents from a file object.
+
+        Both JSON Lines and a single top-level JSON array are supported.
+        Only a single document is decoded at a time so memory is bounded
+        regardless of the file size.
+        See :func:`simplepath.streaming.iter_documents` for arguments.
+
+        When ``project`` is provided, only input paths referenced
+        by the mapper are decoded. If custom ``decoder`` is provided,
+        the documents are pruned right after decoding instead.
+        """
+        documents = iter_documents(
+            fp,
+            format=format,
+            decoder=decoder or (cls.projected_decoder() if project else None),
+        )
+        if project and decoder:
+            documents = (cls.prune(i) for i in documents)
+        return cls.map_many(documents)
+
+    @classmethod
+    def map_json_file(cls, path):
+        """
+        Map a single large JSON file without decoding all of it.
+
+        The file is memory-mapped and only the values stepped into
+        by the mapper lookups are decoded.
+        See :mod:`simplepath.lazyjson`.
+        """
+        with lazy_load(path) as document:
+            # output can reference lazy values which are only
+            # valid while the file is mapped
+            return materialize(cls.map_data(document))
+
+    @classmethod
+    def input_paths(cls):
+        """
+        Get all input paths referenced by the mapper.
+
+        Returns:
+            Set of paths as tuples of path segments where ``*``
+            references all list elements or ``None`` when
+            the whole document is referenced.
+        """
+        tree = cls.config.projection()
+        return tree.paths() if tree is not None else None
+
+    @classmethod
+    def prune(cls, data):
+        """
+        Get copy of the data only with the input paths
+        referenced by the mapper.
+        """
+        return prune(data, cls.config.projection())
+
+    @classmethod
+    def projected_decoder(cls):
+        """
+        Get JSON decoder which only decodes input paths
+        referenced by the mapper and skips everything else.
+        """
+        tree = cls.config.projection()
+        if tree is None:
+            return None
+        return ProjectedDecoder(tree)
+
+    @classmethod
+    def explain(cls, stream=None):
+        """
+        Print compiled and optimized plan of the mapper config.
+
+        Shows which expressions were rewritten by the optimizer
+        to use values from the LUT, which expression prefixes are shared
+        by multiple expressions, which lookups are custom and therefore
+        opaque to the optimizer and estimated number of lookup steps
+        per mapped document with and without optimization.
+        """
+        from .explain import explain
+
+        print(explain(cls.config, name=cls.__name__),
+              file=stream or sys.stdout)
+
     def get_lookup_context(self):
         return {}
 
     def map_expression(self, node, data, super_root, lut):
-        return node(
-            data,
-            super_root=super_root,
-            lut=lut,
-            context=self.get_lookup_context(),
-        )
+        if node.uses_side_input:
+            lut = self.side_input_view(node)
+            data = lut.data
+
+        if self.collector is None:
+            return node(
+                data,
+                super_root=super_root,
+                lut=lut,
+                context=self.get_lookup_context(),
+                scratch=self.scratch,
+            )
 
-    def map_list_node(self, node, data, super_root, lut):
-        output = []
+        try:
+            return node.evaluate(
+                data,
+                super_root=super_root,
+                lut=lut,
+                context=self.get_lookup_context(),
+                scratch=self.scratch,
+            )
+        except Exception:
+            value = node.fallback()
+            self.collector.defaults += 1
+            return value
+
+    def map_list_root(self, node, data, super_root, lut):
+        if node.root.uses_side_input:
+            lut = self.side_input_view(node.root)
+            data = lut.data
 
         # please note that we are not catching Skip exception here
         # the reason being that map_list_node is called within
         # map_config_node anyway which does catch it
-        input_list = node.root(
+        return node.root(
             data,
             super_root=super_root,
             lut=lut,
             context=self.get_lookup_context(),
+            scratch=self.scratch,
         )
 
-        if input_list is not None:
-            for value in input_list:
-                # due to relative lookups, cannot use main lut
-                output.append(self.map_config_node(node, value, super_root, {}))
+    def map_list_node(self, node, data, super_root, lut):
+        output = []
+        input_list = self.map_list_root(node, data, super_root, lut)
+
+        if input_list is None:
+            return output
+
+        # elements can only be memoized when element config
+        # does not read anything outside of the element
+        if self.memoize_list_elements and node.projection() is not None:
+            return self.map_list_elements_memoized(
+                node, input_list, super_root,
+            )
+
+        for value in input_list:
+            # due to relative lookups, cannot use main lut
+            output.append(self.map_config_node(node, value, super_root, {}))
+
+        return output
+
+    def map_list_elements_memoized(self, node, input_list, super_root):
+        output = []
+        memo = {}
+
+        for value in input_list:
+            try:
+                key = digest(value)
+            except TypeError:
+                key = None
+
+            if key is not None and key in memo:
+                mapped = memo[key]
+                output.append(mapped if self.memoize_frozen
+                              else clone(mapped))
+                continue
+
+            mapped = self.map_config_node(node, value, super_root, {})
+            if self.memoize_frozen:
+                mapped = frozen(mapped)
+            if key is not None:
+                memo[key] = mapped
+            output.append(mapped)
 
         return output
 
     def map_config_node(self, node, data, super_root, lut):
         output = {}
+        timings = self.timings if node is self.config else None
 
         for key, node in node.items():
+            start = timeit.default_timer() if timings is not None else None
             try:
                 output[key] = self.map_node(node, data, super_root, lut)
             except Skip:
-                pass
+                if self.collector is not None:
+                    self.collector.skips += 1
+            finally:
+                if start is not None:
+                    timings[key] = timeit.default_timer() - start
 
         return output
 
@@ -328,10 +873,287 @@ class MapperBase(object):
                 ''.format(type(node))
             )
 
+    def write_list_node(self, node, input_list, super_root, writer):
+        writer.write('[')
+        for i, value in enumerate(input_list or ()):
+            if i:
+                writer.write(', ')
+            # due to relative lookups, cannot use main lut
+            self.write_config_node(node, value, super_root, {}, writer)
+            writer.maybe_flush()
+        writer.write(']')
+
+    def write_config_node(self, node, data, super_root, lut, writer):
+        write = writer.write
+        first = True
+        write('{')
+        timings = self.timings if node is self.config else None
+
+        for key, child in node.items():
+            start = timeit.default_timer() if timings is not None else None
+            try:
+                # values are mapped before writing the key
+                # so that skipped keys are not written
+                if isinstance(child, MapperListConfig):
+                    value = self.map_list_root(child, data, super_root, lut)
+                elif not isinstance(child, MapperConfig):
+                    value = self.map_node(child, data, super_root, lut)
+            except Skip:
+                if self.collector is not None:
+                    self.collector.skips += 1
+                continue
+            finally:
+                if start is not None:
+                    timings[key] = timeit.default_timer() - start
+
+            if not first:
+                write(', ')
+            first = False
+            write(node.encoded_keys[key])
+
+            start = timeit.default_timer() if timings is not None else None
+            if isinstance(child, MapperListConfig):
+                self.write_list_node(child, value, super_root, writer)
+            elif isinstance(child, MapperConfig):
+                self.write_config_node(child, data, super_root, lut, writer)
+            else:
+                writer.value(value)
+            if start is not None:
+                timings[key] += timeit.default_timer() - start
+
+        write('}')
+
+    def lazy(self, data):
+        """
+        Get lazily evaluated output of the mapping.
+
+        Metrics are not collected since keys are evaluated
+        whenever they are accessed. Configs with batched lookups
+        are not supported since invocations of keys evaluated
+        on access cannot be dispatched together.
+        """
+        from .lazy import LazyMapping
+
+        if self.config.batched():
+            raise ValueError(
+                'Lazy mapping does not support configs with batched '
+                'lookups. Use map_data instead.'
+            )
+        self.data = data
+        return LazyMapping(self, self.config, data, data, self.lut)
+
+    def map_record_values(self, data, super_root, lut):
+        values = []
+        for node in self.config.values():
+            try:
+                values.append(self.map_node(node, data, super_root, lut))
+            except Skip:
+                values.append(SKIPPED)
+                if self.collector is not None:
+                    self.collector.skips += 1
+        return values
+
+    def to_record(self, data, layout):
+        """
+        Map data into a record with the given ``RecordLayout``.
+        """
+        self.data = data
+        if self.config.batched():
+            return self.run(lambda: layout.make(self.map_batched_values()))
+        return self.run(lambda: layout.make(
+            self.map_record_values(data, data, self.lut)
+        ))
+
+    def map_batched_values(self):
+        """
+        Map values of all config keys with batched lookups.
+
+        Skipped values are ``SKIPPED``.
+        """
+        output = self.map_batched()
+        return [output.get(key, SKIPPED) for key in self.config]
+
+    def dump(self, data, fp=None):
+        """
+        Map data directly into JSON text without building output
+        dictionaries. See :mod:`simplepath.serialization`.
+
+        Output of configs with batched lookups is built first
+        so that their invocations are dispatched together.
+
+        Args:
+            data: data to be mapped
+            fp: text file-like object to write JSON into
+
+        Returns:
+            JSON text when ``fp`` is not provided.
+        """
+        self.data = data
+        writer = JSONWriter(fp)
+        if self.config.batched():
+            # batched lookups can only be dispatched together
+            # when the whole output is mapped before it is written
+            self.run(lambda: writer.value(self.map_batched()))
+        else:
+            self.run(lambda: self.write_config_node(
+                self.config, data, data, self.lut, writer,
+            ))
+        writer.flush()
+        if fp is None:
+            return writer.getvalue()
+
+    @classmethod
+    def document_cache(cls):
+        """
+        Get LRU cache of memoized document outputs of this mapper class.
+
+        Outputs also depend on ``side_input`` and registered reference
+        tables hence the cache is cleared when either is replaced.
+        """
+        # stored in class dict so that subclasses do not share the cache
+        cache = cls.__dict__.get('_document_cache')
+        if cache is None:
+            cache = LRUCache(cls.memoize_documents)
+            cls._document_cache = cache
+
+        lut = cls.side_input_lut()
+        state = cls.__dict__.get('_document_cache_state')
+        if state is None or state[0] is not lut or state[1] != tables.version:
+            cache.clear()
+            cls._document_cache_state = lut, tables.version
+        return cache
+
+    @classmethod
+    def side_input_lut(cls):
+        """
+        Get LUT of expressions evaluated against ``side_input``.
+
+        Values are cached across calls until ``side_input`` is replaced
+        with another object or a reference table is registered.
+        Modifying side input in place is not detected.
+        """
+        lut = cls.__dict__.get('_side_input_lut')
+        if (lut is None or lut.data is not cls.side_input or
+                lut.tables_version != tables.version):
+            lut = SideInputLUT(cls.side_input, SIDE_INPUT_KEY)
+            lut.tables_version = tables.version
+            cls._side_input_lut = lut
+        return lut
+
+    def side_input_view(self, node):
+        """
+        Get LUT of the side input expression within this call.
+
+        Values of the expression which can depend on the mapped
+        document are not cached across calls. See ``SideInputView``.
+        """
+        return SideInputView(
+            self.side_input_lut(),
+            self.scratch.get_or_create(SideInputView, LUT),
+            node.side_input_keys,
+        )
+
     def __call__(self, data):
         self.data = data
+
+        if not self.memoize_documents:
+            return self.run(self.map_root)
+
+        try:
+            key = digest(data)
+        except TypeError:
+            return self.run(self.map_root)
+
+        cache = self.document_cache()
+        output = cache.get(key)
+        if output is not None:
+            return output if self.memoize_frozen else clone(output)
+
+        output = self.run(self.map_root)
+        if self.memoize_frozen:
+            output = frozen(output)
+            cache.set(key, output)
+        else:
+            # cached output is never handed out when not frozen
+            # so that callers cannot modify it
+            cache.set(key, clone(output))
+        return output
+
+    def run(self, func):
+        """
+        Run mapping function collecting metrics when enabled.
+        """
+        # scratch values are only valid within a single call
+        self.scratch = Scratch()
+
+        if self.slow_capture is not None:
+            func = functools.partial(self.map_capturing_slow_document, func)
+
+        if self.metrics:
+            metrics = self.metrics_registry.get(self.__class__)
+            if metrics.should_sample(self.metrics_sample_rate):
+                return self.map_collecting_metrics(metrics, func)
+            return self.map_counting_metrics(metrics, func)
+
+        return func()
+
+    def map_root(self):
+        if self.config.batched():
+            return self.map_batched()
         return self.map_node(self.config, self.data, self.data, self.lut)
 
+    def map_batched(self):
+        """
+        Map data dispatching invocations of batched lookups together.
+        """
+        from .batching import map_batched
+
+        [(output, error)] = map_batched([self])
+        if error is not None:
+            raise error
+        return output
+
+    def map_collecting_metrics(self, metrics, func):
+        collector = Collector(metrics, self.data,
+                              measure_size=self.metrics_document_size)
+        try:
+            with collector as self.collector:
+                return func()
+        finally:
+            self.collector = None
+
+    def map_counting_metrics(self, metrics, func):
+        try:
+            output = func()
+        except BaseException:
+            metrics.count(error=True)
+            raise
+        metrics.count()
+        return output
+
+    def map_capturing_slow_document(self, func):
+        """
+        Run mapping function capturing the document when it is slow
+        including when the mapping fails.
+
+        Top-level config keys are timed for the timing breakdown
+        when they are mapped one at a time. Keys of batched configs
+        are mapped interleaved hence only the total is captured.
+        """
+        timer = timeit.default_timer
+        self.timings = OrderedDict()
+        start = timer()
+        try:
+            return func()
+        finally:
+            elapsed = timer() - start
+            timings, self.timings = self.timings, None
+            self.capture_slow_document(elapsed, timings)
+
+    def capture_slow_document(self, elapsed, timings):
+        if self.slow_capture.is_slow(elapsed):
+            self.slow_capture.capture(self, self.data, elapsed, timings)
+
 
 class Mapper(six.with_metaclass(MapperMeta, MapperBase)):
     """
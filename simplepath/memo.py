@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Content-hash memoization of mapped outputs.
+
+Memoization is keyed by a fixed-size digest of the input structure
+which includes value types since for example ``1``, ``1.0`` and ``True``
+are equal in Python but can be mapped differently. Only JSON-like
+values can be digested so other inputs are never memoized.
+
+Memoized outputs are shared between callers hence they are either
+copied before they are returned or returned as frozen (read-only)
+structures which do not require copying.
+
+Mappers opt in via attributes::
+
+    class MyMapper(Mapper):
+        # map identical ListConfig elements once per call
+        memoize_list_elements = True
+        # keep outputs of up to 1000 documents across calls
+        memoize_documents = 1000
+        # return read-only outputs instead of copies
+        memoize_frozen = True
+
+Only the input is part of the key so document memoization must not
+be used when lookups depend on ``get_lookup_context()``. List elements
+are not memoized when element config uses opaque custom lookups
+since those can read outside of the element.
+"""
+from __future__ import unicode_literals
+import binascii
+import hashlib
+import threading
+from collections import OrderedDict
+
+import six
+
+
+SCALAR_TAGS = {
+    type(None): 'n',
+    bool: '?',
+    float: 'f',
+    six.text_type: 'u',
+    six.binary_type: 'b',
+}
+SCALAR_TAGS.update((t, 'i') for t in six.integer_types)
+
+
+def _encode(data, parts):
+    tag = SCALAR_TAGS.get(type(data))
+    if tag is not None:
+        # reprs of strings are quoted and other reprs do not contain
+        # the separator hence encoded values cannot run into each other
+        parts.append(tag + repr(data) + ';')
+    elif isinstance(data, dict):
+        if all(type(k) is six.text_type for k in data):
+            parts.append('D{}:'.format(len(data)))
+            for k in sorted(data):
+                parts.append('u' + repr(k) + ';')
+                _encode(data[k], parts)
+        else:
+            # keys of mixed types cannot be sorted hence items
+            # are digested separately and combined in sorted order
+            items = sorted(digest((k, v)) for k, v in data.items())
+            parts.append('d{}:'.format(len(items)))
+            parts.extend(binascii.hexlify(i).decode('ascii') for i in items)
+    elif isinstance(data, (list, tuple)):
+        parts.append('{}{}:'.format(
+            't' if isinstance(data, tuple) else 'l', len(data),
+        ))
+        for i in data:
+            _encode(i, parts)
+    else:
+        raise TypeError('Cannot digest {}'.format(type(data)))
+
+
+def digest(data):
+    """
+    Get type-tagged digest of the data structure.
+
+    Unlike a frozen copy of the data only the digest
+    is kept as the key of memoized output.
+
+    Raises:
+        TypeError: when data contains values other than
+            dictionaries, lists, tuples, strings, numbers and None
+    """
+    parts = []
+    _encode(data, parts)
+    return hashlib.sha1(''.join(parts).encode('utf-8')).digest()
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError('{} is immutable'.format(self.__class__.__name__))
+
+
+class FrozenDict(dict):
+    """
+    Read-only dictionary of memoized output.
+    """
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class FrozenList(list):
+    """
+    Read-only list of memoized output.
+    """
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = reverse = sort = _immutable
+    if six.PY2:  # pragma: no cover
+        __setslice__ = __delslice__ = _immutable
+    else:
+        clear = _immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def frozen(output):
+    """
+    Recursively convert output dictionaries and lists to read-only ones.
+    """
+    if isinstance(output, FrozenDict) or isinstance(output, FrozenList):
+        return output
+    elif isinstance(output, dict):
+        return FrozenDict((k, frozen(v)) for k, v in output.items())
+    elif isinstance(output, list):
+        return FrozenList(frozen(i) for i in output)
+    return output
+
+
+def clone(output):
+    """
+    Copy output dictionaries and lists so that the copy
+    can be modified independently.
+    """
+    if isinstance(output, dict):
+        return {k: clone(v) for k, v in output.items()}
+    elif isinstance(output, list):
+        return [clone(i) for i in output]
+    return output
+
+
+class LRUCache(object):
+    """
+    Thread-safe bounded least-recently-used cache.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            # re-insert to mark as most recently used
+            self.data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = value
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.data)
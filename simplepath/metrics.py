@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in runtime metrics for mappers.
+
+Metrics are collected per mapper class into a thread-safe registry
+which can be periodically scraped by any exporter::
+
+    class MyMapper(Mapper):
+        config = {...}
+        metrics = True
+        metrics_sample_rate = 0.1
+        # walks whole input of every sampled call hence opt-in
+        metrics_document_size = True
+
+    metrics_registry.snapshot()
+
+Calls which are not sampled are only counted.
+"""
+from __future__ import division, unicode_literals
+import random
+import threading
+import timeit
+from bisect import bisect_left
+
+import six
+
+
+# latency buckets upper bounds in seconds which grow by
+# factor of 2 ** (1 / 4) from 1 microsecond to ~1 minute
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** (i / 4) for i in range(104))
+
+# document size buckets upper bounds in number of nodes
+SIZE_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+def document_size(data):
+    """
+    Get size of the document as total number of nodes
+    (containers and scalars) within the document.
+    """
+    size = 0
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        size += 1
+        if isinstance(node, dict):
+            stack.extend(six.itervalues(node))
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+    return size
+
+
+class Histogram(object):
+    """
+    Fixed-buckets histogram.
+
+    Values greater than the last bucket are counted
+    in an implicit overflow bucket.
+
+    .. note:: This class is not thread-safe by itself.
+        ``MapperMetrics`` guards all access to it.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q):
+        """
+        Estimate percentile as the upper bound of the bucket
+        where the percentile falls into.
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count:
+                if i < len(self.buckets):
+                    return self.buckets[i]
+                return float('inf')
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'buckets': [
+                (bound, count)
+                for bound, count in zip(self.buckets + (float('inf'),),
+                                        self.counts)
+                if count
+            ],
+        }
+
+
+class MapperMetrics(object):
+    """
+    Metrics of a single mapper class.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.documents = 0
+            self.sampled = 0
+            self.errors = 0
+            self.skips = 0
+            self.defaults = 0
+            self.latency = Histogram(LATENCY_BUCKETS)
+            self.size = Histogram(SIZE_BUCKETS)
+
+    def should_sample(self, rate):
+        return rate >= 1 or random.random() < rate
+
+    def count(self, error=False):
+        with self.lock:
+            self.documents += 1
+            self.errors += bool(error)
+
+    def record(self, elapsed, size=None, skips=0, defaults=0):
+        with self.lock:
+            self.documents += 1
+            self.sampled += 1
+            self.skips += skips
+            self.defaults += defaults
+            self.latency.observe(elapsed)
+            if size is not None:
+                self.size.observe(size)
+
+    def snapshot(self):
+        with self.lock:
+            snapshot = {
+                'mapper': self.name,
+                'documents': self.documents,
+                'sampled': self.sampled,
+                'errors': self.errors,
+                'skips': self.skips,
+                'defaults': self.defaults,
+                'latency': self.latency.snapshot(),
+                'size': self.size.snapshot(),
+            }
+            snapshot['latency'].update({
+                'p{}'.format(int(q * 100)): self.latency.percentile(q)
+                for q in PERCENTILES
+            })
+        return snapshot
+
+
+class MetricsRegistry(object):
+    """
+    Thread-safe registry of metrics of all mapper classes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def get(self, mapper_class):
+        try:
+            return self.metrics[mapper_class]
+        except KeyError:
+            with self.lock:
+                return self.metrics.setdefault(
+                    mapper_class,
+                    MapperMetrics('{}.{}'.format(mapper_class.__module__,
+                                                 mapper_class.__name__)),
+                )
+
+    def snapshot(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return [i.snapshot() for i in metrics]
+
+    def reset(self):
+        with self.lock:
+            self.metrics.clear()
+
+
+class Collector(object):
+    """
+    Collects metrics for a single mapping call.
+
+    Document size is only measured with ``measure_size``
+    since it walks the whole document.
+    """
+
+    timer = staticmethod(timeit.default_timer)
+
+    def __init__(self, metrics, data, measure_size=False):
+        self.metrics = metrics
+        self.data = data
+        self.measure_size = measure_size
+        self.skips = 0
+        self.defaults = 0
+
+    def __enter__(self):
+        self.start = self.timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        elapsed = self.timer() - self.start
+        if exc_type is not None:
+            self.metrics.count(error=True)
+        else:
+            self.metrics.record(
+                elapsed,
+                document_size(self.data) if self.measure_size else None,
+                skips=self.skips,
+                defaults=self.defaults,
+            )
+
+
+metrics_registry = MetricsRegistry()
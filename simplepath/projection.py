@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+Projection of input documents to the paths referenced by mapper configs.
+
+Compiled mapper config knows exactly which input paths its expressions
+read. That allows to discard unreferenced data either from already
+decoded documents (``prune``) or while decoding JSON text
+(``ProjectedDecoder``) which discards unreferenced subtrees as soon as
+they are decoded so that they are never held in memory together.
+
+Lookups describe what they read via ``BaseLookup.project``.
+Custom lookups are opaque by default and are conservatively assumed
+to read the whole document (they have access to ``root`` and
+``super_root``) in which case no projection is possible.
+"""
+from __future__ import unicode_literals
+import json
+
+import six
+
+from .streaming import WHITESPACE
+
+
+# path segment matching any element of a list
+ANY = '*'
+
+
+class PathNode(dict):
+    """
+    Node of the referenced paths tree.
+
+    Children are keyed by dictionary keys, list indexes (as strings)
+    or ``ANY`` for all list elements. When ``full`` is set,
+    the whole subtree under the node is referenced.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(PathNode, self).__init__(*args, **kwargs)
+        self.full = False
+
+    def child(self, key):
+        return self.setdefault(key, PathNode())
+
+    def merge(self, other):
+        """
+        Merge other tree into this tree in place.
+        """
+        self.full = self.full or other.full
+        for key, node in other.items():
+            self.child(key).merge(node)
+        return self
+
+    def paths(self, prefix=()):
+        """
+        Get all referenced paths as tuples of path segments.
+        """
+        if self.full:
+            return {prefix}
+        paths = set()
+        for key, node in self.items():
+            paths |= node.paths(prefix + (key,))
+        return paths
+
+    def affected_by(self, path):
+        """
+        Check whether change of the input value at the path
+        can change any of the values referenced by the tree.
+
+        Args:
+            path (tuple): path segments of the changed value
+                where list indexes can be either integers or strings
+        """
+        if self.full or not path:
+            return True
+
+        segment = six.text_type(path[0])
+        nodes = [self.get(segment), self.get(ANY)] + [
+            # negative indexes can reference any element
+            node for key, node in self.items() if key.startswith('-')
+        ]
+        return any(node is not None and node.affected_by(path[1:])
+                   for node in nodes)
+
+    def for_list(self, index, length):
+        """
+        Get node which applies to the list element at ``index``.
+        """
+        nodes = [self[ANY]] if ANY in self else []
+        for key, node in self.items():
+            if key == ANY:
+                continue
+            try:
+                if int(key) % length == index:
+                    nodes.append(node)
+            except (ValueError, ZeroDivisionError):
+                continue
+
+        if not nodes:
+            return None
+        if len(nodes) == 1:
+            return nodes[0]
+        merged = PathNode()
+        for node in nodes:
+            merged.merge(node)
+        return merged
+
+
+class ListNode(PathNode):
+    """
+    Detached node of a list assembled from values at another node
+    of the tree such as the list returned by the ``<*>`` lookup.
+
+    Reading the whole list reads all of its values in full.
+    """
+
+    def __init__(self, values):
+        super(ListNode, self).__init__()
+        self[ANY] = values
+
+    @property
+    def full(self):
+        return False
+
+    @full.setter
+    def full(self, full):
+        if full:
+            self[ANY].full = True
+
+
+class GroupsNode(PathNode):
+    """
+    Detached node of a dictionary of lists assembled from values
+    at another node of the tree such as the dictionary returned
+    by the ``<group_by>`` lookup.
+
+    Any key of the dictionary is a list of the values.
+    """
+
+    def __init__(self, values):
+        super(GroupsNode, self).__init__()
+        self.elements = values
+
+    def child(self, key):
+        return ListNode(self.elements)
+
+    @property
+    def full(self):
+        return False
+
+    @full.setter
+    def full(self, full):
+        if full:
+            self.elements.full = True
+
+
+def project_expression(expression, node, full=True):
+    """
+    Record paths read by the expression into the paths tree.
+
+    Args:
+        expression (Expression): expression to project
+        node (PathNode): tree node of the data expression is applied to
+        full (bool): whether the whole value of the expression is read.
+            That is not the case for ``ListConfig`` roots for which
+            only values referenced by the list config are read.
+
+    Returns:
+        Tree node of the expression value or ``None`` when
+        the expression can read the whole document.
+    """
+    for lookup in expression.full_chain:
+        node = lookup.project(node)
+        if node is None:
+            return None
+    node.full = node.full or full
+    return node
+
+
+def prune(data, node):
+    """
+    Get copy of the data with only the referenced paths.
+
+    Unreferenced list elements are replaced with ``None``
+    so that list indexes are preserved. Similarly objects referenced
+    as lists keep all keys with unreferenced values replaced
+    with ``None``.
+    """
+    if node is None or node.full:
+        return data
+
+    if isinstance(data, dict):
+        # objects referenced as lists such as ListConfig roots
+        # are iterated over their keys hence all keys are kept
+        keys = ANY in node
+        return {
+            k: prune(v, node[k]) if k in node else None
+            for k, v in data.items()
+            if keys or k in node
+        }
+
+    elif isinstance(data, (list, tuple)):
+        length = len(data)
+        output = []
+        for i, value in enumerate(data):
+            child = node.for_list(i, length)
+            output.append(None if child is None else prune(value, child))
+        return output
+
+    return data
+
+
+class ProjectedDecoder(object):
+    """
+    JSON decoder which only keeps referenced paths.
+
+    Objects along the referenced paths are decoded key by key
+    and unreferenced values are discarded right after decoding so
+    they are never held together in memory. Decoding of values
+    themselves is delegated to the standard ``json`` decoder since
+    skipping JSON text in Python is slower than decoding it in C.
+    """
+
+    def __init__(self, node):
+        self.node = node
+        self.decoder = json.JSONDecoder()
+
+    def __call__(self, text):
+        if isinstance(text, six.binary_type):
+            text = text.decode('utf-8')
+        pos = WHITESPACE.match(text).end()
+        value, pos = self.decode(text, pos, self.node)
+        if WHITESPACE.match(text, pos).end() != len(text):
+            raise ValueError('Extra data after JSON document')
+        return value
+
+    def decode(self, text, pos, node):
+        if node is None or node.full:
+            return self.decoder.raw_decode(text, pos)
+
+        char = text[pos:pos + 1]
+        if char == '{':
+            return self.decode_object(text, pos + 1, node)
+        elif char == '[' and list(node) == [ANY]:
+            return self.decode_array(text, pos + 1, node[ANY])
+
+        # lists with index references need their length
+        # to resolve negative indexes hence are pruned after decoding
+        value, pos = self.decoder.raw_decode(text, pos)
+        return prune(value, node), pos
+
+    def _separator(self, text, pos, end):
+        pos = WHITESPACE.match(text, pos).end()
+        char = text[pos:pos + 1]
+        if char == ',':
+            return WHITESPACE.match(text, pos + 1).end(), False
+        if char == end:
+            return pos + 1, True
+        raise ValueError('Expected "," or "{}" at {}'.format(end, pos))
+
+    def decode_object(self, text, pos, node):
+        output = {}
+        pos = WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] == '}':
+            return output, pos + 1
+
+        while True:
+            key, pos = self.decoder.raw_decode(text, pos)
+            pos = WHITESPACE.match(text, pos).end()
+            if text[pos:pos + 1] != ':':
+                raise ValueError('Expected ":" at {}'.format(pos))
+            pos = WHITESPACE.match(text, pos + 1).end()
+
+            if key in node:
+                output[key], pos = self.decode(text, pos, node[key])
+            else:
+                _, pos = self.decoder.raw_decode(text, pos)
+                # see prune
+                if ANY in node:
+                    output[key] = None
+
+            pos, done = self._separator(text, pos, '}')
+            if done:
+                return output, pos
+
+    def decode_array(self, text, pos, node):
+        output = []
+        pos = WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] == ']':
+            return output, pos + 1
+
+        while True:
+            value, pos = self.decode(text, pos, node)
+            output.append(value)
+            pos, done = self._separator(text, pos, ']')
+            if done:
+                return output, pos
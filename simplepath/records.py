@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Compact record outputs for flat mapper configs.
+
+Instead of a dictionary per mapped document, values can be mapped
+into tuples, generated ``namedtuple`` classes or ``__slots__`` records
+which do not need a per-document dictionary with hashed keys::
+
+    MyMapper.map_record(data, kind='namedtuple')
+
+The layout of the record fields is computed once per mapper config.
+Since records cannot omit fields, skipped values are represented
+by the ``simplepath.constants.SKIPPED`` placeholder.
+"""
+from __future__ import unicode_literals
+import keyword
+import re
+from collections import namedtuple
+
+
+TUPLE = 'tuple'
+NAMEDTUPLE = 'namedtuple'
+SLOTS = 'slots'
+KINDS = (TUPLE, NAMEDTUPLE, SLOTS)
+
+IDENTIFIER = re.compile(r'^[^\d\W]\w*$', re.UNICODE)
+
+
+class Record(object):
+    """
+    Base class of generated ``__slots__`` records.
+    """
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+
+    def __iter__(self):
+        return (getattr(self, i) for i in self.__slots__)
+
+    def __eq__(self, other):
+        return (type(self) is type(other)
+                and tuple(self) == tuple(other))
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def _asdict(self):
+        return dict(zip(self.__slots__, self))
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, ', '.join(
+            '{}={!r}'.format(k, v) for k, v in zip(self.__slots__, self)
+        ))
+
+
+def validate_fields(fields):
+    for field in fields:
+        if (not IDENTIFIER.match(field)
+                or keyword.iskeyword(field)
+                or field.startswith('_')):
+            raise ValueError(
+                '"{}" cannot be used as a record field name. Record fields '
+                'must be valid identifiers not starting with an underscore.'
+                ''.format(field)
+            )
+
+
+class RecordLayout(object):
+    """
+    Layout of record fields.
+
+    Args:
+        fields (list): output keys in the order of record fields
+        kind (str): one of ``tuple``, ``namedtuple`` or ``slots``
+        name (str): name of the generated record class
+    """
+
+    def __init__(self, fields, kind=TUPLE, name='Record'):
+        if kind not in KINDS:
+            raise ValueError('Unsupported record kind "{}". Supported kinds '
+                             'are {}'.format(kind, ', '.join(KINDS)))
+
+        self.fields = tuple(fields)
+        self.kind = kind
+        self.record_class = None
+
+        if kind == TUPLE:
+            self.make = tuple
+        elif kind == NAMEDTUPLE:
+            validate_fields(self.fields)
+            self.record_class = namedtuple(str(name), map(str, self.fields))
+            self.make = self.record_class._make
+        else:
+            validate_fields(self.fields)
+            self.record_class = type(str(name), (Record,), {
+                '__slots__': tuple(map(str, self.fields)),
+            })
+            self.make = lambda values: self.record_class(*values)
+
+    def __repr__(self):
+        return '<{} kind="{}" fields=[{}]>'.format(
+            self.__class__.__name__, self.kind, ', '.join(self.fields),
+        )
@@ -1,7 +1,25 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-from .lookups import ArithmeticLookup, AsTypeLookup, FindInListLookup, KeyLookup
+from .aggregations import (
+    CountLookup,
+    MaxLookup,
+    MeanLookup,
+    MinLookup,
+    SumLookup,
+)
+from .lookups import (
+    ArithmeticLookup,
+    AsTypeLookup,
+    FanOutLookup,
+    FilterLookup,
+    FindInListLookup,
+    GroupByLookup,
+    KeyLookup,
+    ReferenceTableLookup,
+    SideInputLookup,
+    SortByLookup,
+)
 
 
 class LookupRegistry(dict):
@@ -20,3 +38,14 @@ registry.register(None, KeyLookup)
 registry.register('arith', ArithmeticLookup)
 registry.register('as_type', AsTypeLookup)
 registry.register('find', FindInListLookup)
+registry.register('filter', FilterLookup)
+registry.register('group_by', GroupByLookup)
+registry.register('sort_by', SortByLookup)
+registry.register('*', FanOutLookup)
+registry.register('ref', ReferenceTableLookup)
+registry.register('side', SideInputLookup)
+registry.register('sum', SumLookup)
+registry.register('count', CountLookup)
+registry.register('min', MinLookup)
+registry.register('max', MaxLookup)
+registry.register('mean', MeanLookup)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Direct JSON serialization of mapped output.
+
+Instead of building output dictionaries and lists and then encoding
+them with ``json.dumps``, the mapper can write JSON text as it maps
+config nodes::
+
+    MyMapper.map_to_json(data, fp)
+
+Output keys are encoded once when the config is compiled and
+``ListConfig`` elements are written as soon as they are mapped so
+large lists are never fully buffered in memory.
+Produced JSON is identical to ``json.dumps`` with default arguments.
+"""
+from __future__ import unicode_literals
+import json
+
+import six
+
+
+# number of written text parts buffered before writing them into file
+BUFFER_SIZE = 4096
+
+# encoders of the most common scalar types which produce the same
+# output as the default encoder while avoiding its per-call overhead.
+# floats are not included since non-finite floats need special handling
+SCALAR_ENCODERS = {
+    six.text_type: json.encoder.encode_basestring_ascii,
+    type(None): lambda value: 'null',
+}
+for _type in six.integer_types:
+    SCALAR_ENCODERS[_type] = _type.__str__
+
+
+def encode_key(key):
+    """
+    Encode output key together with the key separator.
+    """
+    return json.dumps(six.text_type(key)) + ': '
+
+
+class JSONWriter(object):
+    """
+    Buffered writer of JSON text into a file-like object.
+
+    When no file-like object is provided, all JSON text
+    is kept in memory and can be retrieved via ``getvalue``.
+    """
+
+    def __init__(self, fp=None, encoder=None, buffer_size=BUFFER_SIZE):
+        self.fp = fp
+        self.encoder = encoder or json.JSONEncoder()
+        # fast paths are only valid for the default encoder
+        self.scalar_encoders = {} if encoder else SCALAR_ENCODERS
+        self.buffer_size = buffer_size
+        self.parts = []
+        # parts list is never replaced so write can be bound once
+        self.write = self.parts.append
+
+    def value(self, value):
+        encode = self.scalar_encoders.get(type(value), self.encoder.encode)
+        self.write(encode(value))
+
+    def maybe_flush(self):
+        """
+        Write buffered text into the file when the buffer is full.
+        """
+        if self.fp is not None and len(self.parts) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.fp is not None and self.parts:
+            self.fp.write(''.join(self.parts))
+            del self.parts[:]
+
+    def getvalue(self):
+        return ''.join(self.parts)
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming decoding of multiple JSON documents from file objects.
+
+Supports JSON Lines (one document per line) and a single top-level
+JSON array of documents. Documents are decoded one at a time so memory
+is bounded by the size of a single document rather than the whole file::
+
+    with open('documents.jsonl', 'rb') as fid:
+        for mapped in MyMapper.map_stream(fid):
+            ...
+"""
+from __future__ import unicode_literals
+import codecs
+import json
+import re
+
+import six
+
+
+JSON_LINES = 'jsonl'
+JSON_ARRAY = 'array'
+FORMATS = (JSON_LINES, JSON_ARRAY)
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# tokens which are relevant for finding where JSON value ends
+VALUE_TOKENS = re.compile(r'["\[\]{},]')
+STRING_END = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+SCALAR_END = re.compile(r'[^ \t\n\r,\]}]*')
+
+
+class IncompleteValue(ValueError):
+    """
+    Raised when the buffer ends before the JSON value does.
+    """
+
+
+def scan_value(text, pos):
+    """
+    Find the end position of the JSON value starting at ``pos``.
+
+    The value is not validated, only its boundaries are found
+    which allows decoding it with any decoder.
+
+    Raises:
+        IncompleteValue: if the value is not complete within ``text``
+    """
+    char = text[pos:pos + 1]
+
+    if char == '"':
+        match = STRING_END.match(text, pos + 1)
+        if not match:
+            raise IncompleteValue
+        return match.end()
+
+    if char not in ('[', '{'):
+        # scalars end at the next structural character or whitespace
+        match = SCALAR_END.match(text, pos)
+        if match.end() == len(text):
+            raise IncompleteValue
+        return match.end()
+
+    depth = 0
+    while True:
+        match = VALUE_TOKENS.search(text, pos)
+        if not match:
+            raise IncompleteValue
+        token = match.group()
+        pos = match.end()
+        if token == '"':
+            match = STRING_END.match(text, pos)
+            if not match:
+                raise IncompleteValue
+            pos = match.end()
+        elif token in '[{':
+            depth += 1
+        elif token in ']}':
+            depth -= 1
+            if not depth:
+                return pos
+
+
+class ChunkReader(object):
+    """
+    Reads text chunks from text or binary file objects.
+
+    Binary files are decoded as UTF-8 incrementally.
+    """
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.eof = False
+
+    def read(self, size=None):
+        if self.eof:
+            return ''
+        while True:
+            chunk = self.fp.read(size or self.chunk_size)
+            if not chunk:
+                self.eof = True
+            if isinstance(chunk, six.binary_type):
+                chunk = self.decoder.decode(chunk, final=self.eof)
+            # incomplete multi-byte characters decode to empty string
+            if chunk or self.eof:
+                return chunk
+
+
+def _default_decoder(text):
+    return json.loads(text)
+
+
+def iter_json_lines(reader, buffer='', decoder=None):
+    decoder = decoder or _default_decoder
+    # parts of the current incomplete line
+    pending = []
+    chunk = buffer or reader.read()
+
+    while chunk:
+        pending.append(chunk)
+        if '\n' in chunk:
+            lines = ''.join(pending).split('\n')
+            pending = [lines.pop()]
+            for line in lines:
+                if line.strip():
+                    yield decoder(line)
+        chunk = reader.read()
+
+    line = ''.join(pending)
+    if line.strip():
+        yield decoder(line)
+
+
+def iter_json_array(reader, buffer='', decoder=None):
+    raw_decoder = json.JSONDecoder()
+    started = False
+    expecting_value = True
+    pos = 0
+
+    while True:
+        pos = WHITESPACE.match(buffer, pos).end()
+        if pos >= len(buffer):
+            buffer, pos = buffer[pos:] + reader.read(), 0
+            if not buffer:
+                if started:
+                    raise ValueError('Unterminated JSON array')
+                return
+            continue
+
+        char = buffer[pos]
+
+        if not started:
+            if char != '[':
+                raise ValueError('Expected JSON array')
+            started = True
+            pos += 1
+            continue
+
+        if char == ']':
+            return
+
+        if not expecting_value:
+            if char != ',':
+                raise ValueError(
+                    'Expected "," or "]" in JSON array, got "{}"'
+                    ''.format(char)
+                )
+            pos += 1
+            expecting_value = True
+            continue
+
+        try:
+            end = scan_value(buffer, pos)
+        except IncompleteValue:
+            # read at least as much as is already buffered so that
+            # very large values are not re-scanned on every chunk
+            chunk = reader.read(max(reader.chunk_size, len(buffer) - pos))
+            if not chunk:
+                raise ValueError('Unterminated JSON value in array')
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        if decoder is None:
+            value, _ = raw_decoder.raw_decode(buffer, pos)
+        else:
+            value = decoder(buffer[pos:end])
+        yield value
+        pos = end
+        expecting_value = False
+
+
+def iter_documents(fp, format=None, decoder=None, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over JSON documents in the file object.
+
+    Args:
+        fp: text or binary file object
+        format (str): either ``jsonl`` or ``array``. When not provided
+            format is detected from the first non-whitespace character.
+        decoder: optional callable which decodes a single JSON document
+            from text such as ``orjson.loads``. By default standard
+            library ``json`` module is used.
+        chunk_size (int): number of bytes/characters to read at once
+
+    Yields:
+        Decoded documents one at a time.
+    """
+    if format is not None and format not in FORMATS:
+        raise ValueError('Unsupported format "{}". Supported formats are '
+                         '{}'.format(format, ', '.join(FORMATS)))
+
+    reader = ChunkReader(fp, chunk_size=chunk_size)
+    buffer = ''
+
+    if format is None:
+        while not buffer.strip():
+            chunk = reader.read()
+            if not chunk:
+                return iter(())
+            buffer += chunk
+        format = (JSON_ARRAY if buffer.lstrip().startswith('[')
+                  else JSON_LINES)
+
+    if format == JSON_ARRAY:
+        return iter_json_array(reader, buffer, decoder=decoder)
+    return iter_json_lines(reader, buffer, decoder=decoder)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Reference tables resolved by the ``<ref:table,key_field>`` lookup.
+
+Reference tables such as code-to-description tables are registered
+once by name and looked up by a key field via hash indexes
+instead of scanning a list for every lookup as ``<find>`` does::
+
+    tables.register('states', Table([
+        {'code': 'NY', 'name': 'New York'},
+        ...
+    ], keys=['code']))
+    tables.register('models', CSVTable('models.csv', keys=['code']))
+
+    SimpleMapper({'state': 'state.<ref:states,code>.name'})
+
+Indexes of ``keys`` are built at registration and indexes of other
+fields are built on first use. When the same key is present in
+multiple rows, the first row wins.
+
+File-backed tables are memory-mapped and their indexes only hold
+offsets of rows within the file so that large tables do not have
+to be resident in memory. Rows are parsed when they are looked up.
+Every row must be on a single line and since CSV values are strings,
+CSV tables are looked up by text keys.
+"""
+from __future__ import unicode_literals
+import csv
+import io
+import json
+import mmap
+
+import six
+
+
+class Table(object):
+    """
+    In-memory reference table.
+
+    Args:
+        rows: list of rows (dictionaries)
+        keys: fields which are indexed right away
+    """
+
+    def __init__(self, rows, keys=()):
+        self.rows = list(rows)
+        self.indexes = {}
+        for field in keys:
+            self.index(field)
+
+    def scan(self):
+        """
+        Iterate over ``(position, row)`` of all rows.
+        """
+        return enumerate(self.rows)
+
+    def row(self, position):
+        return self.rows[position]
+
+    def normalize(self, key):
+        return key
+
+    def index(self, field):
+        """
+        Get hash index of row positions by the field value.
+        """
+        index = self.indexes.get(field)
+        if index is None:
+            index = {}
+            for position, row in self.scan():
+                if field in row:
+                    index.setdefault(self.normalize(row[field]), position)
+            self.indexes[field] = index
+        return index
+
+    def get(self, field, key):
+        """
+        Get first row where the field has the key value.
+
+        Raises:
+            KeyError: when no row has the key
+        """
+        return self.row(self.index(field)[self.normalize(key)])
+
+
+class FileTable(Table):
+    """
+    Base class of memory-mapped reference tables
+    with one row per line.
+
+    Args:
+        path: path of the file
+        keys: fields which are indexed right away
+    """
+
+    def __init__(self, path, keys=()):
+        self.path = path
+        self.file = io.open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            self.data = b''
+        self.start = self.header()
+        self.indexes = {}
+        for field in keys:
+            self.index(field)
+
+    def header(self):
+        """
+        Parse table header.
+
+        Returns:
+            Offset of the first row.
+        """
+        return 0
+
+    def line(self, offset):
+        end = self.data.find(b'\n', offset)
+        if end == -1:
+            end = len(self.data)
+        return self.data[offset:end].decode('utf-8'), end + 1
+
+    def scan(self):
+        offset = self.start
+        while offset < len(self.data):
+            line, end = self.line(offset)
+            if line.strip():
+                yield offset, self.parse(line)
+            offset = end
+
+    def row(self, position):
+        return self.parse(self.line(position)[0])
+
+    def parse(self, line):
+        raise NotImplementedError
+
+    def close(self):
+        if not isinstance(self.data, bytes):
+            self.data.close()
+        self.file.close()
+
+
+class CSVTable(FileTable):
+    """
+    Memory-mapped CSV reference table with a header line.
+    """
+
+    def header(self):
+        if not self.data:
+            self.fields = []
+            return 0
+        line, end = self.line(0)
+        self.fields = self.split(line)
+        return end
+
+    def split(self, line):
+        if six.PY2:
+            values = next(csv.reader([line.encode('utf-8')]))
+            return [i.decode('utf-8') for i in values]
+        return next(csv.reader([line]))
+
+    def parse(self, line):
+        return dict(zip(self.fields, self.split(line)))
+
+    def normalize(self, key):
+        return six.text_type(key)
+
+
+class JSONLinesTable(FileTable):
+    """
+    Memory-mapped reference table with a JSON object per line.
+    """
+
+    def parse(self, line):
+        return json.loads(line)
+
+
+class TableRegistry(dict):
+    def __init__(self, name, *args, **kwargs):
+        super(TableRegistry, self).__init__(*args, **kwargs)
+        self.name = name
+        # incremented on every registration so that memoized
+        # mapper outputs can be invalidated
+        self.version = 0
+
+    def register(self, name, table):
+        self[name] = table
+        self.version += 1
+
+
+tables = TableRegistry('simplepath.tables')
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Module that describes all utility functions for Simplepath."""
 from __future__ import unicode_literals
+import importlib
 
 
 def deepvars(data_object):
@@ -50,3 +51,29 @@ def deepvars(data_object):
         return object_dict
     else:
         return data_object
+
+
+def import_string(reference):
+    """
+    Import an object by its ``module:attribute`` reference.
+
+    Nested attributes are supported by separating them with a dot
+    such as ``module:Class.attribute``.
+
+    Args:
+        reference (str): reference of the object to import
+
+    Returns:
+        The imported object.
+    """
+    if ':' not in reference:
+        raise ValueError(
+            '"{}" is not a valid reference. '
+            'It must be in "module:attribute" format.'.format(reference)
+        )
+
+    module_name, attributes = reference.split(':', 1)
+    obj = importlib.import_module(module_name)
+    for attribute in attributes.split('.'):
+        obj = getattr(obj, attribute)
+    return obj
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import unittest
+from decimal import Decimal
+
+import mock
+
+from simplepath import aggregations
+from simplepath.aggregations import (
+    CountLookup,
+    MaxLookup,
+    MeanLookup,
+    MinLookup,
+    SumLookup,
+)
+from simplepath.lut import Scratch
+from simplepath.mapper import SimpleMapper
+from simplepath.projection import ANY, PathNode
+
+
+FEES = [{'amount': 1}, {'amount': 4}, {'amount': 2}]
+
+
+def lookup(cls, *args):
+    return cls().setup(expression='<aggregate>', *args)
+
+
+class TestAggregateLookup(unittest.TestCase):
+    def test_values(self):
+        self.assertEqual(lookup(SumLookup, 'amount').values(FEES), [1, 4, 2])
+        self.assertIs(lookup(SumLookup).values(FEES), FEES)
+
+    def test_values_shared(self):
+        extra = {'scratch': Scratch()}
+
+        actual = lookup(SumLookup, 'amount').values(FEES, extra)
+
+        self.assertIs(lookup(MaxLookup, 'amount').values(FEES, extra), actual)
+
+    def test_values_not_list(self):
+        with self.assertRaises(TypeError):
+            lookup(SumLookup, 'amount')({'amount': 1})
+
+    def test_count_not_list(self):
+        with self.assertRaises(TypeError):
+            lookup(CountLookup)({'amount': 1})
+        with self.assertRaises(TypeError):
+            lookup(CountLookup)('foo')
+
+    def test_call_missing_field(self):
+        with self.assertRaises(KeyError):
+            lookup(SumLookup, 'amount')([{'amount': 1}, {}])
+
+    def test_project(self):
+        tree = PathNode()
+
+        actual = lookup(SumLookup, 'amount').project(tree)
+
+        self.assertIsNot(actual, tree)
+        self.assertSetEqual(tree.paths(), {(ANY, 'amount')})
+
+    def test_repr(self):
+        self.assertEqual(lookup(SumLookup, 'amount').repr(),
+                         'field="amount"')
+        self.assertEqual(lookup(SumLookup).repr(), '')
+
+
+class TestAggregations(unittest.TestCase):
+    def test_sum(self):
+        self.assertEqual(lookup(SumLookup, 'amount')(FEES), 7)
+        self.assertEqual(lookup(SumLookup)([]), 0)
+
+    def test_sum_decimal(self):
+        actual = lookup(SumLookup)([Decimal('0.1')] * 3)
+
+        self.assertIsInstance(actual, Decimal)
+        self.assertEqual(actual, Decimal('0.3'))
+
+    def test_count(self):
+        self.assertEqual(lookup(CountLookup)(FEES), 3)
+        self.assertEqual(
+            lookup(CountLookup, 'amount')([{'amount': 1}, {'amount': None},
+                                           {}]),
+            1,
+        )
+
+    def test_min_max(self):
+        self.assertEqual(lookup(MinLookup, 'amount')(FEES), 1)
+        self.assertEqual(lookup(MaxLookup, 'amount')(FEES), 4)
+        with self.assertRaises(ValueError):
+            lookup(MinLookup)([])
+
+    def test_mean(self):
+        self.assertEqual(lookup(MeanLookup)([1, 2]), 1.5)
+        self.assertEqual(lookup(MeanLookup)([Decimal('0.1'),
+                                             Decimal('0.2')]),
+                         Decimal('0.15'))
+        with self.assertRaises(ValueError):
+            lookup(MeanLookup)([])
+
+    @unittest.skipIf(aggregations.numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        array = aggregations.numpy.array([1, 4, 2])
+
+        self.assertEqual(lookup(SumLookup)(array), 7)
+        self.assertIsInstance(lookup(SumLookup)(array), int)
+        self.assertEqual(lookup(CountLookup)(array), 3)
+        self.assertEqual(lookup(MinLookup)(array), 1)
+        self.assertEqual(lookup(MaxLookup)(array), 4)
+        self.assertAlmostEqual(lookup(MeanLookup)(array), 7 / 3.)
+        with self.assertRaises(ValueError):
+            lookup(MeanLookup)(array[:0])
+
+    @mock.patch.object(aggregations, 'numpy', None)
+    def test_numpy_missing(self):
+        self.assertEqual(lookup(SumLookup)((1, 4, 2)), 7)
+
+
+class TestMapAggregations(unittest.TestCase):
+    def test_map_data(self):
+        mapper = SimpleMapper({
+            'total': 'fees.<sum:amount>',
+            'count': 'fees.<count>',
+            'largest': 'fees.<max:amount>',
+            'average': 'fees.<mean:amount>',
+            'order_totals': 'orders.<*>.items.<sum:amount>',
+        })
+
+        actual = mapper.map_data({
+            'fees': FEES,
+            'orders': [{'items': FEES}, {'items': []}],
+        })
+
+        self.assertDictEqual(actual, {
+            'total': 7,
+            'count': 3,
+            'largest': 4,
+            'average': 7 / 3.,
+            'order_totals': [7, 0],
+        })
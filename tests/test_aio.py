@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import unittest
+
+import mock
+
+from simplepath.aio import AsyncMapper, asyncio
+from simplepath.lookups import BaseLookup
+from simplepath.mapper import ListConfig, SimpleMapper
+from simplepath.registry import LookupRegistry, registry
+
+
+class FakeStore(object):
+    """
+    In-process asynchronous data source which resolves
+    fetched values on the next event loop iteration.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.cancelled = set()
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    def start(self, key):
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self.calls.append(key)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+
+        def resolve():
+            self.running -= 1
+            if key in self.cancelled:
+                future.cancel()
+            elif key in self.data:
+                future.set_result(self.data[key])
+            else:
+                future.set_exception(KeyError(key))
+
+        loop.call_soon(resolve)
+        return future
+
+    def fetch(self, key):
+        return Fetch(self, key)
+
+
+class Fetch(object):
+    """
+    Lazy awaitable which only starts fetching once awaited.
+    """
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+
+    def __await__(self):
+        return self.store.start(self.key).__await__()
+
+
+class FetchLookup(BaseLookup):
+    asynchronous = True
+    store = None
+
+    def __call__(self, node, extra=None):
+        return self.store.fetch(node)
+
+
+class Explode(BaseException):
+    pass
+
+
+class ExplodeLookup(BaseLookup):
+    def __call__(self, node, extra=None):
+        raise Explode(node)
+
+
+class BatchedLookup(BaseLookup):
+    calls = []
+
+    def batch_call(self, nodes):
+        self.calls.append(nodes)
+        return [i.upper() for i in nodes]
+
+
+aio_registry = LookupRegistry('aio', registry)
+aio_registry.register('fetch', FetchLookup)
+aio_registry.register('batched', BatchedLookup)
+aio_registry.register('explode', ExplodeLookup)
+
+DATA = {
+    'customer_id': 'c1',
+    'dealer_id': 'd1',
+    'items': [{'id': 'i1'}, {'id': 'i2'}, {'id': 'i1'}],
+}
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestAsyncMapper(unittest.TestCase):
+    def setUp(self):
+        super(TestAsyncMapper, self).setUp()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.store = FakeStore({
+            'c1': {'name': 'Jane'},
+            'd1': {'name': 'Dealer'},
+            'i1': {'price': 1},
+            'i2': {'price': 2},
+        })
+        patcher = mock.patch.object(FetchLookup, 'store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        super(TestAsyncMapper, self).tearDown()
+
+    def mapper(self, config, **attrs):
+        attrs.setdefault('lookup_registry', aio_registry)
+        return SimpleMapper(config, base_mapper=AsyncMapper, **attrs)
+
+    def wait(self, future):
+        return self.loop.run_until_complete(future)
+
+    def test_sync_lookups(self):
+        config = {
+            'customer': 'customer_id',
+            'items': ListConfig('items', {'id': 'id'}),
+            'values': ['dealer_id', 'customer_id'],
+        }
+
+        mapper = self.mapper(config)
+
+        actual = self.wait(mapper.map_data(DATA, loop=self.loop))
+
+        self.assertEqual(actual, SimpleMapper(config).map_data(DATA))
+
+    def test_async_lookups(self):
+        mapper = self.mapper({
+            'customer': 'customer_id.<fetch>.name',
+            'nested': {
+                'dealer': 'dealer_id.<fetch>.name',
+            },
+            'items': ListConfig('items', {
+                'id': 'id',
+                'price': 'id.<fetch>.price',
+            }),
+        })
+
+        actual = self.wait(mapper.map_data(DATA, loop=self.loop))
+
+        self.assertEqual(actual, {
+            'customer': 'Jane',
+            'nested': {'dealer': 'Dealer'},
+            'items': [
+                {'id': 'i1', 'price': 1},
+                {'id': 'i2', 'price': 2},
+                {'id': 'i1', 'price': 1},
+            ],
+        })
+        self.assertEqual(list(actual), ['customer', 'nested', 'items'])
+        self.assertEqual(self.store.max_running, 5)
+
+    def test_async_lookups_concurrency(self):
+        mapper = self.mapper({
+            'items': ListConfig('items', {'price': 'id.<fetch>.price'}),
+        }, concurrency=1)
+
+        actual = self.wait(mapper.map_data(DATA, loop=self.loop))
+
+        self.assertEqual(actual, {'items': [
+            {'price': 1}, {'price': 2}, {'price': 1},
+        ]})
+        self.assertEqual(self.store.max_running, 1)
+        self.assertEqual(len(self.store.calls), 3)
+
+    def test_async_lookups_shared_prefix(self):
+        mapper = self.mapper({
+            'name': 'customer_id.<fetch>.name',
+            'customer': 'customer_id.<fetch>',
+        })
+
+        actual = self.wait(mapper.map_data(DATA, loop=self.loop))
+
+        self.assertEqual(actual, {
+            'name': 'Jane',
+            'customer': {'name': 'Jane'},
+        })
+        self.assertEqual(self.store.calls, ['c1'])
+
+    def test_async_lookups_skip(self):
+        mapper = self.mapper({
+            'customer': 'dealer_id.<fetch>.missing',
+            'missing': 'missing.<fetch>',
+            'name': 'customer_id.<fetch>.name',
+        }, fail_mode='skip')
+
+        data = {'missing': 'x', 'dealer_id': 'd1', 'customer_id': 'c1'}
+
+        actual = self.wait(mapper.map_data(data, loop=self.loop))
+
+        self.assertEqual(actual, {'name': 'Jane'})
+
+    def test_async_lookups_default(self):
+        mapper = self.mapper({
+            'missing': 'missing.<fetch>',
+        }, fail_mode='default', default=None)
+
+        actual = self.wait(mapper.map_data({'missing': 'x'}, loop=self.loop))
+
+        self.assertEqual(actual, {'missing': None})
+
+    def test_async_lookups_fail(self):
+        mapper = self.mapper({
+            'missing': 'missing.<fetch>',
+            'name': 'customer_id.<fetch>.name',
+        })
+
+        with self.assertRaises(KeyError):
+            self.wait(mapper.map_data({'missing': 'x', 'customer_id': 'c1'},
+                                      loop=self.loop))
+
+    def test_async_lookups_cancelled(self):
+        self.store.cancelled.add('c1')
+        mapper = self.mapper({
+            'dealer': 'dealer_id.<fetch>.name',
+            'name': 'customer_id.<fetch>.name',
+        }, fail_mode='default', default=None)
+
+        with self.assertRaises(asyncio.CancelledError):
+            self.wait(mapper.map_data(DATA, loop=self.loop))
+
+    def test_async_lookups_escaped_error(self):
+        mapper = self.mapper({
+            'name': 'customer_id.<fetch>.name.<explode>',
+        }, fail_mode='default', default=None)
+
+        with self.assertRaises(Explode):
+            self.wait(mapper.map_data(DATA, loop=self.loop))
+
+    def test_async_list_root(self):
+        self.store.data['list'] = [{'id': 'i2'}]
+        mapper = self.mapper({
+            'items': ListConfig('list_id.<fetch>', {
+                'price': 'id.<fetch>.price',
+            }),
+        })
+
+        actual = self.wait(mapper.map_data({'list_id': 'list'},
+                                           loop=self.loop))
+
+        self.assertEqual(actual, {'items': [{'price': 2}]})
+
+    def test_batched_lookups(self):
+        BatchedLookup.calls = []
+        mapper = self.mapper({
+            'customer': 'customer_id.<fetch>.name.<batched>',
+            'items': ListConfig('items', {'id': 'id.<batched>'}),
+        })
+
+        actual = self.wait(mapper.map_data(DATA, loop=self.loop))
+
+        self.assertEqual(actual, {
+            'customer': 'JANE',
+            'items': [{'id': 'I1'}, {'id': 'I2'}, {'id': 'I1'}],
+        })
+        self.assertEqual(BatchedLookup.calls, [['i1', 'i2'], ['Jane']])
+
+    def test_map_concurrently(self):
+        mapper = self.mapper({
+            'price': 'id.<fetch>.price',
+        }, concurrency=1)
+
+        actual = self.wait(mapper.map_concurrently(DATA['items'],
+                                                   loop=self.loop))
+
+        self.assertEqual(actual, [{'price': 1}, {'price': 2}, {'price': 1}])
+        self.assertEqual(self.store.max_running, 1)
+
+    def test_map_concurrently_empty(self):
+        mapper = self.mapper({'price': 'id.<fetch>.price'})
+
+        actual = self.wait(mapper.map_concurrently([], loop=self.loop))
+
+        self.assertEqual(actual, [])
+
+    def test_running_loop(self):
+        mapper = self.mapper({'name': 'customer_id.<fetch>.name'})
+        result = self.loop.create_future()
+
+        def start():
+            future = mapper.map_data(DATA)
+            future.add_done_callback(lambda f: result.set_result(f.result()))
+
+        self.loop.call_soon(start)
+
+        self.assertEqual(self.wait(result), {'name': 'Jane'})
+
+    def test_no_running_loop(self):
+        mapper = self.mapper({'name': 'customer_id.<fetch>.name'})
+
+        with self.assertRaises(RuntimeError):
+            mapper.map_data(DATA)
+
+    def test_sync_entry_points(self):
+        mapper = self.mapper({'name': 'customer_id.<fetch>.name'})
+
+        for call in (lambda: mapper.map_to_json(DATA),
+                     lambda: mapper.map_record(DATA),
+                     lambda: mapper.map_records([DATA]),
+                     lambda: mapper.map_columnar([DATA]),
+                     lambda: mapper.map_lazy('{}'),
+                     lambda: mapper.remap({}, DATA, []),
+                     lambda: mapper.map_many([DATA]),
+                     lambda: mapper.map_stream([DATA]),
+                     lambda: mapper.map_json_file('data.json')):
+            with self.assertRaises(TypeError) as e:
+                call()
+            self.assertIn('not supported by AsyncMapper', str(e.exception))
+
+    def test_memoization(self):
+        mapper = self.mapper({'name': 'customer_id.<fetch>.name'},
+                             memoize_documents=True)
+
+        with self.assertRaises(TypeError):
+            mapper.map_data(DATA, loop=self.loop)
+
+    def test_not_optimized(self):
+        mapper = self.mapper({'name': 'customer_id.<fetch>.name'})
+
+        self.assertEqual(len(mapper.config['name']), 3)
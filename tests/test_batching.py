@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+import unittest
+
+import mock
+
+from simplepath.batching import Batch, Batcher, batch_key, map_batched
+from simplepath.constants import SKIPPED
+from simplepath.lookups import BaseLookup
+from simplepath.mapper import ListConfig, SimpleMapper, Value
+from simplepath.registry import LookupRegistry, registry
+
+
+STORE = {
+    'c1': {'name': 'Jane'},
+    'c2': {'name': 'John'},
+    'd1': {'name': 'Dealer'},
+}
+
+
+class StoreLookup(BaseLookup):
+    calls = []
+
+    def __call__(self, node, extra=None):
+        return self.batch_call([node])[0]
+
+    def batch_call(self, nodes):
+        self.calls.append(nodes)
+        return [STORE.get(i, KeyError(i)) for i in nodes]
+
+
+batching_registry = LookupRegistry('batching', registry)
+batching_registry.register('store', StoreLookup)
+
+DATA = {
+    'customer_id': 'c1',
+    'dealer_id': 'd1',
+    'deals': [
+        {'customer_id': 'c1'},
+        {'customer_id': 'c2'},
+        {'customer_id': 'c1'},
+        {'customer_id': 'missing'},
+    ],
+}
+
+
+class TestHelpers(unittest.TestCase):
+    def test_batch_key(self):
+        self.assertEqual(batch_key('foo'), batch_key('foo'))
+        self.assertNotEqual(batch_key(1), batch_key(True))
+        node = {'foo': 'foo'}
+        self.assertEqual(batch_key(node), id(node))
+
+
+class TestBatch(unittest.TestCase):
+    def test_dispatch(self):
+        lookup = mock.MagicMock()
+        lookup.batch_call.return_value = ['FOO', ValueError('bar')]
+        batch = Batch(lookup)
+        foo1, foo2, bar = mock.MagicMock(), mock.MagicMock(), mock.MagicMock()
+        batch.load('foo', foo1)
+        batch.load('bar', bar)
+        batch.load('foo', foo2)
+
+        batch.dispatch()
+
+        lookup.batch_call.assert_called_once_with(['foo', 'bar'])
+        foo1.assert_called_once_with('FOO', None)
+        foo2.assert_called_once_with('FOO', None)
+        self.assertIsNone(bar.call_args[0][0])
+        self.assertIsInstance(bar.call_args[0][1], ValueError)
+        self.assertFalse(batch.pending)
+
+    def test_dispatch_error(self):
+        lookup = mock.MagicMock()
+        lookup.batch_call.return_value = ['FOO']
+        batch = Batch(lookup)
+        foo, bar = mock.MagicMock(), mock.MagicMock()
+        batch.load('foo', foo)
+        batch.load('bar', bar)
+
+        batch.dispatch()
+
+        self.assertIsInstance(foo.call_args[0][1], ValueError)
+        self.assertIsInstance(bar.call_args[0][1], ValueError)
+
+
+class TestBatcher(unittest.TestCase):
+    def test_load(self):
+        schedule = mock.MagicMock()
+        batcher = Batcher(schedule=schedule)
+        foo = StoreLookup().setup(expression='<store>')
+        bar = StoreLookup().setup(expression='<store>')
+
+        batcher.load(foo, 'c1', mock.MagicMock())
+        batcher.load(bar, 'c2', mock.MagicMock())
+
+        self.assertTrue(batcher)
+        self.assertEqual(len(batcher.batches), 1)
+        schedule.assert_called_once_with(batcher.dispatch)
+
+        batcher.dispatch()
+
+        self.assertFalse(batcher)
+
+
+class TestMapBatched(unittest.TestCase):
+    def setUp(self):
+        super(TestMapBatched, self).setUp()
+        StoreLookup.calls = []
+        self.config = {
+            'customer': 'customer_id.<store>.name',
+            'dealer': 'dealer_id.<store>.name',
+            'deals': ListConfig('deals', {
+                'customer': 'customer_id.<store>.name',
+            }),
+        }
+
+    def mapper(self, **attrs):
+        return SimpleMapper(self.config, lookup_registry=batching_registry,
+                            **attrs)
+
+    def test_map_data(self):
+        mapper = self.mapper(fail_mode='skip')
+
+        self.assertTrue(mapper.config.batched())
+        actual = mapper.map_data(DATA)
+
+        self.assertEqual(actual, {
+            'customer': 'Jane',
+            'dealer': 'Dealer',
+            'deals': [
+                {'customer': 'Jane'},
+                {'customer': 'John'},
+                {'customer': 'Jane'},
+                {},
+            ],
+        })
+        self.assertEqual(StoreLookup.calls, [['c1', 'd1', 'c2', 'missing']])
+
+    def test_map_data_default(self):
+        mapper = self.mapper(fail_mode='default', default=None)
+
+        actual = mapper.map_data(DATA)
+
+        self.assertEqual(actual['deals'][3], {'customer': None})
+
+    def test_map_data_fail(self):
+        mapper = self.mapper()
+
+        with self.assertRaises(KeyError):
+            mapper.map_data(DATA)
+
+    def test_map_data_not_batched(self):
+        mapper = SimpleMapper({'customer': 'customer_id'})
+
+        self.assertFalse(mapper.config.batched())
+        self.assertEqual(mapper.map_data(DATA), {'customer': 'c1'})
+
+    def test_map_to_json(self):
+        mapper = self.mapper(fail_mode='skip')
+
+        actual = mapper.map_to_json(DATA)
+
+        self.assertEqual(json.loads(actual), mapper.map_data(DATA))
+        self.assertEqual(StoreLookup.calls[0], ['c1', 'd1', 'c2', 'missing'])
+
+    def test_map_record(self):
+        mapper = SimpleMapper({
+            'customer': 'customer_id.<store>.name',
+            'dealer': 'dealer_id.<store>.name',
+            'missing': 'missing.<store>',
+        }, lookup_registry=batching_registry, fail_mode='skip')
+
+        actual = mapper.map_record(DATA)
+
+        self.assertEqual(actual, ('Jane', 'Dealer', SKIPPED))
+        self.assertEqual(StoreLookup.calls, [['c1', 'd1']])
+
+    def test_map_columnar(self):
+        mapper = SimpleMapper({
+            'customer': 'customer_id.<store>.name',
+            'dealer': 'dealer_id.<store>.name',
+            'value': Value(1),
+        }, lookup_registry=batching_registry, fail_mode='default',
+            default=None)
+        documents = [{'customer_id': i, 'dealer_id': 'd1'}
+                     for i in ('c1', 'c2', 'missing')]
+
+        actual = mapper.map_columnar(documents, use_numpy=False)
+
+        self.assertEqual(actual['customer'].values, ['Jane', 'John', None])
+        self.assertEqual(actual['customer'].mask, [False, False, True])
+        self.assertEqual(actual['dealer'].values, ['Dealer'] * 3)
+        self.assertEqual(actual['value'].values, [1, 1, 1])
+        self.assertEqual(StoreLookup.calls, [['c1', 'd1', 'c2', 'missing']])
+
+    def test_map_columnar_fail(self):
+        mapper = SimpleMapper({'customer': 'customer_id.<store>.name'},
+                              lookup_registry=batching_registry)
+
+        with self.assertRaises(KeyError):
+            mapper.map_columnar([{'customer_id': 'missing'}])
+
+    def test_map_lazy(self):
+        mapper = self.mapper()
+
+        with self.assertRaises(ValueError):
+            mapper.map_lazy(DATA)
+
+    def test_map_many(self):
+        mapper = SimpleMapper({'customer': 'customer_id.<store>.name'},
+                              lookup_registry=batching_registry)
+        documents = [{'customer_id': i} for i in ('c1', 'c2', 'c1')]
+
+        actual = list(mapper.map_many(documents, batch_size=2))
+
+        self.assertEqual(actual, [
+            {'customer': 'Jane'},
+            {'customer': 'John'},
+            {'customer': 'Jane'},
+        ])
+        self.assertEqual(StoreLookup.calls, [['c1', 'c2'], ['c1']])
+
+    def test_map_many_error(self):
+        mapper = SimpleMapper({'customer': 'customer_id.<store>.name'},
+                              lookup_registry=batching_registry)
+        documents = [{'customer_id': i} for i in ('c1', 'missing')]
+        actual = mapper.map_many(documents, batch_size=2)
+
+        self.assertEqual(next(actual), {'customer': 'Jane'})
+        with self.assertRaises(KeyError):
+            next(actual)
+
+    def test_map_many_slow_capture(self):
+        capture = mock.MagicMock()
+        capture.is_slow.side_effect = [False, True]
+        mapper = SimpleMapper({'customer': 'customer_id.<store>.name'},
+                              lookup_registry=batching_registry,
+                              slow_capture=capture)
+        documents = [{'customer_id': i} for i in ('c1', 'missing')]
+        actual = mapper.map_many(documents, batch_size=2)
+
+        self.assertEqual(next(actual), {'customer': 'Jane'})
+        with self.assertRaises(KeyError):
+            next(actual)
+        capture.capture.assert_called_once_with(
+            mock.ANY, {'customer_id': 'missing'}, mock.ANY, {},
+        )
+
+    def test_call_slow_capture(self):
+        capture = mock.MagicMock()
+        capture.is_slow.return_value = True
+        mapper = SimpleMapper({'customer': 'customer_id.<store>.name'},
+                              lookup_registry=batching_registry,
+                              slow_capture=capture)
+
+        actual = mapper.map_data(DATA)
+
+        self.assertEqual(actual, {'customer': 'Jane'})
+        capture.capture.assert_called_once_with(
+            mock.ANY, DATA, mock.ANY, {},
+        )
+
+    def test_map_batched(self):
+        mapper = self.mapper(fail_mode='skip')
+        instances = [mapper(), mapper()]
+        instances[0].data = DATA
+        instances[1].data = {'customer_id': 'c2'}
+
+        elapsed = [None, None]
+
+        actual = map_batched(instances, elapsed)
+
+        self.assertEqual(actual[1], ({'customer': 'John'}, None))
+        self.assertEqual(len(StoreLookup.calls), 1)
+        self.assertTrue(all(i >= 0 for i in elapsed))
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from decimal import Decimal
+
+import mock
+import six
+
+from simplepath.capture import (
+    SlowDocumentCapture,
+    load_case,
+    main,
+    mapper_reference,
+    replay,
+    sample_document,
+    truncate_lists,
+)
+from simplepath.lazyjson import loads
+from simplepath.mapper import Mapper, SimpleMapper
+
+
+class CapturedMapper(Mapper):
+    config = {
+        'foo': 'foo',
+    }
+
+
+class TestHelpers(unittest.TestCase):
+    def test_mapper_reference(self):
+        self.assertEqual(
+            mapper_reference(CapturedMapper),
+            'tests.test_capture:CapturedMapper',
+        )
+
+    def test_mapper_reference_not_importable(self):
+        self.assertIsNone(mapper_reference(SimpleMapper({'foo': 'foo'})))
+        self.assertIsNone(mapper_reference(CapturedMapper.select(['foo'])))
+
+    def test_truncate_lists(self):
+        data = {'foo': [{'bar': [1, 2, 3]}, 2, 3]}
+
+        self.assertDictEqual(
+            truncate_lists(data, 1),
+            {'foo': [{'bar': [1]}]},
+        )
+
+    def test_sample_document(self):
+        self.assertEqual(
+            sample_document({'foo': [1, 2]}, None),
+            ('{"foo": [1, 2]}', False),
+        )
+
+    def test_sample_document_truncated(self):
+        data = {'foo': list(range(100))}
+
+        actual, truncated = sample_document(data, 50)
+
+        self.assertTrue(truncated)
+        self.assertLessEqual(len(actual), 50)
+        self.assertTrue(json.loads(actual)['foo'])
+
+    def test_sample_document_lazy(self):
+        self.assertEqual(
+            sample_document(loads('{"foo": [1, {"bar": 2}]}'), None),
+            ('{"foo": [1, {"bar": 2}]}', False),
+        )
+
+    def test_sample_document_not_serializable(self):
+        with self.assertRaises(TypeError):
+            sample_document({'foo': Decimal('1.5')}, None)
+
+    def test_sample_document_does_not_fit(self):
+        self.assertEqual(
+            sample_document({'foo': 'a' * 100}, 50),
+            (None, True),
+        )
+
+
+class TestSlowDocumentCapture(unittest.TestCase):
+    def setUp(self):
+        super(TestSlowDocumentCapture, self).setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.spool = os.path.join(self.tmp, 'spool')
+        self.capture = SlowDocumentCapture(self.spool, threshold=0.5)
+
+    def tearDown(self):
+        super(TestSlowDocumentCapture, self).tearDown()
+        shutil.rmtree(self.tmp)
+
+    def test_is_slow(self):
+        self.assertTrue(self.capture.is_slow(0.5))
+        self.assertFalse(self.capture.is_slow(0.1))
+
+    def test_capture(self):
+        path = self.capture.capture(
+            CapturedMapper(), {'foo': 'bar'}, 1.5, {'foo': 1.5},
+        )
+
+        self.assertEqual(os.listdir(self.spool), [os.path.basename(path)])
+        case = load_case(path)
+        self.assertEqual(case['mapper'], 'tests.test_capture:CapturedMapper')
+        self.assertEqual(case['elapsed'], 1.5)
+        self.assertEqual(case['timings'], {'foo': 1.5})
+        self.assertFalse(case['truncated'])
+        self.assertEqual(case['document'], {'foo': 'bar'})
+
+    def test_capture_full(self):
+        self.capture.max_files = 1
+        self.capture.capture(CapturedMapper(), {}, 1, {})
+
+        actual = self.capture.capture(CapturedMapper(), {}, 1, {})
+
+        self.assertIsNone(actual)
+        self.assertEqual(len(os.listdir(self.spool)), 1)
+
+    @mock.patch('simplepath.capture.sample_document')
+    def test_capture_error(self, mock_sample_document):
+        mock_sample_document.side_effect = ValueError
+
+        actual = self.capture.capture(CapturedMapper(), {}, 1, {})
+
+        self.assertIsNone(actual)
+
+    def test_replay(self):
+        path = self.capture.capture(CapturedMapper(), {'foo': 'bar'}, 1, {})
+
+        output, stats = replay(path)
+
+        self.assertDictEqual(output, {'foo': 'bar'})
+        self.assertTrue(stats.total_calls)
+
+    def test_replay_not_profiled(self):
+        path = self.capture.capture(CapturedMapper(), {'foo': 'bar'}, 1, {})
+
+        output, stats = replay(path, profile=False)
+
+        self.assertDictEqual(output, {'foo': 'bar'})
+        self.assertIsNone(stats)
+
+    def test_capture_not_serializable(self):
+        actual = self.capture.capture(
+            CapturedMapper(), {'foo': Decimal('1.5')}, 1, {},
+        )
+
+        self.assertIsNone(actual)
+        self.assertEqual(os.listdir(self.spool), [])
+
+    def test_replay_not_importable(self):
+        mapper = SimpleMapper({'foo': 'foo'})
+        path = self.capture.capture(mapper(), {'foo': 'bar'}, 1, {})
+
+        with self.assertRaises(ValueError):
+            replay(path)
+        output, _ = replay(path, mapper=mapper, profile=False)
+        self.assertDictEqual(output, {'foo': 'bar'})
+
+    def test_replay_no_document(self):
+        self.capture.max_bytes = 1
+        path = self.capture.capture(CapturedMapper(), {'foo': 'bar'}, 1, {})
+
+        with self.assertRaises(ValueError):
+            replay(path)
+
+    @mock.patch('sys.stderr', new_callable=six.StringIO)
+    def test_main(self, mock_stderr):
+        path = self.capture.capture(CapturedMapper(), {'foo': 'bar'}, 1, {})
+
+        main([path, '--limit', '1'])
+
+        self.assertIn('tests.test_capture:CapturedMapper',
+                      mock_stderr.getvalue())
+        self.assertIn('function calls', mock_stderr.getvalue())
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from simplepath import cli
+from simplepath.mapper import Mapper
+
+
+class PlanetMapper(Mapper):
+    config = {
+        'name': 'planet.name',
+    }
+
+
+PLANETS = ['Mercury', 'Venus', 'Earth', 'Mars']
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        super(TestCli, self).setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.input = self.write('input.jsonl', '\n'.join(
+            [json.dumps({'planet': {'name': i}}) for i in PLANETS]
+            + ['', '{"planet": 5}']
+        ))
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp, name)
+        with io.open(path, 'w', encoding='utf-8') as fid:
+            fid.write(text)
+        return path
+
+    def main(self, *argv, **kwargs):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        status = cli.main(list(argv), stdout=stdout, stderr=stderr,
+                          **kwargs)
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_load_mapper_reference(self):
+        self.assertIs(
+            cli.load_mapper('tests.test_cli:PlanetMapper'), PlanetMapper,
+        )
+
+    def test_load_mapper_json(self):
+        path = self.write('config.json', '{"name": "planet.name"}')
+
+        mapper = cli.load_mapper(path)
+
+        self.assertEqual(mapper.map_data({'planet': {'name': 'Mars'}}),
+                         {'name': 'Mars'})
+
+    def test_load_mapper_yaml(self):
+        path = self.write('config.yaml', 'name: planet.name\n')
+        yaml = mock.MagicMock()
+        yaml.safe_load.return_value = {'name': 'planet.name'}
+
+        with mock.patch.dict('sys.modules', {'yaml': yaml}):
+            mapper = cli.load_mapper(path)
+
+        self.assertEqual(mapper.map_data({'planet': {'name': 'Mars'}}),
+                         {'name': 'Mars'})
+
+    def test_load_mapper_yaml_missing(self):
+        path = self.write('config.yml', 'name: planet.name\n')
+
+        with mock.patch.dict('sys.modules', {'yaml': None}):
+            with self.assertRaises(ValueError):
+                cli.load_mapper(path)
+
+    def test_process(self):
+        cli.initialize('tests.test_cli:PlanetMapper')
+
+        self.assertEqual(
+            cli.process((1, '{"planet": {"name": "Mars"}}')),
+            (1, '{"name": "Mars"}', None),
+        )
+        number, text, error = cli.process((2, '{"planet": 5}'))
+        self.assertEqual(number, 2)
+        self.assertIsNone(text)
+        self.assertIn('TypeError', error)
+
+    def test_iter_lines(self):
+        other = self.write('other.jsonl', '{}\n')
+        stdin = io.StringIO('[]\n\n')
+
+        actual = list(cli.iter_lines([self.input, '-', other], stdin=stdin))
+
+        self.assertEqual([i for i, _ in actual], [1, 2, 3, 4, 6, 7, 9])
+        self.assertEqual(actual[-1][1], '{}\n')
+
+    def test_main(self):
+        status, stdout, stderr = self.main(
+            'tests.test_cli:PlanetMapper', self.input,
+        )
+
+        self.assertEqual(status, 1)
+        self.assertEqual(
+            [json.loads(i)['name'] for i in stdout.splitlines()], PLANETS,
+        )
+        self.assertIn('line 6: TypeError', stderr)
+        self.assertIn('Mapped 4 documents with 1 errors', stderr)
+
+    def test_main_stdin_output(self):
+        output = os.path.join(self.tmp, 'output.jsonl')
+
+        status, stdout, _ = self.main(
+            'tests.test_cli:PlanetMapper', '-o', output,
+            stdin=io.StringIO('{"planet": {"name": "Mars"}}\n'),
+        )
+
+        self.assertEqual(status, 0)
+        self.assertEqual(stdout, '')
+        with io.open(output, encoding='utf-8') as fid:
+            self.assertEqual(fid.read(), '{"name": "Mars"}\n')
+
+    def test_main_workers(self):
+        status, stdout, stderr = self.main(
+            'tests.test_cli:PlanetMapper', self.input,
+            '--workers', '2', '--chunk-size', '1',
+        )
+
+        self.assertEqual(status, 1)
+        self.assertEqual(
+            [json.loads(i)['name'] for i in stdout.splitlines()], PLANETS,
+        )
+        self.assertIn('with 1 errors', stderr)
+        self.assertIn('2 workers', stderr)
+
+    def test_main_workers_unordered(self):
+        _, stdout, _ = self.main(
+            'tests.test_cli:PlanetMapper', self.input,
+            '--workers', '2', '--unordered',
+        )
+
+        self.assertEqual(
+            sorted(json.loads(i)['name'] for i in stdout.splitlines()),
+            sorted(PLANETS),
+        )
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import unittest
+from decimal import Decimal
+
+import mock
+
+from simplepath import columnar
+from simplepath.columnar import Column, column_dtype, to_array
+from simplepath.mapper import ListConfig, SimpleMapper, Value
+
+
+DOCUMENTS = [
+    {'id': 1, 'price': 1.5, 'active': True, 'name': 'foo'},
+    {'id': 2, 'price': 2, 'active': False},
+    {'id': 3, 'active': True, 'name': 'bar'},
+]
+
+
+class TestColumnDtype(unittest.TestCase):
+    def test_column_dtype(self):
+        self.assertEqual(column_dtype([True, None], [False, True]), 'bool')
+        self.assertEqual(column_dtype([1, 2], [False, False]), 'int64')
+        self.assertEqual(column_dtype([1, 2.5], [False, False]), 'float64')
+        self.assertIsNone(column_dtype([1, True], [False, False]))
+        self.assertIsNone(column_dtype([Decimal(1)], [False]))
+        self.assertIsNone(column_dtype(['foo'], [False]))
+        self.assertIsNone(column_dtype([None], [True]))
+
+
+@unittest.skipIf(columnar.numpy is None, 'NumPy is not installed')
+class TestToArray(unittest.TestCase):
+    def test_to_array(self):
+        actual = to_array([1, None, 3], [False, True, False])
+
+        self.assertEqual(actual.values.dtype.name, 'int64')
+        self.assertEqual(actual.values.tolist(), [1, 0, 3])
+        self.assertEqual(actual.mask.tolist(), [False, True, False])
+
+    def test_to_array_overflow(self):
+        actual = to_array([2 ** 70], [False])
+
+        self.assertEqual(actual, Column([2 ** 70], [False]))
+
+    def test_to_array_not_numeric(self):
+        actual = to_array(['foo'], [False])
+
+        self.assertEqual(actual, Column(['foo'], [False]))
+
+
+class TestMapColumnar(unittest.TestCase):
+    def setUp(self):
+        super(TestMapColumnar, self).setUp()
+        self.mapper = SimpleMapper({
+            'id': 'id',
+            'price': 'price',
+            'active': 'active',
+            'name': 'name',
+            'source': Value('api'),
+        }, fail_mode='default', default=None)
+
+    def test_map_columnar_lists(self):
+        actual = self.mapper.map_columnar(DOCUMENTS, use_numpy=False)
+
+        self.assertDictEqual(actual, {
+            'id': Column([1, 2, 3], [False, False, False]),
+            'price': Column([1.5, 2, None], [False, False, True]),
+            'active': Column([True, False, True], [False, False, False]),
+            'name': Column(['foo', None, 'bar'], [False, True, False]),
+            'source': Column(['api'] * 3, [False, False, False]),
+        })
+
+    def test_map_columnar_skip(self):
+        mapper = SimpleMapper({'name': 'name'}, fail_mode='skip')
+
+        actual = mapper.map_columnar(DOCUMENTS, use_numpy=False)
+
+        self.assertEqual(
+            actual['name'], Column(['foo', None, 'bar'], [False, True, False]),
+        )
+
+    def test_map_columnar_fail(self):
+        mapper = SimpleMapper({'name': 'name'})
+
+        with self.assertRaises(KeyError):
+            mapper.map_columnar(DOCUMENTS)
+
+    def test_map_columnar_not_flat(self):
+        for config in ({'nested': {'id': 'id'}},
+                       {'items': ListConfig('items', {'id': 'id'})}):
+            with self.assertRaises(ValueError):
+                SimpleMapper(config).map_columnar(DOCUMENTS)
+
+    @mock.patch.object(columnar, 'numpy', None)
+    def test_map_columnar_numpy_missing(self):
+        with self.assertRaises(ValueError):
+            self.mapper.map_columnar(DOCUMENTS, use_numpy=True)
+
+        actual = self.mapper.map_columnar(DOCUMENTS)
+        self.assertIsInstance(actual['id'].values, list)
+
+    @unittest.skipIf(columnar.numpy is None, 'NumPy is not installed')
+    def test_map_columnar_numpy(self):
+        actual = self.mapper.map_columnar(DOCUMENTS)
+
+        self.assertEqual(actual['id'].values.dtype.name, 'int64')
+        self.assertEqual(actual['price'].values.dtype.name, 'float64')
+        self.assertEqual(actual['price'].values.tolist(), [1.5, 2.0, 0.0])
+        self.assertEqual(actual['price'].mask.tolist(),
+                         [False, False, True])
+        self.assertEqual(actual['active'].values.dtype.name, 'bool')
+        self.assertEqual(actual['name'],
+                         Column(['foo', None, 'bar'], [False, True, False]))
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import unittest
+
+import mock
+
+from simplepath.deferred import (
+    Deferred,
+    Pending,
+    compile_expression,
+    is_asynchronous,
+    is_batched,
+)
+from simplepath.expressions import Expression
+from simplepath.lookups import BaseLookup, KeyLookup
+from simplepath.mapper import ListConfig, SimpleMapper, Value
+
+
+class BatchedLookup(BaseLookup):
+    def batch_call(self, nodes):
+        return nodes
+
+
+class AsynchronousLookup(BaseLookup):
+    asynchronous = True
+
+
+DATA = {
+    'foo': {'bar': [1, 2]},
+    'items': [{'id': 1}, {'id': 2, 'name': 'two'}],
+}
+
+
+class TestHelpers(unittest.TestCase):
+    def test_is_batched(self):
+        self.assertTrue(is_batched(BatchedLookup()))
+        self.assertFalse(is_batched(KeyLookup()))
+
+    def test_is_asynchronous(self):
+        self.assertTrue(is_asynchronous(AsynchronousLookup()))
+        self.assertFalse(is_asynchronous(KeyLookup()))
+
+    def test_compile_expression(self):
+        expression = Expression('foo.bar.0')
+
+        chain, hashes, batched, asynchronous = compile_expression(expression)
+
+        self.assertEqual(chain, list(expression))
+        self.assertEqual(hashes, ['foo', 'foo.bar', 'foo.bar.0'])
+        self.assertEqual(batched, frozenset())
+        self.assertEqual(asynchronous, frozenset())
+        self.assertIs(compile_expression(expression)[1], hashes)
+
+
+class TestDeferred(unittest.TestCase):
+    def map(self, mapper, data):
+        instance = mapper()
+        instance.data = data
+        done = mock.MagicMock()
+
+        Deferred(instance).map_root(done)
+
+        done.assert_called_once_with(mock.ANY, mock.ANY)
+        return done.call_args[0]
+
+    def test_map_root(self):
+        mapper = SimpleMapper({
+            'foo': 'foo.bar.0',
+            'missing': 'foo.missing',
+            'nested': {'bar': 'foo.bar', 'missing': 'missing'},
+            'items': ListConfig('items', {'id': 'id', 'name': 'name'}),
+            'missing_items': ListConfig('missing', {'id': 'id'}),
+            'list': ['foo.bar.1', 'missing'],
+            'value': Value('value'),
+        }, fail_mode='skip')
+
+        output, error = self.map(mapper, DATA)
+
+        self.assertIsNone(error)
+        self.assertEqual(output, mapper.map_data(DATA))
+        self.assertEqual(list(output), list(mapper.map_data(DATA)))
+
+    def test_map_root_default(self):
+        mapper = SimpleMapper({
+            'missing': 'missing',
+            'items': ListConfig('items', {'name': 'name'}),
+        }, fail_mode='default', default=None)
+
+        output, error = self.map(mapper, DATA)
+
+        self.assertEqual(output, mapper.map_data(DATA))
+
+    def test_map_root_fail(self):
+        mapper = SimpleMapper({'missing': 'missing'})
+
+        output, error = self.map(mapper, DATA)
+
+        self.assertIsNone(output)
+        self.assertIsInstance(error, KeyError)
+
+    def test_evaluate_pending(self):
+        instance = SimpleMapper({'foo': 'foo'})()
+        pending = Pending()
+        lut = {'foo': pending}
+        done = mock.MagicMock()
+
+        Deferred(instance).evaluate(Expression('foo.bar'), DATA, DATA,
+                                    lut, done)
+
+        self.assertFalse(done.called)
+        pending.resolve({'bar': 'bar'}, None)
+        done.assert_called_once_with('bar', None)
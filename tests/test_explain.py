@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import unittest
+
+from simplepath.explain import Namespace, PlanExplainer, chain_hashes, explain
+from simplepath.expressions import Expression
+from simplepath.lookups import BaseLookup
+from simplepath.mapper import ListConfig, MapperConfig, Value
+from simplepath.registry import LookupRegistry, registry
+
+
+class CustomLookup(BaseLookup):
+    def __call__(self, node, extra=None):
+        return node
+
+
+class TestHelpers(unittest.TestCase):
+    def test_chain_hashes(self):
+        expression = Expression('foo.bar.<find:a=b>')
+
+        self.assertListEqual(
+            chain_hashes(expression),
+            ['foo', 'foo.bar', 'foo.bar.<find:a=b>'],
+        )
+
+
+class TestNamespace(unittest.TestCase):
+    def setUp(self):
+        super(TestNamespace, self).setUp()
+        self.namespace = Namespace('document')
+        self.namespace.add('a', Expression('foo.bar.a'))
+        self.namespace.add('b', Expression('foo.bar.b'))
+        self.namespace.add('c', Expression('foo.c'))
+
+    def test_shared_prefixes(self):
+        self.assertDictEqual(
+            dict(self.namespace.shared_prefixes),
+            {'foo': 3, 'foo.bar': 2},
+        )
+
+    def test_steps(self):
+        self.assertEqual(self.namespace.unoptimized_steps, 8)
+        self.assertEqual(self.namespace.optimized_steps, 8)
+        self.assertEqual(self.namespace.evaluations, 5)
+
+
+class TestPlanExplainer(unittest.TestCase):
+    def setUp(self):
+        super(TestPlanExplainer, self).setUp()
+        self.registry = LookupRegistry('test', registry)
+        self.registry.register('custom', CustomLookup)
+        self.config = MapperConfig({
+            'a': 'foo.bar.a',
+            'b': 'foo.bar.b',
+            'c': {
+                'd': 'foo.<custom>',
+            },
+            'e': ListConfig('foo.items', {
+                'f': 'item.name',
+                'g': 'item.type',
+            }),
+            'h': Value('hello'),
+        }, lookup_registry=self.registry)
+
+    def test_explain(self):
+        explainer = PlanExplainer(self.config, name='MyMapper')
+
+        actual = explainer.explain()
+
+        self.assertIn('Plan for MyMapper (optimized)', actual)
+        self.assertIn('chain: LUT[foo.bar] -> b', actual)
+        self.assertIn('[document] foo.bar (2 consumers)', actual)
+        self.assertIn('[e[]] item (2 consumers)', actual)
+        self.assertIn('c.d: <custom> (CustomLookup)', actual)
+        self.assertIn('h: value', actual)
+        self.assertIn('[document] without optimization: 10, '
+                      'with optimization: 9, '
+                      'unique evaluations: 6', actual)
+        self.assertIn('[e[]] without optimization: 4, '
+                      'with optimization: 4, '
+                      'unique evaluations: 3 (per element)', actual)
+
+    def test_explain_not_optimized(self):
+        config = MapperConfig({'a': 'foo'}, optimize=False)
+
+        actual = explain(config)
+
+        self.assertIn('Plan for MapperConfig (not optimized)', actual)
+        self.assertIn('Shared prefixes:\n  none', actual)
+        self.assertIn('Custom lookups (opaque to optimization):\n  none',
+                      actual)
@@ -8,6 +8,7 @@ import six
 from simplepath.constants import DEFAULT_FAIL_MODE, NONE, FailMode
 from simplepath.exceptions import Skip
 from simplepath.expressions import Expression
+from simplepath.lookups import BaseLookup, FanOutLookup, KeyLookup, LUTLookup
 from simplepath.registry import LookupRegistry, registry
 
 
@@ -46,10 +47,33 @@ class TestExpression(unittest.TestCase):
             mock.sentinel.three,
         ]
 
+        self.expression.uses_side_input = True
+
         actual = self.expression.copy_with(iterable)
 
         self.assertListEqual(actual, iterable)
         self.assertIsNot(actual, self.expression)
+        self.assertTrue(actual.uses_side_input)
+
+    def test_side_input_keys(self):
+        class CustomLookup(BaseLookup):
+            pass
+
+        lookup_registry = LookupRegistry('test', registry)
+        lookup_registry.register('custom', CustomLookup)
+
+        actual = Expression('<side>.foo.<custom>.bar',
+                            lookup_registry=lookup_registry)
+        fan_out = Expression('<side>.foo.<*>.<custom>',
+                             lookup_registry=lookup_registry)
+
+        self.assertSetEqual(actual.side_input_keys, {'<side>', '<side>.foo'})
+        self.assertSetEqual(fan_out.side_input_keys, {'<side>', '<side>.foo'})
+
+    def test_uses_side_input(self):
+        self.assertTrue(Expression('<side>.foo').uses_side_input)
+        self.assertFalse(Expression('foo.<side>').uses_side_input)
+        self.assertFalse(Expression('foo').uses_side_input)
 
     def test_has_default(self):
         values = {
@@ -63,6 +87,21 @@ class TestExpression(unittest.TestCase):
             self.expression.default = k
             self.assertEqual(self.expression.has_default, expected)
 
+    def test_full_chain(self):
+        self.expression.extend([mock.sentinel.foo])
+
+        self.assertListEqual(self.expression.full_chain, [mock.sentinel.foo])
+
+    def test_full_chain_optimized(self):
+        lookup = LUTLookup().setup(expression='foo', key='foo',
+                                   chain=[mock.sentinel.foo])
+        self.expression.extend([lookup, mock.sentinel.bar])
+
+        self.assertListEqual(
+            self.expression.full_chain,
+            [mock.sentinel.foo, mock.sentinel.bar],
+        )
+
     def test_compile(self):
         mock_lookup = mock.MagicMock()
         mock_animals = mock.MagicMock()
@@ -97,6 +136,20 @@ class TestExpression(unittest.TestCase):
             ),
         ])
 
+    def test_compile_fan_out(self):
+        expression = Expression('fees.<*>.items.<*>.amount')
+
+        self.assertEqual(len(expression), 2)
+        fan_out = expression[1]
+        self.assertIsInstance(fan_out, FanOutLookup)
+        self.assertEqual(fan_out.prefix, 'fees.<*>')
+        self.assertEqual(fan_out.expression, '<*>.items.<*>.amount')
+        self.assertIsInstance(fan_out.tail[0], KeyLookup)
+        nested = fan_out.tail[1]
+        self.assertIsNone(nested.prefix)
+        self.assertEqual(nested.expression, '<*>.amount')
+        self.assertEqual(len(nested.tail), 1)
+
     def test_compile_not_valid_lookup(self):
         mock_lookup = mock.MagicMock()
         self.expression.expression = 'foo.<animals:parrot,cat=dog>.bar'
@@ -138,6 +191,7 @@ class TestExpression(unittest.TestCase):
                 'super_root': mock.sentinel.super_root,
                 'lut': lut,
                 'context': {'some': 'stuff'},
+                'scratch': None,
             }
         )
 
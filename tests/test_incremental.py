@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import copy
+import unittest
+
+import mock
+
+from simplepath.expressions import Expression
+from simplepath.incremental import (
+    element_indexes,
+    map_nodes,
+    normalize_path,
+    remap,
+    static_path,
+)
+from simplepath.lookups import BaseLookup
+from simplepath.mapper import (
+    ListConfig,
+    MapperListConfig,
+    SimpleMapper,
+)
+from simplepath.registry import LookupRegistry, registry
+
+
+class CustomLookup(BaseLookup):
+    def __call__(self, node, extra=None):
+        return extra['root']['total']
+
+
+class UpperLookup(BaseLookup):
+    calls = []
+
+    def __call__(self, node, extra=None):
+        return self.batch_call([node])[0]
+
+    def batch_call(self, nodes):
+        self.calls.append(nodes)
+        return [i.upper() for i in nodes]
+
+
+custom_registry = LookupRegistry('incremental', registry)
+custom_registry.register('total', CustomLookup)
+custom_registry.register('upper', UpperLookup)
+
+DATA = {
+    'customer': {'name': 'Jane', 'city': 'Springfield'},
+    'total': 10,
+    'order': {'items': [
+        {'code': 'A', 'price': 1},
+        {'code': 'B', 'price': 2},
+        {'code': 'C', 'price': 3},
+    ]},
+}
+
+
+class TestHelpers(unittest.TestCase):
+    def test_normalize_path(self):
+        self.assertEqual(normalize_path('foo.0.bar'), ('foo', '0', 'bar'))
+        self.assertEqual(normalize_path(['foo', 0]), ('foo', '0'))
+
+    def test_static_path(self):
+        self.assertEqual(static_path(Expression('foo.bar')), ('foo', 'bar'))
+        self.assertIsNone(static_path(Expression('foo.<find:a=b>')))
+
+    def test_element_indexes(self):
+        node = MapperListConfig('order.items', {'price': 'price'})
+        items = DATA['order']['items']
+        previous = [{}, {}, {}]
+
+        def indexes(*changed):
+            return element_indexes(node, changed, items, previous)
+
+        self.assertSetEqual(indexes(('order', 'items', '1', 'price')), {1})
+        self.assertSetEqual(indexes(('order', 'items', '1', 'code')), set())
+        self.assertSetEqual(indexes(('order', 'items', '0'),
+                                    ('order', 'items', '2', 'price')),
+                            {0, 2})
+        self.assertIsNone(indexes(('order', 'items')))
+        self.assertIsNone(indexes(('order',)))
+        self.assertIsNone(indexes(('order', 'items', '5')))
+        self.assertIsNone(indexes(('order', 'items', '-1')))
+        self.assertIsNone(element_indexes(
+            node, [('order', 'items', '1')], items, [{}],
+        ))
+        self.assertIsNone(element_indexes(
+            node, [('order', 'items', '1')], None, previous,
+        ))
+
+
+class TestRemap(unittest.TestCase):
+    def setUp(self):
+        super(TestRemap, self).setUp()
+        self.mapper = SimpleMapper({
+            'name': 'customer.name',
+            'city': 'customer.city',
+            'nested': {'name': 'customer.name', 'email': 'customer.email'},
+            'items': ListConfig('order.items', {'code': 'code',
+                                                'price': 'price'}),
+            'codes': ListConfig('order.<find:code=A>.items', {'a': 'a'}),
+            'total': '<total>',
+        }, fail_mode='skip', lookup_registry=custom_registry)
+        self.data = copy.deepcopy(DATA)
+        self.previous = self.mapper.map_data(self.data)
+
+    def remap(self, *changed):
+        actual = remap(self.mapper, self.previous, self.data, changed)
+        self.assertDictEqual(actual, self.mapper.map_data(self.data))
+        return actual
+
+    def test_remap_key(self):
+        self.data['customer']['name'] = 'John'
+        self.data['customer']['email'] = 'john@example.com'
+
+        with mock.patch('simplepath.incremental.map_nodes',
+                        wraps=map_nodes) as mock_map_nodes:
+            actual = self.remap('customer.name', 'customer.email')
+
+        self.assertEqual(actual['nested']['email'], 'john@example.com')
+        self.assertEqual(self.previous['nested'], {'name': 'Jane'})
+        self.assertIs(actual['items'], self.previous['items'])
+        self.assertSetEqual(set(mock_map_nodes.call_args[0][1]), {
+            ('name',), ('nested', 'name'), ('nested', 'email'), ('total',),
+        })
+        # affected nodes are mapped without compiling selected mappers
+        self.assertIsNone(self.mapper.config._selections)
+
+    def test_remap_skipped(self):
+        del self.data['customer']['city']
+
+        actual = self.remap(['customer', 'city'])
+
+        self.assertNotIn('city', actual)
+
+    @mock.patch('simplepath.incremental.map_nodes')
+    def test_remap_list_element(self, mock_map_nodes):
+        mock_map_nodes.return_value = {('total',): 10}
+        self.data['order']['items'][1]['price'] = 20
+
+        actual = self.remap(('order', 'items', 1, 'price'))
+
+        self.assertEqual(actual['items'][1], {'code': 'B', 'price': 20})
+        self.assertIs(actual['items'][0], self.previous['items'][0])
+        # only opaque custom lookup is remapped as a whole
+        mock_map_nodes.assert_called_once_with(mock.ANY, {
+            ('total',): self.mapper.config['total'],
+        })
+
+    def test_remap_batched(self):
+        mapper = SimpleMapper({
+            'name': 'customer.name.<upper>',
+            'city': 'customer.city.<upper>',
+        }, lookup_registry=custom_registry)
+        previous = mapper.map_data(self.data)
+        self.data['customer'] = {'name': 'John', 'city': 'Shelbyville'}
+        UpperLookup.calls = []
+
+        actual = remap(mapper, previous, self.data, ['customer'])
+
+        self.assertDictEqual(actual, {'name': 'JOHN', 'city': 'SHELBYVILLE'})
+        self.assertEqual(UpperLookup.calls, [['John', 'Shelbyville']])
+
+    def test_remap_list(self):
+        self.data['order']['items'].append({'code': 'D', 'price': 4})
+
+        actual = self.remap('order.items.3')
+
+        self.assertEqual(len(actual['items']), 4)
+
+    def test_remap_unrelated(self):
+        self.data['customer']['phone'] = '555'
+
+        with mock.patch('simplepath.incremental.map_nodes',
+                        wraps=map_nodes) as mock_map_nodes:
+            actual = self.remap('customer.phone', 'other')
+
+        self.assertEqual(list(mock_map_nodes.call_args[0][1]), [('total',)])
+        self.assertIsNot(actual, self.previous)
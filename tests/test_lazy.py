@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import unittest
+
+import mock
+
+from simplepath.lazy import LazyMapping
+from simplepath.mapper import ListConfig, MapperBase, SimpleMapper
+
+
+DATA = {
+    'planet': {'name': 'Earth', 'moons': 1},
+    'residents': [{'name': 'people'}],
+}
+
+
+class TestLazyMapping(unittest.TestCase):
+    def setUp(self):
+        super(TestLazyMapping, self).setUp()
+        self.mapper = SimpleMapper({
+            'name': 'planet.name',
+            'moons': 'planet.moons',
+            'rings': 'planet.rings',
+            'nested': {
+                'name': 'planet.name',
+                'rings': 'planet.rings',
+            },
+            'residents': ListConfig('residents', {'name': 'name'}),
+        }, fail_mode='skip')
+
+    def test_map_lazy(self):
+        actual = self.mapper.map_lazy(DATA)
+
+        self.assertIsInstance(actual, LazyMapping)
+        self.assertEqual(actual.evaluated, set())
+
+    def test_getitem(self):
+        output = self.mapper.map_lazy(DATA)
+
+        # optimized expression which reuses a prefix computed
+        # by another expression which was not evaluated yet
+        self.assertEqual(output['moons'], 1)
+        self.assertEqual(output['name'], 'Earth')
+        self.assertEqual(output.evaluated, {'moons', 'name'})
+        self.assertEqual(output['residents'], [{'name': 'people'}])
+
+    def test_getitem_skipped(self):
+        output = self.mapper.map_lazy(DATA)
+
+        with self.assertRaises(KeyError):
+            output['rings']
+        with self.assertRaises(KeyError):
+            output['rings']
+        with self.assertRaises(KeyError):
+            output['missing']
+        self.assertIsNone(output.get('rings'))
+        self.assertNotIn('rings', output)
+
+    @mock.patch.object(MapperBase, 'map_node')
+    def test_getitem_memoized(self, mock_map_node):
+        output = self.mapper.map_lazy(DATA)
+
+        self.assertIs(output['name'], output['name'])
+
+        self.assertEqual(mock_map_node.call_count, 1)
+
+    def test_nested(self):
+        output = self.mapper.map_lazy(DATA)
+
+        nested = output['nested']
+
+        self.assertIsInstance(nested, LazyMapping)
+        self.assertEqual(nested['name'], 'Earth')
+        self.assertEqual(nested.evaluated, {'name'})
+
+    def test_iteration(self):
+        output = self.mapper.map_lazy(DATA)
+
+        self.assertEqual(len(output), 4)
+        self.assertSetEqual(set(output),
+                            {'name', 'moons', 'nested', 'residents'})
+
+    def test_materialize(self):
+        output = self.mapper.map_lazy(DATA)
+
+        actual = output.materialize()
+
+        self.assertDictEqual(actual, self.mapper.map_data(DATA))
+        self.assertIs(type(actual['nested']), dict)
+        self.assertEqual(output, self.mapper.map_data(DATA))
+
+    def test_repr(self):
+        output = self.mapper.map_lazy(DATA)
+        output['name']
+
+        self.assertEqual(repr(output), '<LazyMapping evaluated=1/5>')
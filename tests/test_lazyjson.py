@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+import os
+import tempfile
+import unittest
+
+from simplepath.lazyjson import (
+    LazyArray,
+    LazyObject,
+    index_container,
+    load,
+    loads,
+    materialize,
+)
+
+
+DOCUMENT = {
+    'foo': {'bar': [1, 2.5, None, True], 'empty': {}},
+    'escaped': 'quote " and brackets ]}, \\\\',
+    'list': [{'id': 1}, {'id': 2, 'nested': [[]]}],
+    'unicode': '☃',
+}
+
+
+class TestIndexContainer(unittest.TestCase):
+    def test_index_object(self):
+        text = b'{"a" : 1, "b":{"c": [1, "]"]} }'
+
+        children, end = index_container(text, 0)
+
+        self.assertEqual(end, len(text))
+        self.assertEqual(
+            [(text[k[0]:k[1]], text[s:e].strip()) for k, s, e in children],
+            [(b'"a"', b'1'), (b'"b"', b'{"c": [1, "]"]}')],
+        )
+
+    def test_index_array(self):
+        text = b'[ 1, "a,b" , [2, 3]]'
+
+        children, end = index_container(text, 0)
+
+        self.assertEqual(end, len(text))
+        self.assertEqual(
+            [text[s:e].strip() for _, s, e in children],
+            [b'1', b'"a,b"', b'[2, 3]'],
+        )
+
+    def test_index_empty(self):
+        self.assertEqual(index_container(b'[ ]', 0), ([], 3))
+        self.assertEqual(index_container(b'{}', 0), ([], 2))
+
+    def test_index_invalid(self):
+        for text in (b'[1, 2', b'{"a": "b', b'[1, , 2]'):
+            with self.assertRaises(ValueError):
+                index_container(text, 0)
+
+
+class TestLazy(unittest.TestCase):
+    def setUp(self):
+        super(TestLazy, self).setUp()
+        self.document = loads(json.dumps(DOCUMENT))
+
+    def test_loads_scalar(self):
+        self.assertEqual(loads(' 5 '), 5)
+        self.assertEqual(loads(b'"foo"'), 'foo')
+
+    def test_object(self):
+        self.assertIsInstance(self.document, LazyObject)
+        self.assertEqual(len(self.document), 4)
+        self.assertSetEqual(set(self.document), set(DOCUMENT))
+        self.assertIn('foo', self.document)
+        self.assertNotIn('bar', self.document)
+        self.assertEqual(self.document['escaped'], DOCUMENT['escaped'])
+        self.assertEqual(self.document['unicode'], '☃')
+        self.assertIsNone(self.document.get('missing'))
+        with self.assertRaises(KeyError):
+            self.document['missing']
+
+    def test_array(self):
+        array = self.document['foo']['bar']
+
+        self.assertIsInstance(array, LazyArray)
+        self.assertEqual(len(array), 4)
+        self.assertEqual(array[1], 2.5)
+        self.assertEqual(array[-1], True)
+        self.assertEqual(array[1:3], [2.5, None])
+        self.assertEqual(list(array), [1, 2.5, None, True])
+        with self.assertRaises(IndexError):
+            array[4]
+
+    def test_memoized(self):
+        self.assertIs(self.document['foo'], self.document['foo'])
+
+    def test_equality(self):
+        self.assertEqual(self.document, DOCUMENT)
+        self.assertEqual(self.document['list'], DOCUMENT['list'])
+        self.assertNotEqual(self.document['list'], [])
+        self.assertNotEqual(self.document['list'], 'foo')
+
+    def test_materialize(self):
+        self.document['list'][1]['nested']
+
+        actual = materialize({
+            'document': self.document,
+            'items': [self.document['list']],
+            'value': 1,
+        })
+
+        self.assertEqual(actual, {
+            'document': DOCUMENT,
+            'items': [DOCUMENT['list']],
+            'value': 1,
+        })
+        self.assertIs(type(actual['document']), dict)
+        self.assertIs(type(actual['items'][0]), list)
+
+
+class TestLoad(unittest.TestCase):
+    def setUp(self):
+        super(TestLoad, self).setUp()
+        fid = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        self.addCleanup(os.remove, fid.name)
+        with fid:
+            fid.write(json.dumps(DOCUMENT).encode('utf-8'))
+        self.path = fid.name
+
+    def test_load(self):
+        document = load(self.path)
+
+        with document as data:
+            self.assertEqual(data['foo']['bar'][1], 2.5)
+            self.assertEqual(data['unicode'], '☃')
+
+        self.assertIsNone(document.mmap)
@@ -8,14 +8,24 @@ import mock
 
 from simplepath.constants import FailMode
 from simplepath.expressions import Expression
+from simplepath.lazyjson import loads
 from simplepath.lookups import (
     ArithmeticLookup,
     AsTypeLookup,
     BaseLookup,
+    FanOutLookup,
+    FilterLookup,
     FindInListLookup,
+    GroupByLookup,
     KeyLookup,
     LUTLookup,
+    ReferenceTableLookup,
+    SideInputLookup,
+    SortByLookup,
 )
+from simplepath.lut import Scratch
+from simplepath.projection import ANY, PathNode
+from simplepath.tables import tables
 
 
 class TestBaseLookup(unittest.TestCase):
@@ -50,6 +60,7 @@ class TestBaseLookup(unittest.TestCase):
                 'super_root': mock.sentinel.super_root,
                 'lut': mock.sentinel.lut,
                 'context': mock.sentinel.context,
+                'scratch': mock.sentinel.scratch,
             }
         )
 
@@ -59,12 +70,51 @@ class TestBaseLookup(unittest.TestCase):
             super_root=mock.sentinel.super_root,
             lut={},
             context=mock.sentinel.context,
+            scratch=mock.sentinel.scratch,
         )
 
+    def test_cached(self):
+        scratch = Scratch()
+        factory = mock.MagicMock()
+
+        actual = self.lookup.cached({'scratch': scratch}, ('foo',), factory)
+
+        self.assertEqual(actual, factory.return_value)
+        self.assertIs(self.lookup.cached({'scratch': scratch}, ['foo'],
+                                         factory), actual)
+        self.assertIsNot(
+            BaseLookup().cached({'scratch': scratch}, ('bar',), factory),
+            None,
+        )
+        self.assertEqual(factory.call_count, 2)
+        self.assertIn((BaseLookup, 'foo'), scratch)
+
+    def test_cached_namespace(self):
+        scratch = Scratch()
+        factory = mock.MagicMock()
+
+        actual = self.lookup.cached({'scratch': scratch}, ('foo',), factory,
+                                    namespace=KeyLookup)
+
+        self.assertIs(KeyLookup().cached({'scratch': scratch}, ('foo',),
+                                         factory), actual)
+        factory.assert_called_once_with()
+
+    def test_cached_no_scratch(self):
+        factory = mock.MagicMock()
+
+        self.lookup.cached({}, ('foo',), factory)
+        self.lookup.cached(None, ('foo',), factory)
+
+        self.assertEqual(factory.call_count, 2)
+
     def test_call(self):
         with self.assertRaises(NotImplementedError):
             self.lookup(node=None)
 
+    def test_project(self):
+        self.assertIsNone(self.lookup.project(PathNode()))
+
     def test__repr(self):
         self.assertEqual(repr(self.lookup), '<BaseLookup >')
 
@@ -93,11 +143,26 @@ class TestKeyLookup(unittest.TestCase):
 
         self.assertEqual(actual, 'bar')
 
+    def test_call_lazy(self):
+        self.lookup.key = '-1'
+
+        actual = self.lookup(loads('[1, 2]'))
+
+        self.assertEqual(actual, 2)
+
     def test_repr(self):
         self.lookup.key = 'foo'
 
         self.assertEqual(self.lookup.repr(), 'key="foo"')
 
+    def test_project(self):
+        self.lookup.key = 'foo'
+        node = PathNode()
+
+        actual = self.lookup.project(node)
+
+        self.assertIs(actual, node['foo'])
+
 
 class TestFindInListLookup(unittest.TestCase):
     def setUp(self):
@@ -151,6 +216,38 @@ class TestFindInListLookup(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.lookup(data)
 
+    def test_call_early_exit(self):
+        self.lookup.conditions = {'foo': 'bar'}
+        data = [{'foo': 'bar', 'id': 1}, 'junk', None]
+        scratch = Scratch()
+
+        with mock.patch.object(FindInListLookup, 'group',
+                               autospec=True) as mock_group:
+            actual = self.lookup(data, extra={'scratch': scratch})
+
+        self.assertIs(actual, data[0])
+        self.assertFalse(mock_group.called)
+
+    def test_call_repeated(self):
+        data = [{'id': '1'}, 'junk', {'id': '2'}, {'id': '2', 'x': 1}]
+        extra = {'scratch': Scratch()}
+        second = FindInListLookup().setup(id='2', expression='<find:id=2>')
+        self.lookup.conditions = {'id': '1'}
+
+        with mock.patch.object(FindInListLookup, 'group', autospec=True,
+                               side_effect=FindInListLookup.group) \
+                as mock_group:
+            self.assertIs(self.lookup(data, extra), data[0])
+            self.assertEqual(mock_group.call_count, 0)
+            # repeated lookups on the same list share the index
+            self.assertIs(second(data, extra), data[2])
+            self.assertIs(self.lookup(data, extra), data[0])
+            with self.assertRaises(ValueError):
+                self.lookup.conditions = {'id': '3'}
+                self.lookup(data, extra)
+
+        self.assertEqual(mock_group.call_count, 1)
+
     def test_repr(self):
         self.lookup.conditions = {
             'foo': 'bar',
@@ -158,12 +255,243 @@ class TestFindInListLookup(unittest.TestCase):
 
         self.assertEqual(self.lookup.repr(), 'foo="bar"')
 
+    def test_project(self):
+        self.lookup.conditions = {'foo': 'bar'}
+        node = PathNode()
+
+        actual = self.lookup.project(node)
+
+        self.assertIs(actual, node[ANY])
+        self.assertTrue(actual['foo'].full)
+
+
+class TestFilterLookup(unittest.TestCase):
+    def setUp(self):
+        super(TestFilterLookup, self).setUp()
+        self.lookup = FilterLookup().setup(type='fee',
+                                           expression='<filter:type=fee>')
+        self.data = [
+            {'type': 'fee', 'amount': 1},
+            {'type': 'tax', 'amount': 2},
+            {'type': 'fee', 'amount': 3},
+        ]
+
+    def test_call(self):
+        actual = self.lookup(self.data)
+
+        self.assertEqual(actual, [self.data[0], self.data[2]])
+
+    def test_call_no_matches(self):
+        self.lookup.conditions = {'type': 'rebate'}
+
+        self.assertEqual(self.lookup(self.data), [])
+
+    def test_call_shared_index(self):
+        extra = {'scratch': Scratch()}
+        tax = FilterLookup().setup(type='tax', expression='<filter:type=tax>')
+
+        with mock.patch.object(FilterLookup, 'group', autospec=True,
+                               side_effect=FilterLookup.group) \
+                as mock_group:
+            self.assertEqual(len(self.lookup(self.data, extra)), 2)
+            self.assertEqual(tax(self.data, extra), [self.data[1]])
+
+        self.assertEqual(mock_group.call_count, 1)
+        self.assertEqual(len(extra['scratch']), 1)
+
+    def test_call_index_shared_with_find(self):
+        extra = {'scratch': Scratch()}
+        find = FindInListLookup().setup(type='tax',
+                                        expression='<find:type=tax>')
+
+        with mock.patch.object(FindInListLookup, 'group', autospec=True,
+                               side_effect=FindInListLookup.group) \
+                as mock_group:
+            self.assertEqual(len(self.lookup(self.data, extra)), 2)
+            self.assertIs(find(self.data, extra), self.data[1])
+
+        self.assertEqual(mock_group.call_count, 1)
+
+    def test_call_mixed_types(self):
+        self.lookup.conditions = {'type': 'fee', 'happy': 'rainbows'}
+        data = [
+            'junk',
+            {'type': 'fee'},
+            None,
+            {'type': ['unhashable'], 'happy': 'rainbows'},
+            {'type': 'fee', 'happy': 'rainbows'},
+            5,
+        ]
+
+        for extra in (None, {'scratch': Scratch()}):
+            actual = self.lookup(data, extra)
+
+            self.assertEqual(actual, [data[4]])
+
+    def test_project(self):
+        tree = PathNode()
+
+        actual = self.lookup.project(tree)
+        actual.full = True
+
+        self.assertSetEqual(tree.paths(), {(ANY,)})
+        self.assertIs(actual[ANY], tree[ANY])
+
+
+class TestGroupByLookup(unittest.TestCase):
+    def setUp(self):
+        super(TestGroupByLookup, self).setUp()
+        self.lookup = GroupByLookup().setup('type',
+                                            expression='<group_by:type>')
+
+    def test_call(self):
+        data = [
+            {'type': 'tax', 'amount': 1},
+            {'type': 'fee', 'amount': 2},
+            {'amount': 3},
+            {'type': 'tax', 'amount': 4},
+        ]
+
+        actual = self.lookup(data)
+
+        self.assertEqual(list(actual), ['tax', 'fee', None])
+        self.assertDictEqual(actual, {
+            'tax': [data[0], data[3]],
+            'fee': [data[1]],
+            None: [data[2]],
+        })
+
+    def test_project(self):
+        tree = PathNode()
+
+        actual = self.lookup.project(tree)
+        actual.child('fee').child(ANY).child('amount').full = True
+
+        self.assertSetEqual(tree.paths(), {(ANY, 'type'), (ANY, 'amount')})
+
+    def test_repr(self):
+        self.assertEqual(self.lookup.repr(), 'field="type"')
+
+
+class TestSortByLookup(unittest.TestCase):
+    def setUp(self):
+        super(TestSortByLookup, self).setUp()
+        self.data = [
+            {'amount': 2, 'id': 1},
+            {'id': 2},
+            {'amount': 1, 'id': 3},
+            {'amount': 2, 'id': 4},
+        ]
+
+    def sort(self, *args):
+        lookup = SortByLookup().setup(expression='<sort_by>', *args)
+        return [i['id'] for i in lookup(self.data)]
+
+    def test_config(self):
+        lookup = SortByLookup()
+
+        for reverse in (True, 'reverse', 'true', 'True'):
+            lookup.config('amount', reverse)
+            self.assertTrue(lookup.reverse)
+        lookup.config('amount')
+        self.assertFalse(lookup.reverse)
+
+    def test_call(self):
+        self.assertEqual(self.sort('amount'), [3, 1, 4, 2])
+
+    def test_call_reverse(self):
+        self.assertEqual(self.sort('amount', 'reverse'), [1, 4, 3, 2])
+
+    def test_project(self):
+        tree = PathNode()
+
+        actual = SortByLookup().setup(
+            'amount', expression='<sort_by:amount>',
+        ).project(tree)
+        actual.full = True
+
+        self.assertSetEqual(tree.paths(), {(ANY,)})
+
+    def test_repr(self):
+        lookup = SortByLookup().setup('amount', 'reverse',
+                                      expression='<sort_by:amount,reverse>')
+
+        self.assertEqual(lookup.repr(), 'field="amount", reverse=True')
+
+
+class TestFanOutLookup(unittest.TestCase):
+    def setUp(self):
+        super(TestFanOutLookup, self).setUp()
+        self.lookup = FanOutLookup().setup(expression='<*>')
+        self.lookup.fan_out([
+            KeyLookup().setup('amount', expression='amount'),
+        ], prefix='fees.<*>')
+        self.fees = [{'amount': 1}, {'amount': 2}]
+
+    def test_fan_out(self):
+        self.assertEqual(self.lookup.expression, '<*>.amount')
+        self.assertEqual(self.lookup.prefix, 'fees.<*>')
+
+    def test_call(self):
+        lut = {}
+
+        actual = self.lookup(self.fees, extra={'lut': lut})
+
+        self.assertEqual(actual, [1, 2])
+        self.assertDictEqual(lut, {
+            'fees.<*>': self.fees,
+            'fees.<*>.amount': [1, 2],
+        })
+
+    def test_call_lut(self):
+        lut = {'fees.<*>': [{'amount': 3}]}
+
+        actual = self.lookup(self.fees, extra={'lut': lut})
+
+        self.assertEqual(actual, [3])
+
+    def test_call_nested(self):
+        self.lookup.prefix = None
+        lut = {}
+
+        actual = self.lookup(self.fees, extra={'lut': lut})
+
+        self.assertEqual(actual, [1, 2])
+        self.assertDictEqual(lut, {})
+
+    def test_call_not_list(self):
+        with self.assertRaises(TypeError):
+            self.lookup({'amount': 1})
+
+    def test_project(self):
+        tree = PathNode()
+
+        actual = self.lookup.project(tree)
+        actual.full = True
+
+        self.assertEqual(tree.paths(), {(ANY, 'amount')})
+        self.assertIs(actual[ANY], tree[ANY]['amount'])
+
+    def test_repr(self):
+        self.assertEqual(self.lookup.repr(), 'tail=[<KeyLookup key="amount">]')
+
 
 class TestLUTLookup(unittest.TestCase):
     def setUp(self):
         super(TestLUTLookup, self).setUp()
         self.lookup = LUTLookup()
 
+    def test_config(self):
+        self.lookup.config('foo', [mock.sentinel.lookup])
+
+        self.assertEqual(self.lookup.key, 'foo')
+        self.assertListEqual(self.lookup.chain, [mock.sentinel.lookup])
+
+    def test_config_no_chain(self):
+        self.lookup.config('foo')
+
+        self.assertListEqual(self.lookup.chain, [])
+
     def test_call(self):
         self.lookup.key = 'foo'
 
@@ -171,6 +499,78 @@ class TestLUTLookup(unittest.TestCase):
 
         self.assertEqual(actual, 'bar')
 
+    def test_call_not_evaluated(self):
+        foo, bar = KeyLookup(), KeyLookup()
+        foo.setup('foo', expression='foo')
+        bar.setup('bar', expression='bar')
+        self.lookup.config('foo.bar', [foo, bar])
+        lut = {}
+
+        actual = self.lookup({'foo': {'bar': 'baz'}}, extra={'lut': lut})
+
+        self.assertEqual(actual, 'baz')
+        self.assertDictEqual(lut, {'foo': {'bar': 'baz'}, 'foo.bar': 'baz'})
+
+    def test_call_not_evaluated_no_chain(self):
+        self.lookup.config('foo')
+
+        with self.assertRaises(KeyError):
+            self.lookup(None, extra={'lut': {}})
+
+    def test_project(self):
+        self.assertIsNone(self.lookup.project(PathNode()))
+
+
+class TestSideInputLookup(unittest.TestCase):
+    def setUp(self):
+        super(TestSideInputLookup, self).setUp()
+        self.lookup = SideInputLookup().setup(expression='<side>')
+
+    def test_call(self):
+        with self.assertRaises(ValueError):
+            self.lookup(mock.sentinel.node)
+
+    def test_project(self):
+        tree = PathNode()
+
+        actual = self.lookup.project(tree)
+
+        self.assertIsNot(actual, tree)
+        self.assertFalse(tree)
+
+
+class TestReferenceTableLookup(unittest.TestCase):
+    def setUp(self):
+        super(TestReferenceTableLookup, self).setUp()
+        self.lookup = ReferenceTableLookup().setup(
+            'states', 'code', expression='<ref:states,code>',
+        )
+
+    def test_call(self):
+        table = mock.MagicMock()
+
+        with mock.patch.dict(tables, {'states': table}):
+            actual = self.lookup('NY')
+
+        self.assertEqual(actual, table.get.return_value)
+        table.get.assert_called_once_with('code', 'NY')
+
+    def test_call_not_registered(self):
+        with self.assertRaises(ValueError):
+            self.lookup('NY')
+
+    def test_project(self):
+        tree = PathNode()
+
+        actual = self.lookup.project(tree)
+
+        self.assertIsNot(actual, tree)
+        self.assertTrue(tree.full)
+
+    def test_repr(self):
+        self.assertEqual(self.lookup.repr(),
+                         'table="states", key_field="code"')
+
 
 class TestAsTypeLookup(unittest.TestCase):
     def setUp(self):
@@ -200,6 +600,10 @@ class TestAsTypeLookup(unittest.TestCase):
         self.astype_lookup.type = Decimal
         self.assertEqual(Decimal('15.01'), self.astype_lookup('15.01'))
 
+    def test_project(self):
+        node = PathNode()
+        self.assertIs(self.astype_lookup.project(node), node)
+
 
 class TestArithmeticLookup(unittest.TestCase):
     def setUp(self):
@@ -270,6 +674,15 @@ class TestArithmeticLookup(unittest.TestCase):
         self.arith_lookup.config('//', '2')
         self.assertEqual(2, self.arith_lookup(5))
 
+    def test_call_lazy_array(self):
+        self.arith_lookup.config('+', '1')
+        self.assertEqual([1, '1'], self.arith_lookup(loads('[1]')))
+        self.assertEqual([1, '1'], self.arith_lookup([1]))
+
+    def test_project(self):
+        node = PathNode()
+        self.assertIs(self.arith_lookup.project(node), node)
+
 
 class TestCustomLookup(unittest.TestCase):
     def test_shared_global_lut(self):
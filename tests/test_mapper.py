@@ -1,13 +1,24 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+import json
+import os
+import tempfile
 import unittest
 from collections import OrderedDict
 
 import mock
 import six
 
+from simplepath.constants import SKIPPED
 from simplepath.exceptions import Skip
 from simplepath.expressions import Expression
+from simplepath.lazyjson import loads
+from simplepath.lookups import (
+    BaseLookup,
+    FindInListLookup,
+    GroupByLookup,
+    LUTLookup,
+)
 from simplepath.mapper import (
     ListConfig,
     MapperBase,
@@ -18,6 +29,9 @@ from simplepath.mapper import (
     Value,
     map_data,
 )
+from simplepath.memo import clone, digest
+from simplepath.registry import LookupRegistry, registry
+from simplepath.tables import Table, tables
 
 
 TESTING_MODULE = 'simplepath.mapper'
@@ -208,7 +222,7 @@ class TestMapperConfig(unittest.TestCase):
             node2,
         ])
         mock_lut_lookup.return_value.setup.assert_called_once_with(
-            expression='hi', key='hi',
+            expression='hi', key='hi', chain=[node1],
         )
 
     @mock.patch.object(MapperConfig, '_optimize')
@@ -236,6 +250,105 @@ class TestMapperConfig(unittest.TestCase):
         self.assertTrue(self.config.optimized)
         mock_optimize.assert_called_once_with({})
 
+    def test_projection(self):
+        config = MapperConfig({
+            'foo': 'foo.bar',
+            'list': ListConfig('items', {'a': 'a'}),
+            'nested': {'b': 'b'},
+            'values': ['c', Value('d')],
+        })
+
+        actual = config.projection()
+
+        self.assertSetEqual(actual.paths(), {
+            ('foo', 'bar'), ('items', '*', 'a'), ('b',), ('c',),
+        })
+        self.assertIs(config.projection(), actual)
+
+    def test_projection_opaque(self):
+        class CustomLookup(BaseLookup):
+            pass
+
+        lookup_registry = LookupRegistry('test', registry)
+        lookup_registry.register('custom', CustomLookup)
+
+        for value in ('foo.<custom>',
+                      ListConfig('items', {'a': '<custom>'}),
+                      ListConfig('<custom>', {'a': 'a'}),
+                      {'a': '<custom>'},
+                      ['<custom>']):
+            config = MapperConfig({'foo': 'foo', 'bar': value},
+                                  lookup_registry=lookup_registry)
+
+            self.assertIsNone(config.projection())
+
+    def test_dependencies(self):
+        class CustomLookup(BaseLookup):
+            pass
+
+        lookup_registry = LookupRegistry('test', registry)
+        lookup_registry.register('custom', CustomLookup)
+        config = MapperConfig({
+            'foo': 'foo.bar',
+            'nested': {'a': 'a', 'custom': '<custom>'},
+            'list': ListConfig('items', {'a': 'a'}),
+            'value': Value('b'),
+        }, lookup_registry=lookup_registry)
+
+        actual = {
+            path: (node, None if tree is None else tree.paths())
+            for path, node, tree in config.dependencies()
+        }
+
+        self.assertDictEqual(actual, {
+            ('foo',): (config['foo'], {('foo', 'bar')}),
+            ('nested', 'a'): (config['nested']['a'], {('a',)}),
+            ('nested', 'custom'): (config['nested']['custom'], None),
+            ('list',): (config['list'], {('items', '*', 'a')}),
+            ('value',): (config['value'], set()),
+        })
+        self.assertIs(config.dependencies(), config.dependencies())
+
+    def test_select(self):
+        config = MapperConfig({
+            'foo': 'foo.bar.a',
+            'bar': 'foo.bar.b',
+            'nested': {'a': 'foo.bar.c', 'b': 'd'},
+            'list': ListConfig('items', {'a': 'a', 'b': 'b'}),
+            'values': ['c', Value('d')],
+        }, fail_mode='skip')
+
+        actual = config.select(['bar', 'nested.b', ('list', 'b'), 'values'])
+
+        self.assertIsInstance(actual, MapperConfig)
+        self.assertTrue(actual.optimized)
+        self.assertEqual(actual.fail_mode, 'skip')
+        self.assertSetEqual(set(actual), {'bar', 'nested', 'list', 'values'})
+        self.assertSetEqual(set(actual['nested']), {'b'})
+        self.assertIsInstance(actual['list'], MapperListConfig)
+        self.assertEqual(actual['list'].root.expression, 'items')
+        self.assertSetEqual(set(actual['list']), {'b'})
+        # expressions are restored from prefixes rewritten by the optimizer
+        self.assertTrue(any(isinstance(config[i][0], LUTLookup)
+                            for i in ('foo', 'bar')))
+        self.assertEqual(len(actual['bar']), 3)
+        self.assertNotIsInstance(actual['bar'][0], LUTLookup)
+
+    def test_select_whole_nested(self):
+        config = MapperConfig({'nested': {'a': 'a', 'b': 'b'}})
+
+        for paths in (['nested', 'nested.a'], ['nested.a', 'nested']):
+            actual = config.select(paths)
+
+            self.assertSetEqual(set(actual['nested']), {'a', 'b'})
+
+    def test_select_invalid(self):
+        config = MapperConfig({'foo': 'foo', 'nested': {'a': 'a'}})
+
+        for paths in (['bar'], ['nested.b'], ['foo.bar']):
+            with self.assertRaises(KeyError):
+                config.select(paths)
+
 
 class TestMapperListConfig(unittest.TestCase):
     @mock.patch.object(MapperListConfig, 'compile_node')
@@ -305,7 +418,7 @@ class TestMapperBase(unittest.TestCase):
     def setUp(self):
         super(TestMapperBase, self).setUp()
         self.mapper = MapperBase()
-        self.mapper.config = {}
+        self.mapper.config = MapperConfig({})
 
     def test_init(self):
         actual = MapperBase()
@@ -328,6 +441,20 @@ class TestMapperBase(unittest.TestCase):
             self.mapper.lut,
         )
 
+    @mock.patch.object(MapperBase, 'config', mock.sentinel.config,
+                       create=True)
+    @mock.patch('simplepath.explain.explain')
+    def test_explain(self, mock_explain):
+        mock_explain.return_value = 'plan'
+        stream = six.StringIO()
+
+        MapperBase.explain(stream)
+
+        self.assertEqual(stream.getvalue(), 'plan\n')
+        mock_explain.assert_called_once_with(
+            mock.sentinel.config, name='MapperBase',
+        )
+
     @mock.patch.object(MapperBase, '__call__')
     def test_map_data(self, mock_call):
         actual = MapperBase.map_data(mock.sentinel.data)
@@ -335,6 +462,210 @@ class TestMapperBase(unittest.TestCase):
         self.assertEqual(actual, mock_call.return_value)
         mock_call.assert_called_once_with(mock.sentinel.data)
 
+    @mock.patch.object(MapperBase, 'map_data')
+    def test_map_many(self, mock_map_data):
+        actual = MapperBase.map_many([mock.sentinel.foo, mock.sentinel.bar])
+
+        self.assertFalse(mock_map_data.called)
+        self.assertListEqual(list(actual), [mock_map_data.return_value] * 2)
+        mock_map_data.assert_has_calls([
+            mock.call(mock.sentinel.foo),
+            mock.call(mock.sentinel.bar),
+        ])
+
+    @mock.patch(TESTING_MODULE + '.iter_documents')
+    @mock.patch.object(MapperBase, 'map_many')
+    def test_map_stream(self, mock_map_many, mock_iter_documents):
+        actual = MapperBase.map_stream(mock.sentinel.fp, format='jsonl')
+
+        self.assertEqual(actual, mock_map_many.return_value)
+        mock_map_many.assert_called_once_with(
+            mock_iter_documents.return_value,
+        )
+        mock_iter_documents.assert_called_once_with(
+            mock.sentinel.fp, format='jsonl', decoder=None,
+        )
+
+    def test_map_stream_project(self):
+        mapper = SimpleMapper({'foo': 'foo.bar'})
+        fp = six.StringIO('{"foo": {"bar": 1, "baz": 2}, "junk": [1]}\n')
+
+        with mock.patch.object(mapper, 'map_data',
+                               side_effect=lambda i: i) as mock_map_data:
+            actual = list(mapper.map_stream(fp, project=True))
+
+        self.assertListEqual(actual, [{'foo': {'bar': 1}}])
+        self.assertEqual(mock_map_data.call_count, 1)
+
+    def test_map_stream_project_custom_decoder(self):
+        mapper = SimpleMapper({'foo': 'foo.bar'})
+        fp = six.StringIO('{"foo": {"bar": 1, "baz": 2}, "junk": [1]}\n')
+        decoder = mock.MagicMock(side_effect=json.loads)
+
+        with mock.patch.object(mapper, 'map_data', side_effect=lambda i: i):
+            actual = list(mapper.map_stream(fp, decoder=decoder,
+                                            project=True))
+
+        self.assertListEqual(actual, [{'foo': {'bar': 1}}])
+        self.assertTrue(decoder.called)
+
+    def test_map_data_only(self):
+        mapper = SimpleMapper({
+            'foo': 'foo',
+            'nested': {'bar': 'bar', 'baz': 'baz'},
+        })
+
+        actual = mapper.map_data({'foo': 1, 'bar': 2}, only=['nested.bar'])
+
+        self.assertDictEqual(actual, {'nested': {'bar': 2}})
+
+    def test_select(self):
+        mapper = SimpleMapper({'foo': 'foo', 'bar': 'bar'})
+
+        selected = mapper.select(['foo'])
+
+        self.assertTrue(issubclass(selected, mapper))
+        self.assertEqual(selected.__name__, mapper.__name__)
+        self.assertSetEqual(set(selected.config), {'foo'})
+        self.assertIs(mapper.select(('foo',)), selected)
+        self.assertIsNot(mapper.select(['bar']), selected)
+        self.assertSetEqual(set(mapper.config), {'foo', 'bar'})
+
+    @mock.patch('simplepath.mapper.SELECTIONS_CACHE_SIZE', 2)
+    def test_select_bounded(self):
+        mapper = SimpleMapper({'foo': 'foo', 'bar': 'bar', 'baz': 'baz'})
+
+        selected = mapper.select(['foo'])
+        mapper.select(['bar'])
+        mapper.select(['baz'])
+
+        self.assertEqual(len(mapper.config._selections), 2)
+        self.assertIsNot(mapper.select(['foo']), selected)
+        self.assertIs(mapper.select(['foo', 'foo']), mapper.select(['foo']))
+
+    def test_map_to_json(self):
+        mapper = SimpleMapper({
+            'foo': 'foo',
+            'missing': 'missing',
+            'nested': {'bar': 'bar.0', 'missing': 'missing'},
+            'items': ListConfig('items', {'id': 'id', 'missing': 'missing'}),
+            'none': ListConfig('none', {'id': 'id'}),
+            'skipped': ListConfig('missing', {'id': 'id'}),
+            'list': ['foo', 'missing'],
+            'value': Value({'hello': 'world'}),
+        }, fail_mode='skip')
+        data = {
+            'foo': 'é',
+            'bar': [1.5],
+            'items': [{'id': 1}, {'id': 2}],
+            'none': None,
+        }
+
+        actual = mapper.map_to_json(data)
+
+        self.assertEqual(actual, json.dumps(mapper.map_data(data)))
+        self.assertDictEqual(json.loads(actual), {
+            'foo': 'é',
+            'nested': {'bar': 1.5},
+            'items': [{'id': 1}, {'id': 2}],
+            'none': [],
+            'value': {'hello': 'world'},
+        })
+
+    def test_map_to_json_file(self):
+        mapper = SimpleMapper({
+            'items': ListConfig('items', {'id': 'id'}),
+        })
+        data = {'items': [{'id': i} for i in range(10000)]}
+        fp = mock.MagicMock(wraps=six.StringIO())
+
+        self.assertIsNone(mapper.map_to_json(data, fp))
+
+        self.assertEqual(json.loads(fp.getvalue()), mapper.map_data(data))
+        self.assertGreater(fp.write.call_count, 1)
+
+    def test_map_record(self):
+        mapper = SimpleMapper(OrderedDict((
+            ('foo', 'foo'),
+            ('bar', 'bar'),
+            ('nested', {'foo': 'foo'}),
+        )), fail_mode='skip')
+
+        self.assertEqual(mapper.map_record({'foo': 1}),
+                         (1, SKIPPED, {'foo': 1}))
+
+        actual = mapper.map_record({'foo': 1, 'bar': 2}, kind='namedtuple')
+        self.assertEqual(actual._asdict(),
+                         {'foo': 1, 'bar': 2, 'nested': {'foo': 1}})
+
+        actual = list(mapper.map_records([{'foo': 1}, {'foo': 2}],
+                                         kind='slots'))
+        self.assertEqual([i.foo for i in actual], [1, 2])
+        self.assertEqual([i.bar for i in actual], [SKIPPED, SKIPPED])
+
+    def test_record_layout(self):
+        mapper = SimpleMapper({'foo': 'foo'})
+
+        layout = mapper.record_layout('namedtuple')
+
+        self.assertIs(mapper.record_layout('namedtuple'), layout)
+        self.assertEqual(layout.fields, ('foo',))
+        self.assertEqual(layout.record_class.__name__, 'MapperRecord')
+
+    def test_map_json_file(self):
+        mapper = SimpleMapper({
+            'foo': 'foo.bar',
+            'found': 'items.<find:id=2>',
+        })
+        fid = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        self.addCleanup(os.remove, fid.name)
+        with fid:
+            fid.write(json.dumps({
+                'foo': {'bar': [1, 2]},
+                'items': [{'id': '1'}, {'id': '2', 'value': {'nested': True}}],
+            }).encode('utf-8'))
+
+        actual = mapper.map_json_file(fid.name)
+
+        self.assertDictEqual(actual, {
+            'foo': [1, 2],
+            'found': {'id': '2', 'value': {'nested': True}},
+        })
+        self.assertIsInstance(actual['foo'], list)
+        self.assertIsInstance(actual['found'], dict)
+
+    def test_map_lazy_document_arith(self):
+        mapper = SimpleMapper({'foo': 'foo.bar.<arith:+,1>'})
+        data = {'foo': {'bar': [1, 2]}}
+
+        actual = mapper.map_data(loads(json.dumps(data)))
+
+        self.assertDictEqual(actual, mapper.map_data(data))
+        self.assertDictEqual(actual, {'foo': [1, 2, '1']})
+
+    def test_input_paths(self):
+        mapper = SimpleMapper({'foo': 'foo.bar', 'items': 'items.0'})
+
+        self.assertSetEqual(mapper.input_paths(), {
+            ('foo', 'bar'), ('items', '0'),
+        })
+
+    def test_input_paths_everything(self):
+        mapper = SimpleMapper({'foo': 'foo.bar'})
+
+        with mock.patch.object(mapper.config, 'projection',
+                               return_value=None):
+            self.assertIsNone(mapper.input_paths())
+            self.assertIsNone(mapper.projected_decoder())
+            self.assertEqual(mapper.prune({'foo': 1}), {'foo': 1})
+
+    def test_prune(self):
+        mapper = SimpleMapper({'foo': 'foo.bar'})
+
+        actual = mapper.prune({'foo': {'bar': 1, 'baz': 2}, 'junk': 1})
+
+        self.assertDictEqual(actual, {'foo': {'bar': 1}})
+
     def test_map_node_invalid(self):
         node = mock.MagicMock(spec=int)
 
@@ -348,7 +679,7 @@ class TestMapperBase(unittest.TestCase):
 
     @mock.patch.object(MapperBase, 'get_lookup_context')
     def test_map_node_expression(self, mock_get_lookup_context):
-        node = mock.MagicMock(spec=Expression)
+        node = mock.MagicMock(spec=Expression, uses_side_input=False)
 
         actual = self.mapper.map_node(
             node,
@@ -363,6 +694,7 @@ class TestMapperBase(unittest.TestCase):
             lut=mock.sentinel.lut,
             super_root=mock.sentinel.root,
             context=mock_get_lookup_context.return_value,
+            scratch=self.mapper.scratch,
         )
 
     @mock.patch.object(MapperBase, 'map_config_node')
@@ -432,6 +764,451 @@ class TestMapperBase(unittest.TestCase):
 
         self.assertEqual(actual, mock.sentinel.value)
 
+    def test_call_metrics(self):
+        mock_registry = mock.MagicMock()
+        metrics = mock_registry.get.return_value
+        metrics.should_sample.return_value = True
+        self.mapper.metrics = True
+        self.mapper.metrics_registry = mock_registry
+        self.mapper.config = MapperConfig({
+            'foo': 'foo',
+            'bar': 'bar',
+            'baz': {'baz': 'baz'},
+        }, fail_mode='default', default=None)
+
+        actual = self.mapper({'foo': 'foo'})
+
+        self.assertDictEqual(actual, {
+            'foo': 'foo',
+            'bar': None,
+            'baz': {'baz': None},
+        })
+        self.assertIsNone(self.mapper.collector)
+        mock_registry.get.assert_called_once_with(MapperBase)
+        metrics.record.assert_called_once_with(
+            mock.ANY, None, skips=0, defaults=2,
+        )
+
+    def test_call_metrics_skips(self):
+        mock_registry = mock.MagicMock()
+        metrics = mock_registry.get.return_value
+        metrics.should_sample.return_value = True
+        self.mapper.metrics = True
+        self.mapper.metrics_registry = mock_registry
+        self.mapper.config = MapperConfig({
+            'foo': 'foo',
+            'bar': 'bar',
+        }, fail_mode='skip')
+
+        actual = self.mapper({'foo': 'foo'})
+
+        self.assertDictEqual(actual, {'foo': 'foo'})
+        metrics.record.assert_called_once_with(
+            mock.ANY, None, skips=1, defaults=0,
+        )
+
+    def test_call_metrics_document_size(self):
+        mock_registry = mock.MagicMock()
+        metrics = mock_registry.get.return_value
+        metrics.should_sample.return_value = True
+        self.mapper.metrics = True
+        self.mapper.metrics_document_size = True
+        self.mapper.metrics_registry = mock_registry
+        self.mapper.config = MapperConfig({'foo': 'foo'})
+
+        self.mapper({'foo': 'foo'})
+
+        metrics.record.assert_called_once_with(
+            mock.ANY, 2, skips=0, defaults=0,
+        )
+
+    @mock.patch.object(MapperBase, 'map_node')
+    def test_call_metrics_not_sampled(self, mock_map_node):
+        mock_registry = mock.MagicMock()
+        metrics = mock_registry.get.return_value
+        metrics.should_sample.return_value = False
+        self.mapper.metrics = True
+        self.mapper.metrics_registry = mock_registry
+
+        actual = self.mapper(mock.sentinel.data)
+
+        self.assertEqual(actual, mock_map_node.return_value)
+        metrics.count.assert_called_once_with()
+        self.assertFalse(metrics.record.called)
+
+    @mock.patch.object(MapperBase, 'map_node')
+    def test_call_metrics_not_sampled_error(self, mock_map_node):
+        mock_map_node.side_effect = ValueError
+        mock_registry = mock.MagicMock()
+        metrics = mock_registry.get.return_value
+        metrics.should_sample.return_value = False
+        self.mapper.metrics = True
+        self.mapper.metrics_registry = mock_registry
+
+        with self.assertRaises(ValueError):
+            self.mapper(mock.sentinel.data)
+
+        metrics.count.assert_called_once_with(error=True)
+        self.assertFalse(metrics.record.called)
+
+    def test_dump_metrics(self):
+        mock_registry = mock.MagicMock()
+        metrics = mock_registry.get.return_value
+        metrics.should_sample.return_value = True
+        self.mapper.metrics = True
+        self.mapper.metrics_registry = mock_registry
+        self.mapper.config = MapperConfig({
+            'foo': 'foo',
+            'bar': 'bar',
+        }, fail_mode='skip')
+
+        actual = self.mapper.dump({'foo': 'foo'})
+
+        self.assertEqual(actual, '{"foo": "foo"}')
+        metrics.record.assert_called_once_with(
+            mock.ANY, None, skips=1, defaults=0,
+        )
+
+    def test_call_slow_capture(self):
+        self.mapper.slow_capture = mock.MagicMock()
+        self.mapper.slow_capture.is_slow.return_value = True
+        self.mapper.config = MapperConfig({
+            'foo': 'foo',
+            'bar': 'bar',
+        }, fail_mode='skip')
+
+        actual = self.mapper({'foo': 'foo'})
+
+        self.assertDictEqual(actual, {'foo': 'foo'})
+        self.mapper.slow_capture.capture.assert_called_once_with(
+            self.mapper, {'foo': 'foo'}, mock.ANY, mock.ANY,
+        )
+        timings = self.mapper.slow_capture.capture.call_args[0][3]
+        self.assertSetEqual(set(timings), {'foo', 'bar'})
+
+    def test_call_slow_capture_error(self):
+        self.mapper.slow_capture = mock.MagicMock()
+        self.mapper.slow_capture.is_slow.return_value = True
+        self.mapper.config = MapperConfig({
+            'foo': 'foo',
+            'bar': 'bar',
+        })
+
+        with self.assertRaises(KeyError):
+            self.mapper({'foo': 'foo'})
+
+        self.mapper.slow_capture.capture.assert_called_once_with(
+            self.mapper, {'foo': 'foo'}, mock.ANY, mock.ANY,
+        )
+        timings = self.mapper.slow_capture.capture.call_args[0][3]
+        self.assertIn('bar', timings)
+        self.assertIsNone(self.mapper.timings)
+
+    def test_dump_slow_capture(self):
+        self.mapper.slow_capture = mock.MagicMock()
+        self.mapper.slow_capture.is_slow.return_value = True
+        self.mapper.config = MapperConfig({
+            'foo': 'foo',
+            'bar': {'baz': 'foo'},
+        })
+
+        actual = self.mapper.dump({'foo': 'foo'})
+
+        self.assertEqual(actual, '{"foo": "foo", "bar": {"baz": "foo"}}')
+        self.mapper.slow_capture.capture.assert_called_once_with(
+            self.mapper, {'foo': 'foo'}, mock.ANY, mock.ANY,
+        )
+        timings = self.mapper.slow_capture.capture.call_args[0][3]
+        self.assertSetEqual(set(timings), {'foo', 'bar'})
+        self.assertIsNone(self.mapper.timings)
+
+    def test_call_slow_capture_fast(self):
+        self.mapper.slow_capture = mock.MagicMock()
+        self.mapper.slow_capture.is_slow.return_value = False
+        self.mapper.config = MapperConfig({'foo': 'foo'})
+
+        actual = self.mapper({'foo': 'foo'})
+
+        self.assertDictEqual(actual, {'foo': 'foo'})
+        self.assertFalse(self.mapper.slow_capture.capture.called)
+
+    def test_call_memoize_documents(self):
+        mapper = SimpleMapper({'foo': {'bar': 'foo'}}, memoize_documents=2)
+
+        first = mapper()({'foo': 'foo'})
+        first['foo']['bar'] = 'changed'
+        second = mapper()({'foo': 'foo'})
+
+        self.assertDictEqual(second, {'foo': {'bar': 'foo'}})
+        self.assertEqual(mapper.document_cache().hits, 1)
+        self.assertEqual(mapper.document_cache().misses, 1)
+
+    def test_call_memoize_documents_clone_once(self):
+        mapper = SimpleMapper({'foo': {'bar': 'foo'}}, memoize_documents=2)
+
+        with mock.patch('simplepath.mapper.clone',
+                        side_effect=clone) as mock_clone:
+            first = mapper()({'foo': 'foo'})
+
+        self.assertEqual(mock_clone.call_count, 1)
+        self.assertIsNot(mapper.document_cache().data[digest({'foo': 'foo'})],
+                         first)
+
+    def test_call_memoize_documents_type_sensitive(self):
+        mapper = SimpleMapper({'foo': 'foo'}, memoize_documents=2)
+
+        self.assertIs(mapper()({'foo': 1})['foo'], 1)
+        self.assertIs(mapper()({'foo': True})['foo'], True)
+
+    def test_call_memoize_documents_frozen(self):
+        mapper = SimpleMapper({'foo': {'bar': 'foo'}},
+                              memoize_documents=2, memoize_frozen=True)
+
+        first = mapper()({'foo': 'foo'})
+        second = mapper()({'foo': 'foo'})
+
+        self.assertIs(first, second)
+        with self.assertRaises(TypeError):
+            first['foo']['bar'] = 'changed'
+
+    def test_call_memoize_documents_unhashable(self):
+        mapper = SimpleMapper({'foo': 'foo'}, memoize_documents=2)
+
+        self.assertDictEqual(mapper()({'foo': {1}}), {'foo': {1}})
+        self.assertEqual(len(mapper.document_cache()), 0)
+
+    def test_call_memoize_documents_side_input_replaced(self):
+        mapper = SimpleMapper({'rate': '<side>.rate'}, side_input={'rate': 1},
+                              memoize_documents=10)
+
+        self.assertDictEqual(mapper()({}), {'rate': 1})
+        mapper.side_input = {'rate': 2}
+
+        self.assertDictEqual(mapper()({}), {'rate': 2})
+        self.assertEqual(len(mapper.document_cache()), 1)
+
+    def test_call_memoize_documents_table_registered(self):
+        mapper = SimpleMapper({'name': 'code.<ref:codes,code>.name'},
+                              memoize_documents=10)
+
+        with mock.patch.dict(tables):
+            tables.register('codes', Table([{'code': 'A', 'name': 'foo'}]))
+            self.assertDictEqual(mapper()({'code': 'A'}), {'name': 'foo'})
+            tables.register('codes', Table([{'code': 'A', 'name': 'bar'}]))
+
+            self.assertDictEqual(mapper()({'code': 'A'}), {'name': 'bar'})
+
+    def test_document_cache_per_class(self):
+        foo = SimpleMapper({'foo': 'foo'}, memoize_documents=2)
+        bar = SimpleMapper({'bar': 'bar'}, memoize_documents=2)
+
+        self.assertIs(foo.document_cache(), foo.document_cache())
+        self.assertIsNot(foo.document_cache(), bar.document_cache())
+
+    def test_call_scratch(self):
+        builds = []
+
+        class IndexLookup(BaseLookup):
+            def __call__(self, node, extra=None):
+                root = extra['super_root']
+                index = self.cached(extra, ('codes', id(root)), lambda: (
+                    builds.append(1) or
+                    {i['code']: i for i in root['codes']}
+                ))
+                return index[node]['name']
+
+        lookup_registry = LookupRegistry('test', registry)
+        lookup_registry.register('code', IndexLookup)
+        mapper = SimpleMapper({
+            'items': ListConfig('items', {'name': 'code.<code>'}),
+        }, lookup_registry=lookup_registry)
+        data = {
+            'codes': [{'code': 'A', 'name': 'a'}, {'code': 'B', 'name': 'b'}],
+            'items': [{'code': 'A'}, {'code': 'B'}, {'code': 'A'}],
+        }
+
+        actual = mapper.map_data(data)
+        mapper.map_data(data)
+
+        self.assertDictEqual(actual, {'items': [
+            {'name': 'a'}, {'name': 'b'}, {'name': 'a'},
+        ]})
+        # index is built once per call
+        self.assertEqual(len(builds), 2)
+
+    def test_fan_out(self):
+        mapper = SimpleMapper({
+            'amounts': 'fees.<*>.amount',
+            'codes': 'fees.<*>.tags.<*>.code',
+            'fees': ListConfig('fees.<*>', {'amount': 'amount'}),
+        })
+        data = {'fees': [
+            {'amount': 1, 'tags': [{'code': 'A'}]},
+            {'amount': 2, 'tags': []},
+        ]}
+
+        actual = mapper.map_data(data)
+
+        self.assertDictEqual(actual, {
+            'amounts': [1, 2],
+            'codes': [['A'], []],
+            'fees': [{'amount': 1}, {'amount': 2}],
+        })
+        self.assertSetEqual(mapper.input_paths(), {
+            ('fees', '*', 'amount'),
+            ('fees', '*', 'tags', '*', 'code'),
+        })
+
+    def test_filter(self):
+        class Items(list):
+            passes = 0
+
+            def __iter__(self):
+                Items.passes += 1
+                return super(Items, self).__iter__()
+
+        mapper = SimpleMapper({
+            'fees': 'items.<filter:type=fee>.<*>.amount',
+            'taxes': 'items.<filter:type=tax>.<*>.amount',
+        })
+        data = {'items': Items([
+            {'type': 'fee', 'amount': 1},
+            {'type': 'tax', 'amount': 2},
+            'junk',
+            {'type': 'fee', 'amount': 3},
+        ])}
+
+        actual = mapper.map_data(data)
+
+        self.assertDictEqual(actual, {'fees': [1, 3], 'taxes': [2]})
+        # items are grouped by type once for all filters
+        self.assertEqual(Items.passes, 1)
+        self.assertSetEqual(mapper.input_paths(), {
+            ('items', '*', 'type'), ('items', '*', 'amount'),
+        })
+
+    def test_find_mixed_types(self):
+        mapper = SimpleMapper({'a': 'l.<find:t=x>.v'})
+
+        actual = mapper.map_data({'l': [{'t': 'x', 'v': 1}, 'junk']})
+
+        self.assertDictEqual(actual, {'a': 1})
+
+    def test_group_by_sort_by(self):
+        mapper = SimpleMapper({
+            'fees': 'items.<group_by:type>.fee.<*>.amount',
+            'taxes': ListConfig('items.<group_by:type>.tax', {
+                'amount': 'amount',
+            }),
+            'largest': 'items.<sort_by:amount,reverse>.0.type',
+        })
+        data = {'items': [
+            {'type': 'fee', 'amount': 1},
+            {'type': 'tax', 'amount': 3},
+            {'type': 'fee', 'amount': 2},
+        ]}
+
+        with mock.patch.object(GroupByLookup, '__call__', autospec=True,
+                               side_effect=GroupByLookup.__call__) \
+                as mock_group_by:
+            actual = mapper.map_data(data)
+
+        self.assertDictEqual(actual, {
+            'fees': [1, 2],
+            'taxes': [{'amount': 3}],
+            'largest': 'tax',
+        })
+        # groups are cached in the lut like other prefixes
+        mock_group_by.assert_called_once_with(mock.ANY, data['items'],
+                                              extra=mock.ANY)
+        self.assertSetEqual(mapper.input_paths(), {
+            ('items', '*', 'type'), ('items', '*', 'amount'),
+        })
+
+    def test_side_input(self):
+        side_input = {'rates': [
+            {'code': 'A', 'rate': 1},
+            {'code': 'B', 'rate': 2},
+        ]}
+        mapper = SimpleMapper({
+            'code': 'code',
+            'rate': '<side>.rates.<find:code=A>.rate',
+            'codes': ListConfig('<side>.rates', {'code': 'code'}),
+            'items': ListConfig('items', {
+                'rate': '<side>.rates.<find:code=B>.rate',
+            }),
+        }, side_input=side_input)
+        data = {'code': 'A', 'items': [{}, {}]}
+
+        with mock.patch.object(FindInListLookup, '__call__', autospec=True,
+                               side_effect=FindInListLookup.__call__) \
+                as mock_find:
+            actual = mapper.map_data(data)
+            mapper.map_data(data)
+
+        self.assertDictEqual(actual, {
+            'code': 'A',
+            'rate': 1,
+            'codes': [{'code': 'A'}, {'code': 'B'}],
+            'items': [{'rate': 2}, {'rate': 2}],
+        })
+        # find results are cached across calls
+        self.assertEqual(mock_find.call_count, 2)
+        # side input is not part of the input documents
+        self.assertSetEqual(mapper.input_paths(), {('code',)})
+
+    def test_side_input_replaced(self):
+        mapper = SimpleMapper({'rate': '<side>.rate'},
+                              side_input={'rate': 1})
+
+        self.assertDictEqual(mapper.map_data({}), {'rate': 1})
+        lut = mapper.side_input_lut()
+        mapper.side_input = {'rate': 2}
+
+        self.assertDictEqual(mapper.map_data({}), {'rate': 2})
+        self.assertIsNot(mapper.side_input_lut(), lut)
+
+    def test_side_input_table_registered(self):
+        mapper = SimpleMapper({'name': '<side>.code.<ref:codes,code>.name'},
+                              side_input={'code': 'A'})
+
+        with mock.patch.dict(tables):
+            tables.register('codes', Table([{'code': 'A', 'name': 'foo'}]))
+            self.assertDictEqual(mapper.map_data({}), {'name': 'foo'})
+            tables.register('codes', Table([{'code': 'A', 'name': 'bar'}]))
+
+            self.assertDictEqual(mapper.map_data({}), {'name': 'bar'})
+
+    def test_side_input_opaque_lookup(self):
+        class DocumentLookup(BaseLookup):
+            def __call__(self, node, extra=None):
+                return {'v': node[extra['super_root']['code']]}
+
+        lookup_registry = LookupRegistry('test', registry)
+        lookup_registry.register('doc', DocumentLookup)
+        mapper = SimpleMapper({
+            'rate': '<side>.rates.<doc>.v',
+            'items': ListConfig('items', {'rate': '<side>.rates.<doc>.v'}),
+        }, side_input={'rates': {'A': 1, 'B': 2}},
+            lookup_registry=lookup_registry)
+
+        self.assertDictEqual(mapper.map_data({'code': 'A', 'items': [{}]}),
+                             {'rate': 1, 'items': [{'rate': 1}]})
+        self.assertDictEqual(mapper.map_data({'code': 'B', 'items': [{}]}),
+                             {'rate': 2, 'items': [{'rate': 2}]})
+        # only the prefix before the opaque lookup is cached across calls
+        lut = mapper.side_input_lut()
+        self.assertIn('<side>.rates', lut)
+        self.assertNotIn('<side>.rates.<doc>', lut)
+        self.assertNotIn('<side>.rates.<doc>.v', lut)
+
+    def test_side_input_per_class(self):
+        foo = SimpleMapper({'rate': '<side>.rate'}, side_input={'rate': 1})
+        bar = SimpleMapper({'rate': '<side>.rate'}, side_input={'rate': 1})
+
+        self.assertIs(foo.side_input_lut(), foo.side_input_lut())
+        self.assertIsNot(foo.side_input_lut(), bar.side_input_lut())
+
     @mock.patch.object(MapperBase, 'map_node')
     def test_map_config_node(self, mock_map_node):
         node = OrderedDict((
@@ -469,7 +1246,7 @@ class TestMapperBase(unittest.TestCase):
         node = mock.MagicMock(
             root=mock.MagicMock(return_value=[
                 mock.sentinel.foo,
-            ])
+            ], uses_side_input=False)
         )
 
         actual = self.mapper.map_list_node(
@@ -493,7 +1270,7 @@ class TestMapperBase(unittest.TestCase):
     @mock.patch.object(MapperBase, 'get_lookup_context')
     def test_map_list_node_none_input_list(self, mock_get_lookup_context):
         node = mock.MagicMock(
-            root=mock.MagicMock(return_value=None)
+            root=mock.MagicMock(return_value=None, uses_side_input=False)
         )
 
         actual = self.mapper.map_list_node(
@@ -505,6 +1282,68 @@ class TestMapperBase(unittest.TestCase):
 
         self.assertListEqual([], actual)
 
+    def test_map_list_node_memoized(self):
+        self.mapper.memoize_list_elements = True
+        self.mapper.config = MapperConfig({
+            'items': ListConfig('items', {'code': 'code'}),
+        })
+        data = {'items': [{'code': 'A'}, {'code': 'B'}, {'code': 'A'}]}
+
+        with mock.patch.object(MapperBase, 'map_config_node',
+                               wraps=self.mapper.map_config_node) as mock_map:
+            actual = self.mapper(data)
+
+        self.assertDictEqual(actual, {'items': [
+            {'code': 'A'}, {'code': 'B'}, {'code': 'A'},
+        ]})
+        # root config and two unique elements
+        self.assertEqual(mock_map.call_count, 3)
+        self.assertIsNot(actual['items'][0], actual['items'][2])
+
+    def test_map_list_node_memoized_frozen(self):
+        self.mapper.memoize_list_elements = True
+        self.mapper.memoize_frozen = True
+        self.mapper.config = MapperConfig({
+            'items': ListConfig('items', {'code': 'code'}),
+        })
+
+        actual = self.mapper({'items': [{'code': 'A'}, {'code': 'A'}]})
+
+        self.assertIs(actual['items'][0], actual['items'][1])
+        with self.assertRaises(TypeError):
+            actual['items'][0]['code'] = 'B'
+
+    def test_map_list_node_memoized_opaque(self):
+        class CustomLookup(BaseLookup):
+            def __call__(self, node, extra=None):
+                return extra['super_root']['total']
+
+        lookup_registry = LookupRegistry('test', registry)
+        lookup_registry.register('custom', CustomLookup)
+        self.mapper.memoize_list_elements = True
+        self.mapper.config = MapperConfig({
+            'items': ListConfig('items', {'total': '<custom>'}),
+        }, lookup_registry=lookup_registry)
+
+        with mock.patch.object(MapperBase, 'map_list_elements_memoized') \
+                as mock_memoized:
+            actual = self.mapper({'items': [{}, {}], 'total': 5})
+
+        self.assertDictEqual(actual, {'items': [{'total': 5}, {'total': 5}]})
+        self.assertFalse(mock_memoized.called)
+
+    def test_map_list_node_memoized_unhashable(self):
+        self.mapper.memoize_list_elements = True
+        self.mapper.config = MapperConfig({
+            'items': ListConfig('items', {'code': 'code'}),
+        })
+
+        actual = self.mapper({'items': [
+            {'code': 'A', 'tags': {1}}, {'code': 'A', 'tags': {1}},
+        ]})
+
+        self.assertDictEqual(actual, {'items': [{'code': 'A'}, {'code': 'A'}]})
+
     @mock.patch.object(MapperBase, 'map_node')
     def test_map_list(self, mock_map_node):
         nodes = [mock.MagicMock(spec=Expression)]
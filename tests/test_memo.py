@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import copy
+import unittest
+from collections import OrderedDict
+
+from simplepath.memo import (
+    FrozenDict,
+    FrozenList,
+    LRUCache,
+    clone,
+    digest,
+    frozen,
+)
+
+
+class TestDigest(unittest.TestCase):
+    def test_digest_equal(self):
+        self.assertEqual(
+            digest({'foo': [1, {'bar': 'bar'}], 'baz': None}),
+            digest({'baz': None, 'foo': [1, {'bar': 'bar'}]}),
+        )
+
+    def test_digest_fixed_size(self):
+        self.assertEqual(len(digest({'foo': list(range(1000))})),
+                         len(digest(None)))
+
+    def test_digest_type_sensitive(self):
+        self.assertNotEqual(digest(1), digest(1.0))
+        self.assertNotEqual(digest(1), digest(True))
+        self.assertNotEqual(digest('1'), digest(1))
+        self.assertNotEqual(digest({'foo': 1}), digest({'foo': True}))
+        self.assertNotEqual(digest([1]), digest((1,)))
+
+    def test_digest_type_sensitive_keys(self):
+        self.assertNotEqual(digest({1: 'foo'}), digest({'1': 'foo'}))
+        self.assertNotEqual(digest({1: 'foo'}), digest({True: 'foo'}))
+        self.assertEqual(digest(OrderedDict([(1, 'foo'), ('1', 'bar')])),
+                         digest(OrderedDict([('1', 'bar'), (1, 'foo')])))
+
+    def test_digest_unambiguous(self):
+        self.assertNotEqual(digest(['a', 'b']), digest(['ab']))
+        self.assertNotEqual(digest([[1], 2]), digest([1, [2]]))
+        self.assertNotEqual(digest({'a': 'b', 'c': 'd'}),
+                            digest({'a': 'd', 'c': 'b'}))
+
+    def test_digest_order_sensitive_lists(self):
+        self.assertNotEqual(digest([1, 2]), digest([2, 1]))
+
+    def test_digest_unsupported(self):
+        with self.assertRaises(TypeError):
+            digest({'foo': {1, 2}})
+        with self.assertRaises(TypeError):
+            digest({'foo': object()})
+
+
+class TestFrozen(unittest.TestCase):
+    def test_frozen(self):
+        actual = frozen({'foo': [{'bar': 'bar'}], 'baz': 'baz'})
+
+        self.assertIsInstance(actual, FrozenDict)
+        self.assertIsInstance(actual['foo'], FrozenList)
+        self.assertIsInstance(actual['foo'][0], FrozenDict)
+        self.assertEqual(actual, {'foo': [{'bar': 'bar'}], 'baz': 'baz'})
+
+    def test_frozen_immutable(self):
+        actual = frozen({'foo': [{'bar': 'bar'}]})
+
+        with self.assertRaises(TypeError):
+            actual['foo'] = 'foo'
+        with self.assertRaises(TypeError):
+            actual.update({'foo': 'foo'})
+        with self.assertRaises(TypeError):
+            del actual['foo']
+        with self.assertRaises(TypeError):
+            actual['foo'].append('foo')
+        with self.assertRaises(TypeError):
+            actual['foo'][0] = 'foo'
+        with self.assertRaises(TypeError):
+            actual['foo'][0]['bar'] = 'foo'
+
+    def test_frozen_already_frozen(self):
+        output = frozen({'foo': 'foo'})
+
+        self.assertIs(frozen(output), output)
+
+    def test_frozen_copy(self):
+        output = frozen({'foo': ['foo']})
+
+        self.assertIs(copy.copy(output), output)
+        self.assertIs(copy.deepcopy(output), output)
+        self.assertIs(copy.deepcopy(output['foo']), output['foo'])
+
+
+class TestClone(unittest.TestCase):
+    def test_clone(self):
+        output = {'foo': [{'bar': 'bar'}]}
+
+        actual = clone(output)
+        actual['foo'][0]['bar'] = 'baz'
+
+        self.assertEqual(output, {'foo': [{'bar': 'bar'}]})
+
+    def test_clone_frozen(self):
+        actual = clone(frozen({'foo': [{'bar': 'bar'}]}))
+        actual['foo'].append('baz')
+
+        self.assertIs(type(actual), dict)
+        self.assertIs(type(actual['foo']), list)
+        self.assertEqual(actual, {'foo': [{'bar': 'bar'}, 'baz']})
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_set(self):
+        cache = LRUCache(2)
+
+        self.assertIsNone(cache.get('foo'))
+        cache.set('foo', 'foo')
+
+        self.assertEqual(cache.get('foo'), 'foo')
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache.set('foo', 'foo')
+        cache.set('bar', 'bar')
+        # mark foo as recently used
+        cache.get('foo')
+        cache.set('baz', 'baz')
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('foo'), 'foo')
+        self.assertIsNone(cache.get('bar'))
+        self.assertEqual(cache.get('baz'), 'baz')
+
+    def test_clear(self):
+        cache = LRUCache(2)
+        cache.set('foo', 'foo')
+        cache.get('foo')
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 0)
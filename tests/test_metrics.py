@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import unittest
+
+import mock
+
+from simplepath.metrics import (
+    Collector,
+    Histogram,
+    MapperMetrics,
+    MetricsRegistry,
+    document_size,
+)
+
+
+class TestDocumentSize(unittest.TestCase):
+    def test_document_size(self):
+        data = {
+            'foo': [1, 2, {'bar': 3}],
+            'baz': 'hello',
+        }
+
+        self.assertEqual(document_size(data), 7)
+
+    def test_document_size_scalar(self):
+        self.assertEqual(document_size(5), 1)
+
+
+class TestHistogram(unittest.TestCase):
+    def setUp(self):
+        super(TestHistogram, self).setUp()
+        self.histogram = Histogram((1, 2, 3, 4))
+
+    def test_observe(self):
+        self.histogram.observe(1.5)
+        self.histogram.observe(10)
+
+        self.assertListEqual(self.histogram.counts, [0, 1, 0, 0, 1])
+        self.assertEqual(self.histogram.count, 2)
+        self.assertEqual(self.histogram.total, 11.5)
+
+    def test_percentile(self):
+        for i in [1] * 50 + [2] * 45 + [4] * 4 + [100]:
+            self.histogram.observe(i)
+
+        self.assertEqual(self.histogram.percentile(0.5), 1)
+        self.assertEqual(self.histogram.percentile(0.95), 2)
+        self.assertEqual(self.histogram.percentile(0.99), 4)
+        self.assertEqual(self.histogram.percentile(1), float('inf'))
+
+    def test_percentile_empty(self):
+        self.assertIsNone(self.histogram.percentile(0.5))
+
+    def test_snapshot(self):
+        self.histogram.observe(2)
+
+        self.assertDictEqual(self.histogram.snapshot(), {
+            'count': 1,
+            'sum': 2,
+            'buckets': [(2, 1)],
+        })
+
+
+class TestMapperMetrics(unittest.TestCase):
+    def setUp(self):
+        super(TestMapperMetrics, self).setUp()
+        self.metrics = MapperMetrics('foo')
+
+    @mock.patch('random.random')
+    def test_should_sample(self, mock_random):
+        mock_random.return_value = 0.5
+
+        self.assertTrue(self.metrics.should_sample(1))
+        self.assertTrue(self.metrics.should_sample(0.6))
+        self.assertFalse(self.metrics.should_sample(0.4))
+
+    def test_count(self):
+        self.metrics.count()
+        self.metrics.count(error=True)
+
+        self.assertEqual(self.metrics.documents, 2)
+        self.assertEqual(self.metrics.errors, 1)
+        self.assertEqual(self.metrics.sampled, 0)
+
+    def test_record(self):
+        self.metrics.record(0.001, 50, skips=2, defaults=3)
+
+        snapshot = self.metrics.snapshot()
+
+        self.assertEqual(snapshot['mapper'], 'foo')
+        self.assertEqual(snapshot['documents'], 1)
+        self.assertEqual(snapshot['sampled'], 1)
+        self.assertEqual(snapshot['skips'], 2)
+        self.assertEqual(snapshot['defaults'], 3)
+        self.assertEqual(snapshot['size']['buckets'], [(100, 1)])
+        self.assertAlmostEqual(snapshot['latency']['p50'], 0.001, 3)
+        self.assertIn('p95', snapshot['latency'])
+        self.assertIn('p99', snapshot['latency'])
+
+    def test_record_without_size(self):
+        self.metrics.record(0.001)
+
+        snapshot = self.metrics.snapshot()
+
+        self.assertEqual(snapshot['sampled'], 1)
+        self.assertEqual(snapshot['latency']['count'], 1)
+        self.assertEqual(snapshot['size']['count'], 0)
+
+    def test_reset(self):
+        self.metrics.record(0.001, 50)
+
+        self.metrics.reset()
+
+        self.assertEqual(self.metrics.documents, 0)
+        self.assertEqual(self.metrics.latency.count, 0)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        super(TestMetricsRegistry, self).setUp()
+        self.registry = MetricsRegistry()
+
+    def test_get(self):
+        actual = self.registry.get(TestMetricsRegistry)
+
+        self.assertIsInstance(actual, MapperMetrics)
+        self.assertEqual(actual.name,
+                         'tests.test_metrics.TestMetricsRegistry')
+        self.assertIs(self.registry.get(TestMetricsRegistry), actual)
+
+    def test_snapshot(self):
+        self.registry.get(TestMetricsRegistry).count()
+
+        actual = self.registry.snapshot()
+
+        self.assertEqual(len(actual), 1)
+        self.assertEqual(actual[0]['documents'], 1)
+
+    def test_reset(self):
+        self.registry.get(TestMetricsRegistry)
+
+        self.registry.reset()
+
+        self.assertListEqual(self.registry.snapshot(), [])
+
+
+class TestCollector(unittest.TestCase):
+    def test_collect(self):
+        metrics = mock.MagicMock()
+
+        with Collector(metrics, {'foo': 'bar'}) as collector:
+            collector.skips += 1
+            collector.defaults += 2
+
+        metrics.record.assert_called_once_with(
+            mock.ANY, None, skips=1, defaults=2,
+        )
+
+    def test_collect_size(self):
+        metrics = mock.MagicMock()
+
+        with Collector(metrics, {'foo': 'bar'}, measure_size=True):
+            pass
+
+        metrics.record.assert_called_once_with(
+            mock.ANY, 2, skips=0, defaults=0,
+        )
+
+    def test_collect_error(self):
+        metrics = mock.MagicMock()
+
+        with self.assertRaises(ValueError):
+            with Collector(metrics, {}):
+                raise ValueError
+
+        metrics.count.assert_called_once_with(error=True)
+        self.assertFalse(metrics.record.called)
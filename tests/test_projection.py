@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+import random
+import unittest
+
+from simplepath.expressions import Expression
+from simplepath.lookups import BaseLookup
+from simplepath.mapper import ListConfig, SimpleMapper, Value
+from simplepath.projection import (
+    ANY,
+    GroupsNode,
+    ListNode,
+    PathNode,
+    ProjectedDecoder,
+    project_expression,
+    prune,
+)
+from simplepath.registry import LookupRegistry, registry
+
+
+class CustomLookup(BaseLookup):
+    def __call__(self, node, extra=None):
+        return node
+
+
+def tree(*expressions):
+    root = PathNode()
+    for expression in expressions:
+        project_expression(Expression(expression), root)
+    return root
+
+
+class TestPathNode(unittest.TestCase):
+    def test_child(self):
+        node = PathNode()
+
+        child = node.child('foo')
+
+        self.assertIsInstance(child, PathNode)
+        self.assertIs(node.child('foo'), child)
+        self.assertFalse(child.full)
+
+    def test_merge(self):
+        node = tree('foo.bar')
+
+        node.merge(tree('foo.baz', 'hello'))
+
+        self.assertSetEqual(node.paths(), {
+            ('foo', 'bar'), ('foo', 'baz'), ('hello',),
+        })
+
+    def test_paths(self):
+        node = tree('foo.bar', 'foo', 'hello.<find:a=b>.world')
+
+        self.assertSetEqual(node.paths(), {
+            ('foo',),
+            ('hello', ANY, 'a'),
+            ('hello', ANY, 'world'),
+        })
+
+    def test_paths_empty(self):
+        self.assertSetEqual(PathNode().paths(), set())
+
+    def test_affected_by(self):
+        node = tree('foo.bar', 'items.<find:a=b>.c', 'list.-1.d', 'list.0.e')
+
+        self.assertTrue(node.affected_by(()))
+        self.assertTrue(node.affected_by(('foo',)))
+        self.assertTrue(node.affected_by(('foo', 'bar', 'baz')))
+        self.assertFalse(node.affected_by(('foo', 'baz')))
+        self.assertFalse(node.affected_by(('hello',)))
+        self.assertTrue(node.affected_by(('items', 5, 'a')))
+        self.assertTrue(node.affected_by(('items', '5', 'c')))
+        self.assertFalse(node.affected_by(('items', 5, 'd')))
+        self.assertTrue(node.affected_by(('list', 0, 'e')))
+        self.assertFalse(node.affected_by(('list', 0, 'f')))
+        # negative index can reference any element
+        self.assertTrue(node.affected_by(('list', 3, 'd')))
+
+    def test_for_list(self):
+        node = tree('0.foo', '-1.bar')
+
+        self.assertSetEqual(node.for_list(0, 3).paths(), {('foo',)})
+        self.assertSetEqual(node.for_list(2, 3).paths(), {('bar',)})
+        self.assertIsNone(node.for_list(1, 3))
+
+    def test_for_list_any(self):
+        node = tree('<find:a=b>.foo', '1.bar')
+
+        self.assertSetEqual(node.for_list(0, 3).paths(), {
+            ('a',), ('foo',),
+        })
+        self.assertSetEqual(node.for_list(1, 3).paths(), {
+            ('a',), ('foo',), ('bar',),
+        })
+
+
+class TestListNode(unittest.TestCase):
+    def test_full(self):
+        tree = PathNode()
+        node = ListNode(tree.child('foo'))
+
+        self.assertFalse(node.full)
+        node.full = True
+
+        self.assertFalse(node.full)
+        self.assertSetEqual(tree.paths(), {('foo',)})
+
+
+class TestGroupsNode(unittest.TestCase):
+    def test_child(self):
+        tree = PathNode()
+        node = GroupsNode(tree.child('foo'))
+
+        actual = node.child('bar')
+
+        self.assertIsInstance(actual, ListNode)
+        self.assertIs(actual[ANY], tree['foo'])
+        self.assertFalse(node)
+
+    def test_full(self):
+        tree = PathNode()
+        node = GroupsNode(tree.child('foo'))
+
+        node.full = True
+
+        self.assertFalse(node.full)
+        self.assertSetEqual(tree.paths(), {('foo',)})
+
+
+class TestProjectExpression(unittest.TestCase):
+    def test_project_expression(self):
+        root = PathNode()
+
+        actual = project_expression(
+            Expression('foo.bar.<as_type:int>.<arith:+,1>'), root,
+        )
+
+        self.assertIs(actual, root['foo']['bar'])
+        self.assertTrue(actual.full)
+
+    def test_project_expression_not_full(self):
+        root = PathNode()
+
+        actual = project_expression(Expression('foo'), root, full=False)
+
+        self.assertFalse(actual.full)
+
+    def test_project_expression_opaque(self):
+        lookup_registry = LookupRegistry('test', registry)
+        lookup_registry.register('custom', CustomLookup)
+
+        actual = project_expression(
+            Expression('foo.<custom>', lookup_registry=lookup_registry),
+            PathNode(),
+        )
+
+        self.assertIsNone(actual)
+
+
+class TestPrune(unittest.TestCase):
+    def setUp(self):
+        super(TestPrune, self).setUp()
+        self.data = {
+            'foo': {
+                'bar': [1, 2, 3],
+                'junk': {'a': 'b'},
+            },
+            'items': [
+                {'type': 'a', 'value': 1, 'junk': 1},
+                {'type': 'b', 'value': 2, 'junk': 2},
+            ],
+            'junk': 'junk',
+        }
+        self.tree = tree('foo.bar.1', 'items.<find:type=b>.value')
+        self.expected = {
+            'foo': {
+                'bar': [None, 2, None],
+            },
+            'items': [
+                {'type': 'a', 'value': 1},
+                {'type': 'b', 'value': 2},
+            ],
+        }
+
+    def test_prune(self):
+        self.assertDictEqual(prune(self.data, self.tree), self.expected)
+
+    def test_prune_everything(self):
+        self.assertIs(prune(self.data, None), self.data)
+
+    def test_prune_object_as_list(self):
+        mapper = SimpleMapper({'foo': ListConfig('foo', {'bar': 'bar'})},
+                              fail_mode='skip')
+        data = {'foo': {'a': {'bar': 1}, 'b': 2}}
+        tree = mapper.config.projection()
+
+        self.assertDictEqual(prune(data, tree), {'foo': {'a': None,
+                                                         'b': None}})
+        self.assertDictEqual(ProjectedDecoder(tree)(json.dumps(data)),
+                             prune(data, tree))
+        self.assertDictEqual(mapper.map_data(prune(data, tree)),
+                             {'foo': [{}, {}]})
+
+    def test_decoder(self):
+        decoder = ProjectedDecoder(self.tree)
+
+        actual = decoder(json.dumps(self.data, indent=2))
+
+        self.assertDictEqual(actual, self.expected)
+
+    def test_decoder_binary(self):
+        decoder = ProjectedDecoder(self.tree)
+
+        actual = decoder(json.dumps(self.data).encode('utf-8'))
+
+        self.assertDictEqual(actual, self.expected)
+
+    def test_decoder_empty_containers(self):
+        decoder = ProjectedDecoder(tree('foo.bar', 'baz.0'))
+
+        actual = decoder('{"foo": {}, "baz": []}')
+
+        self.assertDictEqual(actual, {'foo': {}, 'baz': []})
+
+    def test_decoder_invalid(self):
+        decoder = ProjectedDecoder(tree('foo'))
+
+        for text in ('{"foo": 1} 5', '{"foo" 1}', '{"foo": 1 "bar": 2}'):
+            with self.assertRaises(ValueError):
+                decoder(text)
+
+
+class TestProjectionProperties(unittest.TestCase):
+    """
+    Mapping projected data of random documents
+    must match mapping the documents themselves.
+    """
+    KEYS = ['a', 'b', 'c']
+    SCALARS = [1, 'x', None, True]
+
+    def document(self, rnd):
+        return {k: self.value(rnd, 1) for k in self.KEYS
+                if rnd.random() < 0.8}
+
+    def value(self, rnd, depth=0):
+        kind = rnd.random()
+        if depth >= 3 or kind < 0.3:
+            return rnd.choice(self.SCALARS)
+        if kind < 0.65:
+            return {
+                k: self.value(rnd, depth + 1)
+                for k in rnd.sample(self.KEYS, rnd.randint(0, 3))
+            }
+        return [self.value(rnd, depth + 1) for _ in range(rnd.randint(0, 3))]
+
+    def expression(self, rnd):
+        segments = [rnd.choice(self.KEYS)]
+        for _ in range(rnd.randint(0, 2)):
+            segments.append(rnd.choice(self.KEYS + [
+                '0', '-1', '<find:a=x>', '<filter:b=1>', '<*>',
+            ]))
+        return '.'.join(segments)
+
+    def config(self, rnd, depth=0):
+        config = {}
+        for key in rnd.sample(self.KEYS, rnd.randint(1, 3)):
+            kind = rnd.random()
+            if depth >= 2 or kind < 0.5:
+                config[key] = self.expression(rnd)
+            elif kind < 0.7:
+                config[key] = ListConfig(self.expression(rnd),
+                                         self.config(rnd, depth + 1))
+            elif kind < 0.9:
+                config[key] = self.config(rnd, depth + 1)
+            else:
+                config[key] = Value(1)
+        return config
+
+    def map(self, mapper, data):
+        try:
+            return mapper.map_data(data)
+        except Exception as e:
+            return type(e)
+
+    def test_map_projected(self):
+        rnd = random.Random(42)
+
+        for _ in range(300):
+            mapper = SimpleMapper(self.config(rnd), fail_mode='skip')
+            tree = mapper.config.projection()
+            for _ in range(5):
+                data = self.document(rnd)
+                expected = self.map(mapper, data)
+
+                self.assertEqual(self.map(mapper, prune(data, tree)),
+                                 expected)
+                projected = ProjectedDecoder(tree)(json.dumps(data))
+                self.assertEqual(self.map(mapper, projected), expected)
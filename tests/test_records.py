@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import unittest
+
+from simplepath.records import Record, RecordLayout, validate_fields
+
+
+class TestRecord(unittest.TestCase):
+    def setUp(self):
+        super(TestRecord, self).setUp()
+        self.record_class = type(str('Planet'), (Record,), {
+            '__slots__': ('name', 'residents'),
+        })
+
+    def test_record(self):
+        record = self.record_class('Mars', 'martians')
+
+        self.assertEqual(record.name, 'Mars')
+        self.assertEqual(list(record), ['Mars', 'martians'])
+        self.assertDictEqual(record._asdict(),
+                             {'name': 'Mars', 'residents': 'martians'})
+        self.assertEqual(repr(record),
+                         "Planet(name='Mars', residents='martians')")
+        self.assertFalse(hasattr(record, '__dict__'))
+
+    def test_eq(self):
+        record = self.record_class('Mars', 'martians')
+
+        self.assertEqual(record, self.record_class('Mars', 'martians'))
+        self.assertNotEqual(record, self.record_class('Earth', 'people'))
+        self.assertNotEqual(record, ('Mars', 'martians'))
+
+
+class TestRecordLayout(unittest.TestCase):
+    def test_validate_fields(self):
+        validate_fields(['foo', 'bar_1'])
+
+        for field in ('1foo', 'foo-bar', 'class', '_foo'):
+            with self.assertRaises(ValueError):
+                validate_fields([field])
+
+    def test_tuple(self):
+        layout = RecordLayout(['foo', 'foo-bar'])
+
+        self.assertEqual(layout.make([1, 2]), (1, 2))
+        self.assertIsNone(layout.record_class)
+
+    def test_namedtuple(self):
+        layout = RecordLayout(['foo', 'bar'], 'namedtuple', 'Planet')
+
+        record = layout.make([1, 2])
+
+        self.assertEqual(record, (1, 2))
+        self.assertEqual(record.bar, 2)
+        self.assertEqual(type(record).__name__, 'Planet')
+
+    def test_slots(self):
+        layout = RecordLayout(['foo', 'bar'], 'slots', 'Planet')
+
+        record = layout.make([1, 2])
+
+        self.assertIsInstance(record, Record)
+        self.assertEqual(record.bar, 2)
+        self.assertEqual(type(record).__name__, 'Planet')
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            RecordLayout(['foo'], 'dict')
+        with self.assertRaises(ValueError):
+            RecordLayout(['foo-bar'], 'namedtuple')
+
+    def test_repr(self):
+        self.assertEqual(repr(RecordLayout(['foo', 'bar'])),
+                         '<RecordLayout kind="tuple" fields=[foo, bar]>')
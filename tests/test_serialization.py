@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import json
+import unittest
+from decimal import Decimal
+
+import mock
+import six
+
+from simplepath.serialization import JSONWriter, encode_key
+
+
+class TestEncodeKey(unittest.TestCase):
+    def test_encode_key(self):
+        self.assertEqual(encode_key('foo'), '"foo": ')
+        self.assertEqual(encode_key('☃'), '"\\u2603": ')
+        self.assertEqual(encode_key(5), '"5": ')
+
+
+class TestJSONWriter(unittest.TestCase):
+    def test_value(self):
+        writer = JSONWriter()
+        values = ['foo "☃"', 5, 2 ** 70, None, True, 1.5,
+                  float('inf'), [1, {'a': 'b'}]]
+
+        for value in values:
+            writer.value(value)
+
+        self.assertEqual(writer.getvalue(),
+                         ''.join(json.dumps(i) for i in values))
+
+    def test_value_custom_encoder(self):
+        encoder = mock.MagicMock()
+        encoder.encode.return_value = '"1.5"'
+        writer = JSONWriter(encoder=encoder)
+
+        writer.value(Decimal('1.5'))
+        writer.value('foo')
+
+        self.assertEqual(writer.getvalue(), '"1.5""1.5"')
+        self.assertEqual(encoder.encode.call_count, 2)
+
+    def test_flush(self):
+        fp = six.StringIO()
+        writer = JSONWriter(fp, buffer_size=2)
+
+        writer.write('[')
+        writer.maybe_flush()
+        self.assertEqual(fp.getvalue(), '')
+
+        writer.value(1)
+        writer.maybe_flush()
+        self.assertEqual(fp.getvalue(), '[1')
+
+        writer.write(']')
+        writer.flush()
+        self.assertEqual(fp.getvalue(), '[1]')
+        self.assertEqual(writer.getvalue(), '')
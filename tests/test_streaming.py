@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import io
+import json
+import unittest
+
+import mock
+
+from simplepath.streaming import (
+    ChunkReader,
+    IncompleteValue,
+    iter_documents,
+    scan_value,
+)
+
+
+DOCUMENTS = [
+    {'foo': 'bar', 'list': [1, 2, {'nested': None}]},
+    {'escaped': 'quote " and brackets ]} and \\\\'},
+    [1, 2],
+    'string',
+    15.5,
+    None,
+    {'unicode': '☃'},
+]
+
+
+class TestScanValue(unittest.TestCase):
+    def test_scan_value(self):
+        text = ' {"foo": "b}a\\"r", "list": [1, {}]}, 5'
+
+        self.assertEqual(scan_value(text, 1), len(text) - 3)
+
+    def test_scan_value_string(self):
+        self.assertEqual(scan_value('"foo\\"bar", 5', 0), 10)
+
+    def test_scan_value_scalar(self):
+        self.assertEqual(scan_value('12.5, 5', 0), 4)
+
+    def test_scan_value_incomplete(self):
+        for text in ('{"foo": [1, 2', '"foo', '125', '{"foo": "}'):
+            with self.assertRaises(IncompleteValue):
+                scan_value(text, 0)
+
+
+class TestChunkReader(unittest.TestCase):
+    def test_read_binary(self):
+        reader = ChunkReader(io.BytesIO('☃'.encode('utf-8')),
+                             chunk_size=1)
+
+        self.assertEqual(reader.read(), '☃')
+        self.assertEqual(reader.read(), '')
+        self.assertTrue(reader.eof)
+
+    def test_read_text(self):
+        reader = ChunkReader(io.StringIO('foo'), chunk_size=2)
+
+        self.assertEqual(reader.read(), 'fo')
+        self.assertEqual(reader.read(), 'o')
+
+
+class TestIterDocuments(unittest.TestCase):
+    def setUp(self):
+        super(TestIterDocuments, self).setUp()
+        self.array = json.dumps(DOCUMENTS, indent=2)
+        self.lines = '\n'.join(json.dumps(i) for i in DOCUMENTS) + '\n'
+
+    def test_array(self):
+        for chunk_size in (1, 7, 1024):
+            actual = iter_documents(io.StringIO(self.array),
+                                    chunk_size=chunk_size)
+
+            self.assertListEqual(list(actual), DOCUMENTS)
+
+    def test_array_binary(self):
+        actual = iter_documents(io.BytesIO(self.array.encode('utf-8')),
+                                format='array', chunk_size=5)
+
+        self.assertListEqual(list(actual), DOCUMENTS)
+
+    def test_array_decoder(self):
+        decoder = mock.MagicMock(side_effect=json.loads)
+
+        actual = iter_documents(io.StringIO(self.array), decoder=decoder)
+
+        self.assertListEqual(list(actual), DOCUMENTS)
+        self.assertEqual(decoder.call_count, len(DOCUMENTS))
+
+    def test_array_empty(self):
+        self.assertListEqual(list(iter_documents(io.StringIO(' [ ] '))), [])
+
+    def test_array_invalid(self):
+        for text in ('[{"foo": 1} {"bar": 2}]', '[{"foo": 1}', '[{"foo"'):
+            with self.assertRaises(ValueError):
+                list(iter_documents(io.StringIO(text), format='array'))
+
+    def test_array_not_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_documents(io.StringIO('{}'), format='array'))
+
+    def test_lines(self):
+        for chunk_size in (1, 7, 1024):
+            actual = iter_documents(io.BytesIO(self.lines.encode('utf-8')),
+                                    chunk_size=chunk_size)
+
+            self.assertListEqual(list(actual), DOCUMENTS)
+
+    def test_lines_blank_lines_no_trailing_newline(self):
+        actual = iter_documents(io.StringIO('\n{"foo": 1}\n\n{"bar": 2}'),
+                                format='jsonl')
+
+        self.assertListEqual(list(actual), [{'foo': 1}, {'bar': 2}])
+
+    def test_lines_decoder(self):
+        decoder = mock.MagicMock(side_effect=json.loads)
+
+        actual = iter_documents(io.StringIO(self.lines), decoder=decoder)
+
+        self.assertListEqual(list(actual), DOCUMENTS)
+        decoder.assert_any_call(json.dumps(DOCUMENTS[0]))
+
+    def test_empty(self):
+        self.assertListEqual(list(iter_documents(io.StringIO(' \n'))), [])
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            iter_documents(io.StringIO(''), format='xml')
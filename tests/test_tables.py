@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from simplepath.mapper import SimpleMapper
+from simplepath.tables import (
+    CSVTable,
+    JSONLinesTable,
+    Table,
+    TableRegistry,
+    tables,
+)
+
+
+ROWS = [
+    {'code': 'NY', 'name': 'New York'},
+    {'code': 'CA', 'name': 'California'},
+    {'code': 'NY', 'name': 'Duplicate'},
+]
+
+
+class FileTableMixin(object):
+    def setUp(self):
+        super(FileTableMixin, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with io.open(path, 'w', encoding='utf-8', newline='') as fid:
+            fid.write(content)
+        return path
+
+
+class TestTable(unittest.TestCase):
+    def test_init(self):
+        table = Table(ROWS, keys=['code'])
+
+        self.assertEqual(table.indexes, {'code': {'NY': 0, 'CA': 1}})
+
+    def test_get(self):
+        table = Table(ROWS)
+
+        self.assertEqual(table.get('code', 'NY'), ROWS[0])
+        self.assertEqual(table.get('name', 'California'), ROWS[1])
+        with self.assertRaises(KeyError):
+            table.get('code', 'TX')
+
+    def test_index_cached(self):
+        table = Table(ROWS)
+
+        with mock.patch.object(table, 'scan',
+                               side_effect=table.scan) as mock_scan:
+            table.get('code', 'NY')
+            table.get('code', 'CA')
+
+        mock_scan.assert_called_once_with()
+
+    def test_index_missing_field(self):
+        table = Table([{'name': 'foo'}, {'code': 'bar'}])
+
+        self.assertEqual(table.index('code'), {'bar': 1})
+
+
+class TestCSVTable(FileTableMixin, unittest.TestCase):
+    def test_get(self):
+        path = self.write('states.csv', (
+            'code,name\r\n'
+            'NY,New York\r\n'
+            '\r\n'
+            '"CA","Cali, fornia ☀"\r\n'
+            '1,One'
+        ))
+        table = CSVTable(path, keys=['code'])
+        self.addCleanup(table.close)
+
+        self.assertEqual(table.fields, ['code', 'name'])
+        self.assertEqual(table.get('code', 'CA'),
+                         {'code': 'CA', 'name': 'Cali, fornia ☀'})
+        self.assertEqual(table.get('code', 1), {'code': '1', 'name': 'One'})
+        self.assertEqual(table.get('name', 'New York')['code'], 'NY')
+        # index only holds offsets within the file
+        self.assertEqual(sorted(table.indexes['code'].values()),
+                         [11, 26, 51])
+
+    def test_empty(self):
+        table = CSVTable(self.write('empty.csv', ''))
+        self.addCleanup(table.close)
+
+        self.assertEqual(table.fields, [])
+        with self.assertRaises(KeyError):
+            table.get('code', 'NY')
+
+
+class TestJSONLinesTable(FileTableMixin, unittest.TestCase):
+    def test_get(self):
+        path = self.write('states.jsonl', (
+            '{"code": "NY", "name": "New York"}\n'
+            '{"code": 1, "name": "One"}\n'
+        ))
+        table = JSONLinesTable(path, keys=['code'])
+        self.addCleanup(table.close)
+
+        self.assertEqual(table.get('code', 1), {'code': 1, 'name': 'One'})
+        with self.assertRaises(KeyError):
+            table.get('code', '1')
+
+
+class TestTableRegistry(unittest.TestCase):
+    def test_register(self):
+        registry = TableRegistry('foo')
+
+        registry.register('foo', 'bar')
+
+        self.assertEqual(registry.name, 'foo')
+        self.assertEqual(registry['foo'], 'bar')
+        self.assertEqual(registry.version, 1)
+
+
+class TestReferenceTable(unittest.TestCase):
+    def setUp(self):
+        super(TestReferenceTable, self).setUp()
+        patcher = mock.patch.dict(tables, {'states': Table(ROWS)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_map_data(self):
+        mapper = SimpleMapper({
+            'state': 'state.<ref:states,code>.name',
+            'missing': 'missing.<ref:states,code>.name',
+        }, fail_mode='skip')
+
+        actual = mapper.map_data({'state': 'CA', 'missing': 'TX'})
+
+        self.assertDictEqual(actual, {'state': 'California'})
+        self.assertSetEqual(mapper.input_paths(), {('state',), ('missing',)})
@@ -3,7 +3,7 @@
 from __future__ import unicode_literals
 import unittest
 
-from simplepath.utils import deepvars
+from simplepath.utils import deepvars, import_string
 
 
 class Person(object):
@@ -74,3 +74,18 @@ class TestDeepVars(unittest.TestCase):
     def test_non_object_conversion(self):
         """The same non-object element passed should be returned."""
         self.assertEqual(100, deepvars(100))
+
+
+class TestImportString(unittest.TestCase):
+    def test_import_string(self):
+        self.assertIs(import_string('simplepath.utils:deepvars'), deepvars)
+
+    def test_import_string_nested(self):
+        self.assertIs(
+            import_string('tests.test_utils:Health.__init__'),
+            Health.__init__,
+        )
+
+    def test_import_string_invalid(self):
+        with self.assertRaises(ValueError):
+            import_string('simplepath.utils.deepvars')
@@ -1,13 +1,22 @@
 # -*- coding: utf-8 -*-
 from __future__ import division, print_function, unicode_literals
+import json
+import os
+import shutil
 import sys
+import tempfile
 import unittest
 from functools import partial
 
+import mock
 import six
 from contexttimer import Timer
 from nose.plugins.attrib import attr
 
+from benchmarks import memory
+from benchmarks.__main__ import main as benchmarks_main
+from benchmarks import suite
+from benchmarks.suite import BENCHMARKS, compare, run
 from simplepath.mapper import SimpleMapper
 
 
@@ -142,3 +151,81 @@ class TestMapperPerformance(unittest.TestCase):
         self._test_performance(
             nodes=10, depth=2, iterations=3, optimize=True,
         )
+
+
+@attr('slow')
+@unittest.skipIf(suite.tracemalloc is None, 'tracemalloc is not available')
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_run(self):
+        results = run(scale=0.05, repeat=1)
+
+        self.assertListEqual(list(results['results']), list(BENCHMARKS))
+        for result in results['results'].values():
+            self.assertGreater(result['metrics']['seconds'], 0)
+        self.assertGreater(
+            results['results']['batch_throughput']['metrics']['peak_bytes'],
+            0,
+        )
+
+    def test_compare(self):
+        baseline = {'results': {
+            'foo': {'metrics': {'seconds': 1.0, 'peak_bytes': 100}},
+            'bar': {'metrics': {'seconds': 1.0}},
+            'baz': {'metrics': {'seconds': 1.0}},
+        }}
+        current = {'results': {
+            'foo': {'metrics': {'seconds': 1.5, 'peak_bytes': 105}},
+            'bar': {'metrics': {'seconds': 0.5}},
+        }}
+
+        actual = compare(baseline, current, tolerance=0.1)
+
+        self.assertListEqual([i[-1] for i in actual], [
+            'regression', 'ok', 'improvement', 'missing',
+        ])
+
+    def test_main_compare(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        baseline = os.path.join(tmp, 'baseline.json')
+        current = os.path.join(tmp, 'current.json')
+        with open(baseline, 'w') as fid:
+            json.dump({'results': {'foo': {'metrics': {'seconds': 1}}}}, fid)
+        with open(current, 'w') as fid:
+            json.dump({'results': {'foo': {'metrics': {'seconds': 2}}}}, fid)
+
+        with mock.patch('sys.stdout', new_callable=six.StringIO), \
+                mock.patch('sys.stderr', new_callable=six.StringIO):
+            self.assertEqual(benchmarks_main(['compare', baseline, current]),
+                             1)
+            self.assertEqual(benchmarks_main(['compare', baseline, baseline]),
+                             0)
+
+
+@attr('slow')
+@unittest.skipIf(memory.tracemalloc is None, 'tracemalloc is not available')
+class TestMemoryHarness(unittest.TestCase):
+    def test_module_name(self):
+        self.assertEqual(
+            memory.module_name(os.path.join(memory.PACKAGE_DIR, 'mapper.py')),
+            'simplepath/mapper.py',
+        )
+        self.assertEqual(memory.module_name(__file__), 'other')
+
+    def test_measure(self):
+        metrics, modules = memory.measure(lambda: [{} for _ in range(1000)])
+
+        self.assertGreater(metrics['peak_bytes'], 0)
+        self.assertGreater(metrics['retained_bytes'], 0)
+        self.assertGreaterEqual(metrics['peak_excess_bytes'], 0)
+        self.assertIn('other', modules)
+
+    def test_run(self):
+        results = memory.run(names=['wide'], scale=0.05, batch=2)
+
+        self.assertListEqual(list(results['results']), [
+            'wide.compile', 'wide.map_one', 'wide.map_batch',
+        ])
+        info = results['results']['wide.map_batch']['info']
+        modules = info['retained_modules']
+        self.assertGreater(modules['simplepath/mapper.py'], 0)